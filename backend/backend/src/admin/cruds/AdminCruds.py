@@ -36,6 +36,8 @@ from admin.response.ReportListResponse import ReportListResponse
 from tweets.models.TweetReport import TweetReport
 from tweets.models.CommentReport import CommentReport
 from caching.cache_service import cache_service
+from core.cache_config import GenerationScopes
+from database.fanout import query_fanout
 from user_profile.models.UserInterest import UserInterest
 from tweets.models.TweetMedia import TweetMedia
 from tweets.models.Tweet import Tweet
@@ -47,6 +49,7 @@ from tweets.models.Share import Share
 from tweets.models.TweetReport import TweetReport
 from tweets.models.CommentReport import CommentReport
 from user_profile.models.Follower import Follower
+from tweets.models.AuthorAffinity import AuthorAffinity
 from user_profile.models.FollowRequest import FollowRequest
 from auth.models.UserProfile import UserProfile
 from user_profile.models.UserInterest import UserInterest
@@ -56,6 +59,10 @@ from dateutil.relativedelta import relativedelta
 from typing import Optional
 from admin.response.TweetStatsResponse import TweetStatsResponse
 from admin.response.UserDetailsResponse import UserDetailsResponse
+from admin.response.TimelineFanoutStatsResponse import TimelineFanoutStatsResponse
+from caching.timeline_service import timeline_service
+from admin.response.InteractionMemoryResponse import InteractionMemoryResponse
+from caching.interaction_sets import interaction_sets
 from sqlalchemy.exc import SQLAlchemyError
 from core.image_utils import ImageUtils
 from sqlalchemy.orm import aliased
@@ -129,7 +136,10 @@ class AdminCruds:
     async def search_users(
         self, db: AsyncSession, request: UserSearchRequest
     ) -> UserSearchResponse:
-        cache_key = f"admin_search_users:p{request.page}:s{request.search or 'none'}:c{request.command_id or 'all'}:o{request.is_organizational}:pr{request.is_prime}:pv{request.is_private}"
+        cache_key = await cache_service.gen_key(
+            f"admin_search_users:p{request.page}:s{request.search or 'none'}:c{request.command_id or 'all'}:o{request.is_organizational}:pr{request.is_prime}:pv{request.is_private}",
+            GenerationScopes.GLOBAL_ADMIN,
+        )
         cached = await cache_service.get(cache_key)
         if cached:
             logger.info(f"Cache hit for admin user search: {cache_key}")
@@ -273,6 +283,14 @@ class AdminCruds:
         await db.execute(
             Share.__table__.delete().where(Share.recipient_id == request.user_id)
         )
+        await db.execute(
+            AuthorAffinity.__table__.delete().where(
+                or_(
+                    AuthorAffinity.viewer_id == request.user_id,
+                    AuthorAffinity.author_id == request.user_id,
+                )
+            )
+        )
         await db.execute(
             Follower.__table__.delete().where(Follower.follower_id == request.user_id)
         )
@@ -338,7 +356,7 @@ class AdminCruds:
         return {"success": True, "message": f"User {request.user_id} deleted"}
 
     async def get_user_type_stats(self, db: AsyncSession) -> UserTypeStatsResponse:
-        cache_key = "admin_user_type_stats"
+        cache_key = await cache_service.gen_key("admin_user_type_stats", GenerationScopes.GLOBAL_ADMIN)
         cached = await cache_service.get(cache_key)
         if cached:
             logger.info("Cache hit for admin user type stats")
@@ -381,7 +399,7 @@ class AdminCruds:
     async def get_user_activity_stats(
         self, db: AsyncSession
     ) -> UserActivityStatsResponse:
-        cache_key = "admin_user_activity_stats"
+        cache_key = await cache_service.gen_key("admin_user_activity_stats", GenerationScopes.GLOBAL_ADMIN)
         cached = await cache_service.get(cache_key)
         if cached:
             logger.info("Cache hit for admin user activity stats")
@@ -416,7 +434,7 @@ class AdminCruds:
     async def get_tweet_reports(
         self, db: AsyncSession, page: int = 1
     ) -> ReportListResponse:
-        cache_key = f"admin_tweet_reports:p{page}"
+        cache_key = await cache_service.gen_key(f"admin_tweet_reports:p{page}", GenerationScopes.GLOBAL_ADMIN)
         cached = await cache_service.get(cache_key)
         if cached:
             logger.info(f"Cache hit for admin tweet reports page {page}")
@@ -715,7 +733,7 @@ class AdminCruds:
     async def get_all_users_paginated(
         self, db: AsyncSession, page: int = 1, page_size: int = 20
     ) -> UserSearchResponse:
-        cache_key = f"admin:all_users:page:{page}:size:{page_size}"
+        cache_key = await cache_service.gen_key(f"admin:all_users:page:{page}:size:{page_size}", GenerationScopes.GLOBAL_ADMIN)
         cached = await cache_service.get(cache_key)
         if cached:
             return UserSearchResponse(**cached)
@@ -750,7 +768,7 @@ class AdminCruds:
     async def get_all_blocked_users_paginated(
         self, db: AsyncSession, page: int = 1, page_size: int = 20
     ) -> UserSearchResponse:
-        cache_key = f"admin:blocked_users:page:{page}:size:{page_size}"
+        cache_key = await cache_service.gen_key(f"admin:blocked_users:page:{page}:size:{page_size}", GenerationScopes.GLOBAL_ADMIN)
         cached = await cache_service.get(cache_key)
         if cached:
             return UserSearchResponse(**cached)
@@ -832,59 +850,33 @@ class AdminCruds:
         """Get tweet statistics for a specific date."""
         start_date = datetime(date.year, date.month, date.day, 0, 0, 0)
         end_date = datetime(date.year, date.month, date.day, 23, 59, 59)
-        total_tweets = (
-            await db.execute(
-                select(func.count(Tweet.id)).where(
-                    and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
-                )
-            )
-        ).scalar_one()
-        total_likes = (
-            await db.execute(
-                select(func.count())
-                .select_from(TweetLike)
-                .join(Tweet, TweetLike.tweet_id == Tweet.id)
-                .where(
-                    and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
-                )
-            )
-        ).scalar_one()
-        total_comments = (
-            await db.execute(
-                select(func.count(Comment.id))
-                .join(Tweet, Comment.tweet_id == Tweet.id)
-                .where(
-                    and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
-                )
-            )
-        ).scalar_one()
-        total_shares = (
-            await db.execute(
-                select(func.count())
-                .select_from(Share)
-                .join(Tweet, Share.tweet_id == Tweet.id)
-                .where(
-                    and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
-                )
-            )
-        ).scalar_one()
-        total_bookmarks = (
-            await db.execute(
-                select(func.count())
-                .select_from(Bookmark)
-                .join(Tweet, Bookmark.tweet_id == Tweet.id)
-                .where(
-                    and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
-                )
-            )
-        ).scalar_one()
-        total_views = (
-            await db.execute(
-                select(func.sum(Tweet.view_count)).where(
-                    and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
-                )
-            )
-        ).scalar_one() or 0
+        on_date = and_(Tweet.created_at >= start_date, Tweet.created_at <= end_date)
+        # Independent counts, each on a connection of its own
+        results = await query_fanout.gather(
+            db,
+            select(func.count(Tweet.id)).where(on_date),
+            select(func.count())
+            .select_from(TweetLike)
+            .join(Tweet, TweetLike.tweet_id == Tweet.id)
+            .where(on_date),
+            select(func.count(Comment.id))
+            .join(Tweet, Comment.tweet_id == Tweet.id)
+            .where(on_date),
+            select(func.count())
+            .select_from(Share)
+            .join(Tweet, Share.tweet_id == Tweet.id)
+            .where(on_date),
+            select(func.count())
+            .select_from(Bookmark)
+            .join(Tweet, Bookmark.tweet_id == Tweet.id)
+            .where(on_date),
+            select(func.sum(Tweet.view_count)).where(on_date),
+            name="admin_tweet_stats",
+        )
+        total_tweets, total_likes, total_comments, total_shares, total_bookmarks, total_views = (
+            result.scalar_one() for result in results
+        )
+        total_views = total_views or 0
         return TweetStatsResponse(
             date=date,
             total_tweets=total_tweets,
@@ -895,6 +887,24 @@ class AdminCruds:
             total_views=total_views,
         )
 
+    async def get_timeline_fanout_stats(self) -> TimelineFanoutStatsResponse:
+        """Fan-out writes performed vs. avoided by the shared celebrity timeline."""
+        try:
+            stats = await timeline_service.get_fanout_stats()
+            return TimelineFanoutStatsResponse(**stats)
+        except Exception as e:
+            logger.error(f"Failed to get timeline fan-out stats: {e}")
+            raise InternalServerError("Failed to get timeline fan-out stats")
+
+    async def get_interaction_memory(self, user_id: str) -> InteractionMemoryResponse:
+        """Redis memory held by a user's liked/bookmarked/shared tweet sets."""
+        try:
+            report = await interaction_sets.get_memory_report(user_id)
+            return InteractionMemoryResponse(**report)
+        except Exception as e:
+            logger.error(f"Failed to get interaction set memory for {user_id}: {e}")
+            raise InternalServerError("Failed to get interaction set memory")
+
     async def get_user_details(
         self, db: AsyncSession, user_id: str
     ) -> UserDetailsResponse:
@@ -911,43 +921,34 @@ class AdminCruds:
             user, profile = user_data
             if user.is_admin:
                 raise NotFoundError(f"User {user_id} is an admin user")
-            tweet_count = (
-                await db.scalar(
-                    select(func.count(Tweet.id)).where(Tweet.user_id == user_id)
-                )
-                or 0
-            )
-            comment_count = (
-                await db.scalar(
-                    select(func.count(Comment.id)).where(Comment.user_id == user_id)
-                )
-                or 0
-            )
-            follower_count = (
-                await db.scalar(
-                    select(func.count(Follower.followee_id)).where(
-                        Follower.followee_id == user_id
-                    )
-                )
-                or 0
-            )
-            following_count = (
-                await db.scalar(
-                    select(func.count(Follower.follower_id)).where(
-                        Follower.follower_id == user_id
-                    )
-                )
-                or 0
-            )
-            interests_result = await db.execute(
+            (
+                tweet_count_result,
+                comment_count_result,
+                follower_count_result,
+                following_count_result,
+                interests_result,
+                command_result,
+            ) = await query_fanout.gather(
+                db,
+                select(func.count(Tweet.id)).where(Tweet.user_id == user_id),
+                select(func.count(Comment.id)).where(Comment.user_id == user_id),
+                select(func.count(Follower.followee_id)).where(
+                    Follower.followee_id == user_id
+                ),
+                select(func.count(Follower.follower_id)).where(
+                    Follower.follower_id == user_id
+                ),
                 select(Interest.name)
                 .join(UserInterest, Interest.id == UserInterest.interest_id)
-                .where(UserInterest.user_id == user_id)
-            )
+                .where(UserInterest.user_id == user_id),
+                select(Command.name).where(Command.id == profile.command_id),
+                name="admin_user_details",
+            )
+            tweet_count = tweet_count_result.scalar_one() or 0
+            comment_count = comment_count_result.scalar_one() or 0
+            follower_count = follower_count_result.scalar_one() or 0
+            following_count = following_count_result.scalar_one() or 0
             interests = [row[0] for row in interests_result.all()]
-            command_result = await db.execute(
-                select(Command.name).where(Command.id == profile.command_id)
-            )
             command_name = command_result.scalar_one_or_none()
             photo = None
             if profile.photo_path and profile.photo_content_type:
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+
+
+class InteractionSetStats(BaseModel):
+    loaded: bool
+    members: int
+    memory_bytes: int
+    encoding: Optional[str] = None
+
+
+class InteractionMemoryResponse(BaseModel):
+    user_id: str
+    sets: Dict[str, InteractionSetStats]
+    total_memory_bytes: int
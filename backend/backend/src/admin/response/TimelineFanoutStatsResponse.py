@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class TimelineFanoutStatsResponse(BaseModel):
+    regular_tweets: int
+    celebrity_tweets: int
+    pushed_writes: int
+    saved_writes: int
+    saved_percent: float
+    celebrity_follower_threshold: int
@@ -26,6 +26,8 @@ from core.exceptions import (
 )
 from admin.request.UpdateUserStatusRequest import UpdateUserStatusRequest
 from admin.response.TweetStatsResponse import TweetStatsResponse
+from admin.response.TimelineFanoutStatsResponse import TimelineFanoutStatsResponse
+from admin.response.InteractionMemoryResponse import InteractionMemoryResponse
 from datetime import datetime
 from admin.response.UserDetailsResponse import UserDetailsResponse
 
@@ -297,6 +299,37 @@ async def get_tweet_stats(
         raise create_http_exception(e)
 
 
+@router.get(
+    "/stats/timeline-fanout",
+    response_model=TimelineFanoutStatsResponse,
+    summary="Get home timeline fan-out statistics (admin only)",
+    description="Fan-out writes performed for regular authors and writes saved by serving prime, organizational and popular authors from the shared timeline.",
+)
+async def get_timeline_fanout_stats(
+    current_admin: str = Depends(get_current_admin_user),
+):
+    try:
+        return await admin_service.get_timeline_fanout_stats()
+    except BaseCustomException as e:
+        raise create_http_exception(e)
+
+
+@router.get(
+    "/stats/interaction-memory/{user_id}",
+    response_model=InteractionMemoryResponse,
+    summary="Get Redis memory used by a user's interaction sets (admin only)",
+    description="Members, encoding and memory of the liked, bookmarked and shared tweet sets used to resolve viewer flags.",
+)
+async def get_interaction_memory(
+    user_id: str,
+    current_admin: str = Depends(get_current_admin_user),
+):
+    try:
+        return await admin_service.get_interaction_memory(user_id)
+    except BaseCustomException as e:
+        raise create_http_exception(e)
+
+
 @router.get(
     "/users/{user_id}",
     response_model=UserDetailsResponse,
@@ -1,22 +1,32 @@
 import redis.asyncio as redis
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Sequence, Tuple
 from core.config import get_settings
 from core.exceptions import InternalServerError
+from core.tracing import record_cache_lookup
+from core.cache_config import CacheKeyPatterns, CacheSettings, GenerationScopes, get_lock_ttl, should_use_lock
+from caching.local_cache import LocalCache, MISS
+from caching.circuit_breaker import CircuitBreaker, CircuitOpenError
+from caching.codec import cache_codec, is_compressed, is_frame
 import json
 import logging
 import gzip
+import math
+import random
 import time
 from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from user_profile.models.Follower import Follower
-from datetime import datetime
 import asyncio
+import contextvars
+import secrets
 from contextlib import asynccontextmanager
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 CACHE_VERSION = "v2"
+# Pub/sub channel carrying L1 evictions between instances
+L1_INVALIDATION_CHANNEL = "l1_invalidate"
 
 # Cache monitoring metrics
 class CacheMetrics:
@@ -26,13 +36,22 @@ class CacheMetrics:
         self.errors = 0
         self.operations = defaultdict(int)
         self.compression_savings = 0
+        self.stale_serves = 0
+        self.hard_misses = 0
+        self.revalidations = 0
+        self.revalidation_failures = 0
+        self.early_refreshes = 0
+        self.coalesced = 0
+        self.cross_process_waits = 0
+        self.cross_process_wait_hits = 0
+        self.generation_bumps = 0
         self.last_reset = time.time()
         
-    def record_hit(self):
-        self.hits += 1
+    def record_hit(self, count: int = 1):
+        self.hits += count
         
-    def record_miss(self):
-        self.misses += 1
+    def record_miss(self, count: int = 1):
+        self.misses += count
         
     def record_error(self):
         self.errors += 1
@@ -42,6 +61,32 @@ class CacheMetrics:
         
     def record_compression_savings(self, original_size: int, compressed_size: int):
         self.compression_savings += (original_size - compressed_size)
+
+    def record_stale_serve(self):
+        self.stale_serves += 1
+
+    def record_hard_miss(self):
+        self.hard_misses += 1
+
+    def record_early_refresh(self):
+        self.early_refreshes += 1
+
+    def record_coalesced(self):
+        self.coalesced += 1
+
+    def record_cross_process_wait(self, hit: bool):
+        self.cross_process_waits += 1
+        if hit:
+            self.cross_process_wait_hits += 1
+
+    def record_generation_bumps(self, count: int):
+        self.generation_bumps += count
+
+    def record_revalidation(self, success: bool):
+        if success:
+            self.revalidations += 1
+        else:
+            self.revalidation_failures += 1
         
     def get_hit_ratio(self) -> float:
         total = self.hits + self.misses
@@ -53,6 +98,15 @@ class CacheMetrics:
         self.errors = 0
         self.operations.clear()
         self.compression_savings = 0
+        self.stale_serves = 0
+        self.hard_misses = 0
+        self.revalidations = 0
+        self.revalidation_failures = 0
+        self.early_refreshes = 0
+        self.coalesced = 0
+        self.cross_process_waits = 0
+        self.cross_process_wait_hits = 0
+        self.generation_bumps = 0
         self.last_reset = time.time()
         
     def get_stats(self) -> dict:
@@ -63,33 +117,50 @@ class CacheMetrics:
             "hit_ratio": self.get_hit_ratio(),
             "operations": dict(self.operations),
             "compression_savings_bytes": self.compression_savings,
+            "stale_serves": self.stale_serves,
+            "hard_misses": self.hard_misses,
+            "revalidations": self.revalidations,
+            "revalidation_failures": self.revalidation_failures,
+            "early_refreshes": self.early_refreshes,
+            "coalesced_computations": self.coalesced,
+            "cross_process_waits": self.cross_process_waits,
+            "cross_process_wait_hits": self.cross_process_wait_hits,
+            "generation_bumps": self.generation_bumps,
             "uptime_seconds": time.time() - self.last_reset
         }
 
 # Global metrics instance
 cache_metrics = CacheMetrics()
 
+# Values written with a soft expiry are wrapped as {SWR_MARKER: 1, "value": ..., "soft_expires_at": ...}
+SWR_MARKER = "__swr__"
+# Values written by get_or_compute are wrapped as {XFETCH_MARKER: 1, "value": ..., "delta": ..., "expiry": ...}
+XFETCH_MARKER = "__xf__"
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, dict) and (SWR_MARKER in value or XFETCH_MARKER in value):
+        return value.get("value")
+    return value
+
+def jittered_ttl(ttl: int, jitter: Optional[float] = None) -> int:
+    """TTL spread by up to +/- jitter (a fraction), so keys written together expire apart"""
+    jitter = settings.CACHE_TTL_JITTER if jitter is None else jitter
+    spread = int(ttl * jitter)
+    return max(1, ttl + random.randint(-spread, spread)) if spread else ttl
+
+async def _already_stored(value: Any) -> None:
+    """store= for computations that write their own cache entry"""
+
 def versioned_key(key: str) -> str:
     return f"{CACHE_VERSION}:{key}"
 
-def should_compress(data: str, threshold: int = 1024) -> bool:
-    """Determine if data should be compressed based on size"""
-    return len(data.encode('utf-8')) > threshold
-
-def compress_data(data: str) -> bytes:
-    """Compress string data using gzip"""
-    return gzip.compress(data.encode('utf-8'))
+def generation_key(scope: str) -> str:
+    return f"gen:{scope}"
 
 def decompress_data(data: bytes) -> str:
-    """Decompress gzip data back to string"""
+    """Decompress gzip data back to string (values written before the frame codec)"""
     return gzip.decompress(data).decode('utf-8')
 
-class DateTimeEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
 
 class CacheService:
     def __init__(self):
@@ -97,7 +168,31 @@ class CacheService:
         self._connected = False
         self._connection_pool: Optional[redis.ConnectionPool] = None
         self.compression_enabled = True
-        self.compression_threshold = 1024  # bytes
+        self.compression_threshold = cache_codec.threshold  # bytes
+        self._scripts: dict = {}
+        self._background_tasks: set = set()
+        self._inflight: dict = {}
+        # Last measured compute time per key namespace, for keys with no recorded cost yet
+        self._compute_costs: dict = {}
+        self.local_cache = LocalCache(CacheSettings.L1_MAX_ENTRIES, CacheSettings.L1_MAX_BYTES)
+        if settings.L1_CACHE_ENABLED:
+            for namespace, ttl in CacheSettings.L1_NAMESPACES.items():
+                self.local_cache.enable(namespace, ttl)
+        self._instance_id = secrets.token_hex(8)
+        self._l1_listener: Optional[asyncio.Task] = None
+        # L1 is only read while this instance is subscribed to evictions
+        self._l1_live = False
+        self.breaker = CircuitBreaker(
+            self._probe,
+            window_seconds=settings.REDIS_CIRCUIT_WINDOW_SECONDS,
+            min_calls=settings.REDIS_CIRCUIT_MIN_CALLS,
+            failure_rate=settings.REDIS_CIRCUIT_FAILURE_RATE,
+            slow_call_ms=settings.REDIS_CIRCUIT_SLOW_CALL_MS,
+            slow_rate=settings.REDIS_CIRCUIT_SLOW_RATE,
+            probe_interval=settings.REDIS_CIRCUIT_PROBE_INTERVAL,
+            half_open_calls=settings.REDIS_CIRCUIT_HALF_OPEN_CALLS,
+            enabled=settings.REDIS_CIRCUIT_ENABLED,
+        )
 
     async def connect(self) -> None:
         if self._connected:
@@ -108,8 +203,8 @@ class CacheService:
                 max_connections=100,
                 retry_on_timeout=True,
                 retry_on_error=[redis.BusyLoadingError, redis.ConnectionError],
-                socket_timeout=5,
-                socket_connect_timeout=5,
+                socket_timeout=settings.REDIS_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_TIMEOUT,
                 socket_keepalive=True,
                 socket_keepalive_options={},
                 health_check_interval=30,
@@ -120,7 +215,7 @@ class CacheService:
             )
             self._redis = redis.Redis(
                 connection_pool=self._connection_pool,
-                socket_timeout=5,
+                socket_timeout=settings.REDIS_TIMEOUT,
                 retry_on_timeout=True,
                 retry_on_error=[redis.BusyLoadingError, redis.ConnectionError],
                 health_check_interval=30,
@@ -128,11 +223,21 @@ class CacheService:
             await self._redis.ping()
             self._connected = True
             logger.info("Connected to Redis with optimized pool")
+            if self.local_cache.get_stats()["namespaces"] and self._l1_listener is None:
+                self._l1_listener = asyncio.create_task(
+                    self._listen_for_l1_invalidations(), context=contextvars.Context()
+                )
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise InternalServerError(f"Cache service unavailable: {e}")
 
     async def disconnect(self) -> None:
+        await self.breaker.stop()
+        if self._l1_listener is not None:
+            self._l1_listener.cancel()
+            self._l1_listener = None
+            self._l1_live = False
+            self.local_cache.clear()
         if self._redis and self._connected:
             await self._redis.close()
             if self._connection_pool:
@@ -142,244 +247,341 @@ class CacheService:
 
     @asynccontextmanager
     async def _redis_operation(self, operation_name: str):
-        max_retries = 3
-        retry_delay = 0.1
-        for attempt in range(max_retries):
+        """Guard one Redis call with the circuit breaker.
+
+        Refused with CircuitOpenError while the circuit is open; otherwise the call's
+        outcome and latency are recorded. Failures are not retried here: against a
+        degraded Redis retries only add their delays to every request.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Redis circuit open, skipped {operation_name}")
+        async with self._record_outcome(operation_name):
+            if not self._connected:
+                await self.connect()
+            yield
+
+    @asynccontextmanager
+    async def _record_outcome(self, operation_name: str):
+        """Report the enclosed Redis call's outcome and latency to the circuit breaker"""
+        start = time.perf_counter()
+        try:
+            yield
+        except (redis.ConnectionError, redis.TimeoutError, InternalServerError, OSError) as e:
+            self.breaker.record_failure(e)
+            logger.error(f"Redis {operation_name} failed: {e}")
+            raise
+        except Exception as e:
+            # Command errors (wrong type, script errors) say nothing about availability
+            self.breaker.record_success(time.perf_counter() - start)
+            logger.error(f"Redis {operation_name} error: {e}")
+            raise
+        else:
+            self.breaker.record_success(time.perf_counter() - start)
+
+    async def _probe(self) -> None:
+        """Circuit breaker probe: reconnect if needed, then PING with a short timeout"""
+        if not self._connected:
+            await self.connect()
+        await asyncio.wait_for(self._redis.ping(), timeout=settings.REDIS_CIRCUIT_PROBE_TIMEOUT)
+
+    async def _listen_for_l1_invalidations(self) -> None:
+        """Evict L1 entries written or deleted by other instances"""
+        channel = versioned_key(L1_INVALIDATION_CHANNEL)
+        while self._connected:
+            pubsub = self._redis.pubsub()
             try:
-                if not self._connected:
-                    await self.connect()
-                yield
-                return
-            except (redis.ConnectionError, redis.TimeoutError) as e:
-                if attempt < max_retries - 1:
-                    logger.warning(
-                        f"Redis {operation_name} attempt {attempt + 1} failed, retrying: {e}"
-                    )
-                    await asyncio.sleep(retry_delay * (2**attempt))
-                else:
-                    logger.error(
-                        f"Redis {operation_name} failed after {max_retries} attempts: {e}"
-                    )
-                    raise
-            except Exception as e:
-                logger.error(f"Redis {operation_name} error: {e}")
+                await pubsub.subscribe(channel)
+                # Evictions published while we were not subscribed are lost
+                self.local_cache.clear()
+                self._l1_live = True
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("origin") != self._instance_id:
+                        self.local_cache.invalidate(data.get("keys", ()), data.get("patterns", ()))
+            except asyncio.CancelledError:
                 raise
+            except Exception as e:
+                logger.warning(f"L1 invalidation listener failed, L1 disabled until resubscribed: {e}")
+                self._l1_live = False
+                self.local_cache.clear()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _invalidate_l1(self, keys=(), patterns=()) -> None:
+        """Evict keys/patterns from this instance's L1 and tell the other instances"""
+        keys = [k for k in keys if k and self.local_cache.is_cached_namespace(k)]
+        patterns = [p for p in patterns if self.local_cache.is_cached_namespace(p)]
+        if not keys and not patterns:
+            return
+        self.local_cache.invalidate(keys, patterns)
+        if self.breaker.bypass():
+            return
+        try:
+            message = json.dumps({"origin": self._instance_id, "keys": keys, "patterns": patterns})
+            await self._redis.publish(versioned_key(L1_INVALIDATION_CHANNEL), message)
+        except Exception as e:
+            logger.error(f"Failed to publish L1 invalidation for {keys or patterns}: {e}")
+
+    @asynccontextmanager
+    async def pipeline(self, operation_name: str = "pipeline", transaction: bool = False):
+        """Raw Redis pipeline for structured data (sorted sets, hashes, sets).
+
+        Keys are not versioned automatically - wrap them with ``versioned_key``.
+        The caller is responsible for awaiting ``pipe.execute()``. Only ``execute``
+        is timed for the circuit breaker, so whatever else the caller awaits inside
+        the block is not counted as Redis latency. A block that ends without reaching
+        Redis gives its half-open trial slot back.
+
+        Raises CircuitOpenError while the circuit is open, and Redis errors from
+        ``execute``. Neither is handled here: a caller that has a database path
+        must catch them itself.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Redis circuit open, skipped {operation_name}")
+        recorded = False
+        try:
+            if not self._connected:
+                recorded = True
+                async with self._record_outcome(operation_name):
+                    await self.connect()
+            cache_metrics.record_operation(operation_name)
+            pipe = self._redis.pipeline(transaction=transaction)
+            execute = pipe.execute
+
+            async def timed_execute(*args, **kwargs):
+                nonlocal recorded
+                recorded = True
+                async with self._record_outcome(operation_name):
+                    return await execute(*args, **kwargs)
+
+            pipe.execute = timed_execute
+            yield pipe
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+    async def get_script(self, name: str, source: str):
+        """Register a Lua script once per process and return the callable"""
+        script = self._scripts.get(name)
+        if script is None:
+            if not self._connected:
+                await self.connect()
+            script = self._redis.register_script(source)
+            self._scripts[name] = script
+        return script
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None, compress: Optional[bool] = None) -> bool:
+        if self.breaker.bypass():
+            return False
+        original_key = key
         try:
             async with self._redis_operation("set"):
                 cache_metrics.record_operation("set")
                 
-                original_key = key
                 key = versioned_key(key)
-                
-                # Serialize the value
-                if isinstance(value, (dict, list)):
-                    serialized_value = json.dumps(
-                        value, separators=(",", ":"), cls=DateTimeEncoder
-                    )
-                elif isinstance(value, str):
-                    serialized_value = value
-                else:
-                    serialized_value = json.dumps(
-                        value, separators=(",", ":"), cls=DateTimeEncoder
-                    )
-                
-                # Determine if compression should be used
-                use_compression = compress if compress is not None else (
-                    self.compression_enabled and should_compress(serialized_value, self.compression_threshold)
-                )
-                
-                store_value = serialized_value
-                compression_flag = "0"  # 0 = not compressed, 1 = compressed
-                
-                if use_compression:
-                    try:
-                        original_size = len(serialized_value.encode('utf-8'))
-                        compressed_data = compress_data(serialized_value)
-                        compressed_size = len(compressed_data)
-                        
-                        # Only use compression if it actually saves space
-                        if compressed_size < original_size * 0.9:  # At least 10% savings
-                            store_value = compressed_data
-                            compression_flag = "1"
-                            cache_metrics.record_compression_savings(original_size, compressed_size)
-                            logger.debug(f"Compressed cache data for key {original_key}: {original_size} -> {compressed_size} bytes")
-                    except Exception as e:
-                        logger.warning(f"Compression failed for key {original_key}, storing uncompressed: {e}")
-                
-                # Store with compression flag prefix
-                final_value = f"{compression_flag}:{store_value}" if isinstance(store_value, str) else store_value
-                
-                pipe = self._redis.pipeline()
+                data = self._encode(value, compress)
                 if ttl:
-                    if isinstance(final_value, bytes):
-                        # For compressed data, we need to handle bytes differently
-                        # Prepend compression flag to compressed bytes
-                        final_bytes = b"1:" + final_value
-                        await self._redis.setex(key, ttl, final_bytes)
-                    else:
-                        # Encode string to bytes before storing
-                        pipe.setex(key, ttl, final_value.encode('utf-8'))
+                    result = await self._redis.set(key, data, ex=ttl)
                 else:
-                    if isinstance(final_value, bytes):
-                        # Prepend compression flag to compressed bytes
-                        final_bytes = b"1:" + final_value
-                        await self._redis.set(key, final_bytes)
-                    else:
-                        # Encode string to bytes before storing
-                        pipe.set(key, final_value.encode('utf-8'))
-                
-                if not isinstance(final_value, bytes):
-                    results = await pipe.execute()
-                    return bool(results[0])
-                return True
+                    result = await self._redis.set(key, data)
+                await self._invalidate_l1(keys=[original_key])
+                return bool(result)
                 
+        except CircuitOpenError:
+            # Half-open with every trial call in flight
+            return False
         except Exception as e:
             cache_metrics.record_error()
             logger.error(f"Cache set error for key {original_key}: {e}")
             return False
 
     async def get(self, key: str) -> Optional[Any]:
+        return _unwrap(await self._get_stored(key))
+
+    async def _get_stored(self, key: str) -> Optional[Any]:
+        original_key = key
+        use_l1 = self._l1_live and self.local_cache.namespace_ttl(key) is not None
+        if use_l1:
+            local_value = self.local_cache.get(key)
+            if local_value is not MISS:
+                cache_metrics.record_hit()
+                record_cache_lookup(1)
+                return local_value
+        if self.breaker.bypass():
+            cache_metrics.record_miss()
+            record_cache_lookup(0, 1)
+            return None
         try:
             async with self._redis_operation("get"):
                 cache_metrics.record_operation("get")
                 
-                original_key = key
                 key = versioned_key(key)
                 value = await self._redis.get(key)
                 
                 if value is None:
                     cache_metrics.record_miss()
+                    record_cache_lookup(0, 1)
                     return None
                 
                 cache_metrics.record_hit()
-                
-                # Handle compressed data
-                if isinstance(value, bytes):
-                    # Check for compression flag in binary data
-                    if value.startswith(b"1:"):
-                        # This is compressed data
-                        try:
-                            compressed_data = value[2:]  # Skip the "1:" prefix
-                            decompressed_value = decompress_data(compressed_data)
-                            return json.loads(decompressed_value)
-                        except Exception as e:
-                            logger.warning(f"Failed to decompress cache data for key {original_key}: {e}")
-                            return None
-                    else:
-                        # Try to decode as UTF-8 string
-                        try:
-                            decoded_value = value.decode('utf-8')
-                            if decoded_value.startswith(("0:", "1:")):
-                                # Check for compression flag
-                                compression_flag, actual_value = decoded_value.split(":", 1)
-                                if compression_flag == "1":
-                                    # This should not happen as compressed data should be bytes
-                                    logger.warning(f"Unexpected compressed string data for key {original_key}")
-                                    return None
-                                else:
-                                    # Uncompressed data
-                                    try:
-                                        return json.loads(actual_value)
-                                    except json.JSONDecodeError:
-                                        return actual_value
-                            else:
-                                # Legacy data without compression flag
-                                try:
-                                    return json.loads(decoded_value)
-                                except json.JSONDecodeError:
-                                    return decoded_value
-                        except UnicodeDecodeError:
-                            logger.error(f"Failed to decode cache data for key {original_key}")
-                            return None
-                else:
-                    # This shouldn't happen with decode_responses=False
-                    logger.warning(f"Unexpected string value from Redis for key {original_key}")
-                    return None
+                record_cache_lookup(1)
+                decoded = self._decode(value, original_key)
+                if use_l1:
+                    self.local_cache.set(original_key, decoded, len(value))
+                return decoded
                         
+        except CircuitOpenError:
+            cache_metrics.record_miss()
+            record_cache_lookup(0, 1)
+            return None
         except Exception as e:
             cache_metrics.record_error()
             logger.error(f"Cache get error for key {original_key}: {e}")
             return None
 
+    def _encode(self, value: Any, compress: Optional[bool] = None) -> bytes:
+        if compress is None and not self.compression_enabled:
+            compress = False
+        frame, raw_size = cache_codec.encode(value, compress)
+        if is_compressed(frame):
+            cache_metrics.record_compression_savings(raw_size, len(frame) - 1)
+        return frame
+
+    def _decode(self, value: Any, original_key: str) -> Optional[Any]:
+        if isinstance(value, bytes) and is_frame(value):
+            try:
+                return cache_codec.decode(value)
+            except Exception as e:
+                logger.warning(f"Failed to decode cache frame for key {original_key}: {e}")
+                return None
+        # Values written before the frame codec: "1:" + gzip, "0:" + JSON or bare JSON
+        if isinstance(value, bytes):
+            # Check for compression flag in binary data
+            if value.startswith(b"1:"):
+                # This is compressed data
+                try:
+                    compressed_data = value[2:]  # Skip the "1:" prefix
+                    decompressed_value = decompress_data(compressed_data)
+                    return json.loads(decompressed_value)
+                except Exception as e:
+                    logger.warning(f"Failed to decompress cache data for key {original_key}: {e}")
+                    return None
+            else:
+                # Try to decode as UTF-8 string
+                try:
+                    decoded_value = value.decode('utf-8')
+                    if decoded_value.startswith(("0:", "1:")):
+                        # Check for compression flag
+                        compression_flag, actual_value = decoded_value.split(":", 1)
+                        if compression_flag == "1":
+                            # This should not happen as compressed data should be bytes
+                            logger.warning(f"Unexpected compressed string data for key {original_key}")
+                            return None
+                        else:
+                            # Uncompressed data
+                            try:
+                                return json.loads(actual_value)
+                            except json.JSONDecodeError:
+                                return actual_value
+                    else:
+                        # Legacy data without compression flag
+                        try:
+                            return json.loads(decoded_value)
+                        except json.JSONDecodeError:
+                            return decoded_value
+                except UnicodeDecodeError:
+                    logger.error(f"Failed to decode cache data for key {original_key}")
+                    return None
+        else:
+            # This shouldn't happen with decode_responses=False
+            logger.warning(f"Unexpected string value from Redis for key {original_key}")
+            return None
+
     async def mget(self, keys: List[str]) -> List[Optional[Any]]:
-        try:
-            async with self._redis_operation("mget"):
-                versioned_keys = [versioned_key(k) for k in keys]
-                values = await self._redis.mget(versioned_keys)
-                results = []
-                for value in values:
+        """Values for keys, in order (None for misses).
+
+        Keys held in L1 are served locally; the rest are read with one MGET per
+        PIPELINE_BATCH keys, all chunks in a single pipeline round trip.
+        """
+        results: List[Optional[Any]] = [None] * len(keys)
+        remote = []
+        for index, key in enumerate(keys):
+            if self._l1_live and self.local_cache.namespace_ttl(key) is not None:
+                local_value = self.local_cache.get(key)
+                if local_value is not MISS:
+                    results[index] = local_value
+                    continue
+            remote.append(index)
+        hits = len(keys) - len(remote)
+        if remote and not self.breaker.bypass():
+            try:
+                async with self._redis_operation("mget"):
+                    cache_metrics.record_operation("mget")
+                    batch = CacheSettings.PIPELINE_BATCH
+                    pipe = self._redis.pipeline(transaction=False)
+                    for start in range(0, len(remote), batch):
+                        pipe.mget([versioned_key(keys[i]) for i in remote[start:start + batch]])
+                    values = [value for chunk in await pipe.execute() for value in chunk]
+                for index, value in zip(remote, values):
                     if value is None:
-                        results.append(None)
-                    else:
-                        # Handle binary data
-                        if isinstance(value, bytes):
-                            try:
-                                decoded_value = value.decode('utf-8')
-                                if decoded_value.startswith(("0:", "1:")):
-                                    compression_flag, actual_value = decoded_value.split(":", 1)
-                                    if compression_flag == "0":
-                                        try:
-                                            results.append(json.loads(actual_value))
-                                        except json.JSONDecodeError:
-                                            results.append(actual_value)
-                                    else:
-                                        # Should not happen - compressed data should use binary prefix
-                                        results.append(None)
-                                else:
-                                    try:
-                                        results.append(json.loads(decoded_value))
-                                    except json.JSONDecodeError:
-                                        results.append(decoded_value)
-                            except UnicodeDecodeError:
-                                # Try as compressed data
-                                if value.startswith(b"1:"):
-                                    try:
-                                        compressed_data = value[2:]
-                                        decompressed_value = decompress_data(compressed_data)
-                                        results.append(json.loads(decompressed_value))
-                                    except Exception:
-                                        results.append(None)
-                                else:
-                                    results.append(None)
-                        else:
-                            results.append(None)
-                return results
-        except Exception as e:
-            logger.error(f"Cache mget error for keys {keys}: {e}")
-            return [None] * len(keys)
+                        continue
+                    hits += 1
+                    key = keys[index]
+                    results[index] = self._decode(value, key)
+                    if self._l1_live and self.local_cache.namespace_ttl(key) is not None:
+                        self.local_cache.set(key, results[index], len(value))
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                cache_metrics.record_error()
+                logger.error(f"Cache mget error for {len(remote)} keys: {e}")
+        cache_metrics.record_hit(hits)
+        cache_metrics.record_miss(len(keys) - hits)
+        record_cache_lookup(hits, len(keys) - hits)
+        return [_unwrap(result) for result in results]
+
+    async def mset(
+        self,
+        mapping: dict,
+        ttl: Optional[int] = None,
+        ttls: Optional[dict] = None,
+        compress: Optional[bool] = None,
+    ) -> bool:
+        """Write many values in one pipeline round trip: one SET ... EX per key.
 
-    async def mset(self, mapping: dict, ttl: Optional[int] = None) -> bool:
+        ``ttls`` gives a TTL per key and falls back to ``ttl`` for keys it does not
+        list; values are encoded (and compressed) like ``set``.
+        """
+        if not mapping:
+            return True
+        if self.breaker.bypass():
+            return False
+        ttls = ttls or {}
         try:
             async with self._redis_operation("mset"):
-                versioned_mapping = {}
+                cache_metrics.record_operation("mset")
+                pipe = self._redis.pipeline(transaction=False)
                 for key, value in mapping.items():
-                    versioned_key_name = versioned_key(key)
-                    if isinstance(value, (dict, list)):
-                        serialized_value = json.dumps(
-                            value, separators=(",", ":"), cls=DateTimeEncoder
-                        )
-                    elif isinstance(value, str):
-                        serialized_value = value
-                    else:
-                        serialized_value = json.dumps(
-                            value, separators=(",", ":"), cls=DateTimeEncoder
-                        )
-                    # Encode to bytes with compression flag
-                    versioned_mapping[versioned_key_name] = f"0:{serialized_value}".encode('utf-8')
-                pipe = self._redis.pipeline()
-                pipe.mset(versioned_mapping)
-                if ttl:
-                    for key in versioned_mapping.keys():
-                        pipe.expire(key, ttl)
+                    pipe.set(versioned_key(key), self._encode(value, compress), ex=ttls.get(key, ttl) or None)
                 results = await pipe.execute()
-                return bool(results[0])
+                await self._invalidate_l1(keys=list(mapping))
+                return all(results)
         except Exception as e:
+            cache_metrics.record_error()
             logger.error(f"Cache mset error: {e}")
             return False
 
     async def delete(self, *keys: str) -> int:
+        await self._invalidate_l1(keys=keys)
+        if self.breaker.bypass():
+            return 0
         try:
             async with self._redis_operation("delete"):
                 versioned_keys = [versioned_key(k) for k in keys if k]
@@ -399,6 +601,8 @@ class CacheService:
             return 0
 
     async def exists(self, key: str) -> bool:
+        if self.breaker.bypass():
+            return False
         try:
             async with self._redis_operation("exists"):
                 key = versioned_key(key)
@@ -417,6 +621,8 @@ class CacheService:
             return []
 
     async def delete_pattern(self, pattern: str) -> int:
+        prefix = f"{CACHE_VERSION}:"
+        await self._invalidate_l1(patterns=[pattern[len(prefix):] if pattern.startswith(prefix) else pattern])
         try:
             async with self._redis_operation("delete_pattern"):
                 if not pattern.startswith(CACHE_VERSION):
@@ -438,6 +644,83 @@ class CacheService:
             logger.error(f"Cache delete_pattern error for pattern {pattern}: {e}")
             return 0
 
+    async def generations(self, *scopes: str) -> List[int]:
+        """Current generation of each scope (0 until first bumped), one MGET for those not in L1"""
+        values = {}
+        missing = []
+        for scope in scopes:
+            if self._l1_live:
+                local_value = self.local_cache.get(generation_key(scope))
+                if local_value is not MISS:
+                    values[scope] = local_value
+                    continue
+            missing.append(scope)
+        if missing and self.breaker.bypass():
+            # Keys built meanwhile are never read from Redis anyway
+            for scope in missing:
+                values[scope] = 0
+            missing = []
+        if missing:
+            try:
+                async with self._redis_operation("generations"):
+                    cache_metrics.record_operation("generations")
+                    stored = await self._redis.mget([versioned_key(generation_key(s)) for s in missing])
+                for scope, raw in zip(missing, stored):
+                    values[scope] = int(raw) if raw is not None else 0
+                    if self._l1_live:
+                        self.local_cache.set(generation_key(scope), values[scope], 64)
+            except Exception as e:
+                cache_metrics.record_error()
+                logger.error(f"Cache generations error for scopes {missing}: {e}")
+                for scope in missing:
+                    values.setdefault(scope, 0)
+        return [values[scope] for scope in scopes]
+
+    async def gen_key(self, base: str, *scopes: str) -> str:
+        """base with the current generation of each scope appended.
+
+        Bumping any of the scopes moves readers to a new key; the entries under the
+        old key are never read again and expire through their own TTL.
+        """
+        (key,) = await self.gen_keys([(base, scopes)])
+        return key
+
+    async def gen_keys(self, specs: Sequence[Tuple[str, Sequence[str]]]) -> List[str]:
+        """``gen_key`` for several (base, scopes) pairs with one generations read"""
+        scopes = list(dict.fromkeys(scope for _, key_scopes in specs for scope in key_scopes))
+        gens = dict(zip(scopes, await self.generations(*scopes)))
+        return [
+            f"{base}:g{'.'.join(str(gens[scope]) for scope in key_scopes)}"
+            for base, key_scopes in specs
+        ]
+
+    async def bump_generation(self, *scopes: str) -> None:
+        """Invalidate every key built on these scopes with one INCR per scope, pipelined"""
+        scopes = list(dict.fromkeys(s for s in scopes if s))
+        if not scopes:
+            return
+        keys = [generation_key(s) for s in scopes]
+        # Counters expire when idle; a counter created again starts from the clock,
+        # above any value it had before, so it cannot return to an old generation
+        seed = int(time.time())
+        if self.breaker.bypass():
+            return
+        try:
+            async with self._redis_operation("bump_generation"):
+                cache_metrics.record_operation("bump_generation")
+                for i in range(0, len(keys), CacheSettings.GENERATION_BUMP_BATCH):
+                    pipe = self._redis.pipeline(transaction=False)
+                    for key in keys[i : i + CacheSettings.GENERATION_BUMP_BATCH]:
+                        pipe.set(versioned_key(key), seed, nx=True)
+                        pipe.incr(versioned_key(key))
+                        pipe.expire(versioned_key(key), CacheSettings.GENERATION_TTL)
+                    await pipe.execute()
+            cache_metrics.record_generation_bumps(len(keys))
+        except Exception as e:
+            cache_metrics.record_error()
+            logger.error(f"Failed to bump cache generations {scopes}: {e}")
+        await self._invalidate_l1(keys=keys)
+
     async def get_cache_stats(self) -> dict:
         try:
             async with self._redis_operation("get_cache_stats"):
@@ -466,165 +749,67 @@ class CacheService:
             return {"error": str(e)}
 
     async def invalidate_admin_cache(self) -> None:
-        try:
-            patterns = [
-                "admin:all_users:*",
-                "admin:blocked_users:*",
-                "admin:user_stats:*",
-                "admin:tweet_stats:*",
-                "admin_search_users:*",
-                "admin_user_type_stats*",
-                "admin_user_activity_stats*",
-                "admin_tweet_reports:*",
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            total_deleted = sum(r for r in results if isinstance(r, int))
-            logger.info(f"Invalidated admin caches: {total_deleted} keys deleted")
-        except Exception as e:
-            logger.error(f"Failed to invalidate admin caches: {e}")
+        await self.bump_generation(GenerationScopes.GLOBAL_ADMIN)
+        logger.info("Invalidated admin caches")
 
     async def invalidate_user_admin_cache(self, user_id: str) -> None:
-        try:
-            patterns = [
-                f"admin:user:{user_id}:*",
-                f"admin:user_stats:{user_id}:*",
-                f"admin:tweet_stats:{user_id}:*",
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            await self.invalidate_admin_cache()
-        except Exception as e:
-            logger.error(f"Failed to invalidate admin caches for user {user_id}: {e}")
+        # Admin listings are not keyed per user; any user change refreshes them all
+        await self.invalidate_admin_cache()
 
     async def invalidate_user_cache(self, user_id: str) -> None:
-        try:
-            patterns = [
-                f"user:{user_id}:*",
-                f"user:{user_id}",
-                f"profile:{user_id}:*",
-                f"profile:{user_id}",
-                f"token:{user_id}:*",
-                f"token:{user_id}",
-                f"tweet:{user_id}:*",
-                f"tweet:{user_id}",
-                f"tweet_feed:{user_id}:*",
-                f"tweet_feed:{user_id}",
-                f"recommendations:{user_id}:*",
-                f"recommendations:{user_id}",
-                f"twitter_feed:{user_id}:*",
-                f"twitter_feed:{user_id}",
-                f"following_eggs:{user_id}:*",
-                f"following_eggs:{user_id}",
-                f"user_flags:{user_id}:*",
-                f"user_flags:{user_id}",
-                "user_search:*",
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            total_deleted = sum(r for r in results if isinstance(r, int))
-            await self.invalidate_user_admin_cache(user_id)
-            logger.info(
-                f"Invalidated all caches for user {user_id}: {total_deleted} keys"
-            )
-        except Exception as e:
-            logger.error(f"Failed to invalidate caches for user {user_id}: {e}")
+        await self.bump_generation(
+            GenerationScopes.USER.format(user_id=user_id),
+            GenerationScopes.FEED.format(user_id=user_id),
+            GenerationScopes.GLOBAL_SEARCH,
+            GenerationScopes.GLOBAL_ADMIN,
+        )
+        # Active/blocked status checked on every request (core.dependencies)
+        await self.delete(f"user_status:{user_id}")
+        logger.info(f"Invalidated all caches for user {user_id}")
 
     async def invalidate_user_tokens(self, user_id: str) -> None:
         try:
-            patterns = [f"access_token:{user_id}:*", f"refresh_token:{user_id}:*"]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
+            # Tokens are stored under the bare user id; this also evicts them from L1 everywhere
+            await self.delete(f"access_token:{user_id}", f"refresh_token:{user_id}", f"user_status:{user_id}")
         except Exception as e:
             logger.error(f"Failed to invalidate tokens for user {user_id}: {e}")
 
     async def invalidate_profile_cache(self, user_id: str) -> None:
-        try:
-            patterns = [
-                f"profile:{user_id}:*",
-                f"profile:{user_id}",
-                f"profile:{user_id}:req:*",
-                "user_search:*",
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Invalidated profile cache for user {user_id}")
-        except Exception as e:
-            logger.error(f"Failed to invalidate profile cache for user {user_id}: {e}")
+        await self.bump_generation(
+            GenerationScopes.USER.format(user_id=user_id), GenerationScopes.GLOBAL_SEARCH
+        )
+        logger.info(f"Invalidated profile cache for user {user_id}")
 
     async def invalidate_interests_cache(self, user_id: str) -> None:
-        try:
-            patterns = [f"interests:{user_id}:*", f"user_interests:{user_id}:*"]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Invalidated interests cache for user {user_id}")
-        except Exception as e:
-            logger.error(f"Failed to invalidate interests cache: {e}")
+        # Interests are served as part of the profile
+        await self.bump_generation(GenerationScopes.USER.format(user_id=user_id))
+        logger.info(f"Invalidated interests cache for user {user_id}")
 
     async def invalidate_follow_cache(
         self, follower_id: str = None, followee_id: str = None
     ) -> None:
         """Invalidate follow-related caches."""
-        patterns = []
-        if follower_id:
-            patterns.extend([
-                f"followers:{follower_id}:*",
-                f"following:{follower_id}:*",
-                f"follow_requests:{follower_id}:*",
-                f"mutual_followers:{follower_id}:*",  # Add mutual followers invalidation
-            ])
-        if followee_id:
-            patterns.extend([
-                f"followers:{followee_id}:*",
-                f"following:{followee_id}:*",
-                f"follow_requests:{followee_id}:*", 
-                f"mutual_followers:{followee_id}:*",  # Add mutual followers invalidation
-            ])
         if not follower_id and not followee_id:
-            patterns.extend(["followers:*", "following:*", "follow_requests:*", "mutual_followers:*"])
-        
-        try:
-            deleted = 0
-            for pattern in patterns:
-                result = await self.delete_pattern(pattern)
-                deleted += result
-            logger.info(f"Invalidated {deleted} follow-related cache items")
-        except Exception as e:
-            logger.error(f"Failed to invalidate follow cache: {e}")
-            raise InternalServerError(f"Failed to invalidate follow cache: {e}")
+            # Social graph keys only carry per-user generations; clearing all of them is a sweep
+            for pattern in ["followers:*", "following:*", "follow_requests:*", "mutual_followers:*"]:
+                await self.delete_pattern(pattern)
+            return
+        await self.bump_generation(
+            *(GenerationScopes.USER.format(user_id=uid) for uid in (follower_id, followee_id) if uid)
+        )
+        logger.info(f"Invalidated follow caches for {follower_id} -> {followee_id}")
 
     async def invalidate_tweet_feed_cache(self, user_id: str):
-        try:
-            patterns = [
-                f"tweet_feed:{user_id}:*",
-                f"tweet_feed:{user_id}",
-                f"twitter_feed:{user_id}:*",
-                f"merged_feed:{user_id}:*",
-                f"user_tweets:{user_id}:*",
-                f"liked_tweets:{user_id}:*",
-                f"bookmarked_tweets:{user_id}:*",
-                f"shared_tweets:{user_id}:*",
-                f"twitter_feed:{user_id}",
-                f"recommendations:{user_id}:*",
-                f"recommendations:{user_id}",
-                f"twitter_feed:{user_id}:p*:*",
-                f"engagement_batch:{user_id}:*",  # User-specific engagement cache
-                f"user_flags:{user_id}:*",
-                f"following_optimized:{user_id}:*",
-                f"engagement_velocity:{user_id}:*",  # User-specific velocity cache
-                f"media_batch:{user_id}:*",  # User-specific media cache
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Invalidated tweet feed cache for user {user_id}")
-        except Exception as e:
-            logger.error(f"Failed to invalidate tweet feed cache: {e}")
+        await self.bump_generation(GenerationScopes.FEED.format(user_id=user_id))
+        logger.info(f"Invalidated tweet feed cache for user {user_id}")
 
     async def invalidate_feed_for_followers(self, db: AsyncSession, user_id: str):
         try:
-            followers_cache_key = f"followers:user:{user_id}"
+            followers_cache_key = await self.gen_key(
+                f"followers:user:{user_id}", GenerationScopes.USER.format(user_id=user_id)
+            )
             follower_ids = await self.get(followers_cache_key)
-            if not follower_ids:
+            if follower_ids is None:
                 followers_result = await db.execute(
                     select(Follower.follower_id)
                     .where(Follower.followee_id == user_id)
@@ -633,17 +818,10 @@ class CacheService:
                 follower_ids = [row[0] for row in followers_result.all()]
                 await self.set(followers_cache_key, follower_ids, ttl=300)
             if follower_ids:
-                chunk_size = 50
-                tasks = []
-                for i in range(0, len(follower_ids), chunk_size):
-                    chunk = follower_ids[i : i + chunk_size]
-                    chunk_tasks = [
-                        self.invalidate_tweet_feed_cache(fid) for fid in chunk
-                    ]
-                    tasks.extend(chunk_tasks)
-                for i in range(0, len(tasks), 20):
-                    batch = tasks[i : i + 20]
-                    await asyncio.gather(*batch, return_exceptions=True)
+                # One INCR per follower, sent in a few pipelined round trips
+                await self.bump_generation(
+                    *(GenerationScopes.FEED.format(user_id=fid) for fid in follower_ids)
+                )
                 logger.info(
                     f"Invalidated feed cache for {len(follower_ids)} followers of user {user_id}"
                 )
@@ -653,78 +831,28 @@ class CacheService:
             )
 
     async def invalidate_twitter_recommendation_cache(self):
-        try:
-            patterns = [
-                "twitter_feed:*",
-                "recommendation_global:*",
-                "trending_tweets:*",
-                "priority_users:*",
-                "all_user_metadata:*",
-                "engagement_batch:*",
-                "engagement_velocity:*",
-                "media_batch:*",
-                "following_optimized:*",
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info("Invalidated global Twitter recommendation caches")
-        except Exception as e:
-            logger.error(f"Failed to invalidate Twitter recommendation cache: {e}")
+        await self.bump_generation(GenerationScopes.GLOBAL_FEED)
+        logger.info("Invalidated global Twitter recommendation caches")
 
     async def invalidate_engagement_cache(self, tweet_id: int):
-        try:
-            patterns = [
-                f"engagement_batch:*",  # Keep global pattern for broad invalidation
-                f"engagement_velocity:*",
-                f"tweet_response:{tweet_id}:*",
-                f"tweet_likes:{tweet_id}:*",
-                f"tweet_comments:{tweet_id}:*",
-                f"tweet_bookmarks:{tweet_id}:*",
-                f"tweet_shares:{tweet_id}:*",
-                f"tweet_stats:{tweet_id}:*",
-                f"comment_count:{tweet_id}:*",
-                f"like_count:{tweet_id}:*",
-            ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Invalidated engagement cache for tweet {tweet_id}")
-        except Exception as e:
-            logger.error(
-                f"Failed to invalidate engagement cache for tweet {tweet_id}: {e}"
-            )
+        await self.bump_generation(GenerationScopes.TWEET.format(tweet_id=tweet_id))
+        logger.info(f"Invalidated engagement cache for tweet {tweet_id}")
 
     async def invalidate_merged_feed_cache(self, user_id: str):
         await self.invalidate_tweet_feed_cache(user_id)
 
     async def invalidate_user_recommendations_cache(self, user_id: str = None):
-        try:
-            if user_id:
-                patterns = [
-                    f"recommendations:{user_id}:*",
-                    f"recommendations:{user_id}",
-                ]
-            else:
-                patterns = ["recommendations:*", "recommended_users:*"]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-        except Exception as e:
-            logger.error(f"Failed to invalidate recommendations cache: {e}")
+        if user_id:
+            await self.bump_generation(GenerationScopes.FEED.format(user_id=user_id))
+        else:
+            await self.bump_generation(GenerationScopes.GLOBAL_FEED)
 
     async def invalidate_tweet_media_cache(self, tweet_ids: list = None):
-        try:
-            if tweet_ids:
-                patterns = [
-                    "media_batch:*",
-                ]
-            else:
-                patterns = [
-                    "tweet_media:*", 
-                    "media_batch:*",
-                ]
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-        except Exception as e:
-            logger.error(f"Failed to invalidate tweet media cache: {e}")
+        # Media is served as part of the tweet; nothing is cached under a media key
+        if tweet_ids:
+            await self.bump_generation(
+                *(GenerationScopes.TWEET.format(tweet_id=tweet_id) for tweet_id in tweet_ids)
+            )
 
     async def invalidate_follow_related_feeds(self, follower_id: str, followee_id: str):
         try:
@@ -739,23 +867,31 @@ class CacheService:
 
     async def smart_cache_warm_up(self, user_id: str, db: AsyncSession = None):
         """Intelligent cache warming for frequently accessed user data"""
+        await self.smart_cache_warm_up_many([user_id], db)
+
+    async def smart_cache_warm_up_many(self, user_ids: List[str], db: AsyncSession = None):
+        """Cache warming for several users, checked with one batched read"""
         try:
-            # Critical cache keys for user experience
-            cache_keys = [
-                f"profile:{user_id}",
-                f"following_eggs:{user_id}",
-                f"user_metadata:{user_id}",
-                f"followers:{user_id}:p1:s20",
-                f"following:{user_id}:p1:s20",
-                f"user_flags:{user_id}",
-            ]
-            
-            existing = await self.mget(cache_keys)
-            missing_keys = [
-                key for key, value in zip(cache_keys, existing) if value is None
-            ]
+            # Critical cache keys for user experience, built the way their readers build them
+            specs = {}
+            for user_id in dict.fromkeys(user_ids):
+                user_scope = GenerationScopes.USER.format(user_id=user_id)
+                feed_scope = GenerationScopes.FEED.format(user_id=user_id)
+                specs[user_id] = [
+                    (CacheKeyPatterns.PROFILE.format(user_id=user_id, requester_id=user_id), (user_scope,)),
+                    (f"followers:{user_id}:p1:s20", (user_scope,)),
+                    (f"following:{user_id}:p1:s20", (user_scope,)),
+                    (f"following_optimized:{user_id}", (feed_scope,)),
+                    (f"following_metadata:{user_id}", (feed_scope, GenerationScopes.GLOBAL_FEED)),
+                ]
+            built = iter(await self.gen_keys([spec for user_specs in specs.values() for spec in user_specs]))
+            cache_keys = {user_id: [next(built) for _ in user_specs] for user_id, user_specs in specs.items()}
+            existing = await self.batch_get([key for keys in cache_keys.values() for key in keys])
             
-            if missing_keys:
+            for user_id, keys in cache_keys.items():
+                missing_keys = [key for key in keys if key not in existing]
+                if not missing_keys:
+                    continue
                 logger.info(
                     f"Warming up {len(missing_keys)} cache keys for user {user_id}: {missing_keys}"
                 )
@@ -765,7 +901,7 @@ class CacheService:
                     await self._preload_user_essentials(user_id, db)
                     
         except Exception as e:
-            logger.error(f"Failed to warm up cache for user {user_id}: {e}")
+            logger.error(f"Failed to warm up cache for users {user_ids}: {e}")
 
     async def _preload_user_essentials(self, user_id: str, db: AsyncSession):
         """Preload essential user data to cache"""
@@ -788,20 +924,12 @@ class CacheService:
                 elif op["type"] == "delete":
                     delete_operations.append(op["key"])
             
-            # Batch set operations
+            # Batch set operations, each with its own TTL, in one round trip
             if set_operations:
-                set_mapping = {}
-                ttl_keys = []
-                for key, value, ttl in set_operations:
-                    set_mapping[key] = value
-                    if ttl:
-                        ttl_keys.append((key, ttl))
-                
-                await self.mset(set_mapping)
-                
-                # Apply TTLs
-                for key, ttl in ttl_keys:
-                    await self.set(key, set_mapping[key], ttl)
+                await self.mset(
+                    {key: value for key, value, _ in set_operations},
+                    ttls={key: ttl for key, _, ttl in set_operations if ttl},
+                )
             
             # Batch delete operations
             if delete_operations:
@@ -813,197 +941,286 @@ class CacheService:
             logger.error(f"Failed bulk cache operations: {e}")
 
     async def cache_with_lock(self, key: str, compute_func, ttl: int = 300, lock_ttl: int = 10):
-        """Cache data with distributed lock to prevent cache stampede"""
+        """Cache data with distributed lock to prevent cache stampede.
+
+        Concurrent callers in this process share one computation (single flight);
+        callers in other processes wait for the lock holder's ready notification
+        instead of computing the same value again. Values are refreshed early like
+        ``get_or_compute``, always under the lock.
+        """
+        try:
+            return await self.get_or_compute(key, compute_func, ttl, lock_ttl=lock_ttl)
+        except Exception as e:
+            logger.error(f"Failed cache_with_lock for key {key}: {e}")
+            # Fallback to direct computation
+            return await compute_func()
+
+    async def single_flight(self, key: str, compute_func):
+        """Run compute_func once per key in this process; concurrent callers await the same result"""
+        future = self._inflight.get(key)
+        if future is not None:
+            cache_metrics.record_coalesced()
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
         try:
-            # Try to get from cache first
-            cached_value = await self.get(key)
+            result = await compute_func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a flight without waiters doesn't log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _compute_under_lock(self, key: str, compute_func, lock_ttl: int, ttl: int = None, store=None):
+        """Compute and store key while holding compute:{key}; without the lock wait for its holder"""
+        lock_acquired = await self.acquire_lock(f"compute:{key}", lock_ttl)
+        if not lock_acquired:
+            cached_value = await self._wait_for_value(key, min(lock_ttl, CacheSettings.MAX_LOCK_WAIT_TIME))
             if cached_value is not None:
                 return cached_value
-            
-            # Acquire lock to compute value
-            lock_acquired = await self.acquire_lock(f"compute:{key}", lock_ttl)
-            if not lock_acquired:
-                # Another process is computing, wait briefly and try cache again
-                await asyncio.sleep(0.1)
-                cached_value = await self.get(key)
-                if cached_value is not None:
-                    return cached_value
-                # If still not available, compute anyway (fallback)
-            
+            # The holder failed or is too slow; compute anyway (fallback)
+        try:
+            computed_value = await compute_func()
+            if store is not None:
+                await store(computed_value)
+            else:
+                await self.set(key, computed_value, ttl)
+            return computed_value
+        finally:
+            if lock_acquired:
+                await self.release_lock(f"compute:{key}")
+                await self._notify_ready(key)
+
+    def _ready_channel(self, key: str) -> str:
+        return versioned_key(f"cache_ready:{key}")
+
+    async def _notify_ready(self, key: str) -> None:
+        """Wake processes waiting on key; sent on failure too so they stop waiting"""
+        try:
+            async with self._redis_operation("notify_ready"):
+                await self._redis.publish(self._ready_channel(key), b"1")
+        except Exception as e:
+            logger.warning(f"Failed to publish ready notification for {key}: {e}")
+
+    async def _wait_for_value(self, key: str, timeout: float) -> Optional[Any]:
+        """Wait until the process holding compute:{key} has finished, then read key"""
+        pubsub = None
+        value = None
+        try:
+            async with self._redis_operation("wait_for_value"):
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self._ready_channel(key))
+            # The value may have been stored before the subscription was active
+            value = await self.get(key)
+            if value is None:
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + timeout
+                while (remaining := deadline - loop.time()) > 0:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                    if message is not None:
+                        break
+                value = await self.get(key)
+        except Exception as e:
+            logger.warning(f"Failed waiting for {key}: {e}")
+            value = await self.get(key)
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.unsubscribe()
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+        cache_metrics.record_cross_process_wait(value is not None)
+        return value
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute_func,
+        ttl: int,
+        operation: Optional[str] = None,
+        beta: Optional[float] = None,
+        lock_ttl: Optional[int] = None,
+    ):
+        """Read-through cache with XFetch probabilistic early recomputation.
+
+        Values are stored with how long they took to compute (delta) and when they
+        expire. A read recomputes ahead of expiry when
+        ``now - delta * beta * ln(random()) >= expiry``: the chance grows as expiry
+        nears and starts earlier for values that are slow to compute, so hot keys are
+        refreshed before they expire at all. TTLs are jittered as well.
+
+        When ``should_use_lock(operation, delta)`` holds (or ``lock_ttl`` is given) the
+        recompute takes the compute:{key} lock: an early refresh is done by the one
+        reader that gets the lock while the others keep the cached value, and a miss
+        is computed once while other callers wait for it.
+        """
+        if self.breaker.bypass():
+            # No lock to coordinate on; at least share the computation within this process
+            return await self.single_flight(key, compute_func)
+        beta = settings.CACHE_XFETCH_BETA if beta is None else beta
+        stored = await self._get_stored(key)
+        if stored is not None:
+            if not (isinstance(stored, dict) and XFETCH_MARKER in stored):
+                # Written without compute cost and expiry; the TTL still bounds it
+                return _unwrap(stored)
+            delta = stored.get("delta", 0)
+            if time.time() - delta * beta * math.log(1.0 - random.random()) < stored.get("expiry", 0):
+                return stored.get("value")
+            cache_metrics.record_early_refresh()
+            if lock_ttl is None and not should_use_lock(operation or "", delta):
+                return await self.compute_and_store(key, compute_func, ttl)
+            lock_ttl = lock_ttl or get_lock_ttl(operation or "", delta)
+            if not await self.acquire_lock(f"compute:{key}", lock_ttl):
+                # Another reader is refreshing it
+                return stored.get("value")
+            try:
+                return await self.compute_and_store(key, compute_func, ttl)
+            finally:
+                await self.release_lock(f"compute:{key}")
+                await self._notify_ready(key)
+
+        # No cost recorded for this key: go by the last one measured in its namespace
+        delta = self._compute_costs.get(key.split(":", 1)[0], 0)
+        if lock_ttl is None and not should_use_lock(operation or "", delta):
+            return await self.compute_and_store(key, compute_func, ttl)
+        lock_ttl = lock_ttl or get_lock_ttl(operation or "", delta)
+        return await self.single_flight(
+            key,
+            lambda: self._compute_under_lock(
+                key,
+                lambda: self.compute_and_store(key, compute_func, ttl),
+                lock_ttl,
+                store=_already_stored,
+            ),
+        )
+
+    async def compute_and_store(self, key: str, compute_func, ttl: int):
+        """Compute key and store it with its compute cost and expiry (forced refresh, or a get_or_compute miss)"""
+        start = time.perf_counter()
+        computed_value = await compute_func()
+        delta = time.perf_counter() - start
+        self._compute_costs[key.split(":", 1)[0]] = delta
+        ttl = jittered_ttl(ttl)
+        envelope = {XFETCH_MARKER: 1, "value": computed_value, "delta": delta, "expiry": time.time() + ttl}
+        await self.set(key, envelope, ttl)
+        return computed_value
+
+    async def set_with_soft_ttl(self, key: str, value: Any, soft_ttl: int, ttl: int) -> bool:
+        """Store a value that is fresh for soft_ttl seconds and served stale until ttl"""
+        envelope = {SWR_MARKER: 1, "value": value, "soft_expires_at": time.time() + soft_ttl}
+        return await self.set(key, envelope, max(ttl, soft_ttl))
+
+    async def get_or_revalidate(
+        self,
+        key: str,
+        compute_func,
+        soft_ttl: int,
+        ttl: int,
+        lock_ttl: int = 10,
+        revalidate_func=None,
+    ):
+        """Stale-while-revalidate read.
+
+        Fresh values are returned as is. After the soft expiry the stale value is
+        still returned immediately and one background recompute is started; the
+        compute:{key} lock keeps it to a single recompute across workers. Only a hard
+        miss (nothing cached) makes the caller wait, through the cache_with_lock path.
+
+        ``revalidate_func`` runs in the background after the request has finished,
+        so it must not rely on request-scoped resources such as the DB session; it
+        defaults to ``compute_func``.
+        """
+        stored = await self._get_stored(key)
+        if stored is not None:
+            if not (isinstance(stored, dict) and SWR_MARKER in stored):
+                # Written without a soft expiry; the hard TTL still bounds it
+                return _unwrap(stored)
+            if time.time() < stored.get("soft_expires_at", 0):
+                return stored.get("value")
+            cache_metrics.record_stale_serve()
+            if await self.acquire_lock(f"compute:{key}", lock_ttl):
+                self._schedule_revalidation(key, revalidate_func or compute_func, soft_ttl, ttl)
+            return stored.get("value")
+
+        cache_metrics.record_hard_miss()
+        if self.breaker.bypass():
+            return await self.single_flight(key, compute_func)
+        return await self.single_flight(
+            key,
+            lambda: self._compute_under_lock(
+                key,
+                compute_func,
+                lock_ttl,
+                store=lambda value: self.set_with_soft_ttl(key, value, soft_ttl, ttl),
+            ),
+        )
+
+    def _schedule_revalidation(self, key: str, compute_func, soft_ttl: int, ttl: int) -> None:
+        async def revalidate():
             try:
-                # Compute the value
                 computed_value = await compute_func()
-                
-                # Cache the result
-                await self.set(key, computed_value, ttl)
-                
-                return computed_value
-                
+                await self.set_with_soft_ttl(key, computed_value, soft_ttl, ttl)
+                cache_metrics.record_revalidation(True)
+            except Exception as e:
+                cache_metrics.record_revalidation(False)
+                logger.warning(f"Background revalidation failed for key {key}: {e}")
+                # Don't keep serving a value that can no longer be produced
+                await self.delete(key)
             finally:
-                if lock_acquired:
-                    await self.release_lock(f"compute:{key}")
-                    
-        except Exception as e:
-            logger.error(f"Failed cache_with_lock for key {key}: {e}")
-            # Fallback to direct computation
-            return await compute_func()
+                await self.release_lock(f"compute:{key}")
+                await self._notify_ready(key)
+
+        # Fresh context: the recompute is not part of the request that triggered it
+        task = asyncio.create_task(revalidate(), context=contextvars.Context())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
     async def invalidate_user_activity_cache(
         self, user_id: str, activity_type: str = "all"
     ):
-        try:
-            patterns = [
-                f"user_flags:{user_id}:*",
-                f"user_activity:{user_id}:*",
-                f"engagement_batch:{user_id}:*",  # User-specific engagement cache
-                f"engagement_velocity:{user_id}:*",  # User-specific velocity cache
-                f"media_batch:{user_id}:*",  # User-specific media cache
-            ]
-            if activity_type == "like":
-                patterns.extend([
-                    f"tweet_likes:*:{user_id}",
-                    f"engagement_batch:*",  # Global engagement cache for likes
-                ])
-            elif activity_type == "bookmark":
-                patterns.append(f"bookmarked_tweets:{user_id}:*")
-            elif activity_type == "share":
-                patterns.append(f"shared_tweets:{user_id}:*")
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-        except Exception as e:
-            logger.error(f"Failed to invalidate user activity cache: {e}")
+        # Flags and activity lists are all part of the user's feed scope
+        await self.bump_generation(GenerationScopes.FEED.format(user_id=user_id))
 
     async def invalidate_feed_refresh_cache(self, user_id: str):
-        patterns = [
-            f"twitter_feed:{user_id}:*",
-            f"merged_feed:{user_id}:*",
-            f"user_flags:{user_id}:*",
-            f"following_optimized:{user_id}:*",
-            f"engagement_batch:*",
-            f"user_recommendations:{user_id}:*",
-            f"twitter_recommendations:*",
-        ]
-        try:
-            for pattern in patterns:
-                deleted = await self.delete_pattern(pattern)
-                logger.info(f"Deleted {deleted} keys matching pattern: {pattern}")
-        except Exception as e:
-            logger.error(f"Error invalidating feed refresh cache for user {user_id}: {e}")
-            raise InternalServerError(f"Failed to invalidate feed refresh cache: {e}")
+        await self.bump_generation(GenerationScopes.FEED.format(user_id=user_id))
 
     async def invalidate_follower_removal_cache(self, user_id: str, removed_follower_id: str):
-        """Comprehensive cache invalidation when a follower is removed"""
-        patterns = [
-            # Profile and follow relationship caches
-            f"profile:{user_id}:*",
-            f"profile:{removed_follower_id}:*",
-            f"follow_cache:{removed_follower_id}:{user_id}:*",
-            f"follow_cache:{user_id}:{removed_follower_id}:*",
-            
-            # Feed caches for both users
-            f"twitter_feed:{user_id}:*",
-            f"twitter_feed:{removed_follower_id}:*",
-            f"merged_feed:{user_id}:*",
-            f"merged_feed:{removed_follower_id}:*",
-            
-            # Follower/following list caches
-            f"followers:{user_id}:*",
-            f"following:{removed_follower_id}:*",
-            f"new_followers:{user_id}:*",
-            f"mutual_followers:{user_id}:*",
-            f"mutual_followers:{removed_follower_id}:*",
-            
-            # User activity and engagement caches
-            f"user_activity:{user_id}:follow:*",
-            f"user_activity:{removed_follower_id}:follow:*",
-            f"engagement_batch:*",
-            
-            # Recommendation caches
-            f"user_recommendations:{user_id}:*",
-            f"user_recommendations:{removed_follower_id}:*",
-            f"twitter_recommendations:*",
-            
-            # User flags and metadata
-            f"user_flags:{user_id}:*",
-            f"user_flags:{removed_follower_id}:*",
-            f"following_optimized:{removed_follower_id}:*",
-        ]
-        
-        try:
-            total_deleted = 0
-            for pattern in patterns:
-                deleted = await self.delete_pattern(pattern)
-                total_deleted += deleted
-                if deleted > 0:
-                    logger.info(f"Deleted {deleted} keys matching pattern: {pattern}")
-            
-            logger.info(
-                f"Successfully invalidated {total_deleted} cache entries for follower removal: "
-                f"user {user_id} removed follower {removed_follower_id}"
-            )
-            
-        except Exception as e:
-            logger.error(
-                f"Error invalidating follower removal cache for user {user_id} "
-                f"removing follower {removed_follower_id}: {e}"
-            )
-            raise InternalServerError(f"Failed to invalidate follower removal cache: {e}")
+        """Cache invalidation when a follower is removed: profiles, graph lists and feeds of both users"""
+        await self.bump_generation(
+            GenerationScopes.USER.format(user_id=user_id),
+            GenerationScopes.USER.format(user_id=removed_follower_id),
+            GenerationScopes.FEED.format(user_id=user_id),
+            GenerationScopes.FEED.format(user_id=removed_follower_id),
+        )
+        logger.info(
+            f"Invalidated caches for follower removal: "
+            f"user {user_id} removed follower {removed_follower_id}"
+        )
 
     async def invalidate_tweet_share_cache(self, tweet_id: int, sender_id: str, recipient_ids: List[str]):
-        """Comprehensive cache invalidation for tweet sharing operations"""
-        patterns = [
-            # Tweet engagement and response caches
-            f"tweet_response:{tweet_id}:*",
-            f"engagement_batch:*",
-            f"engagement_velocity:*",
-            
-            # Sender caches
-            f"sent_shared_tweets:{sender_id}:*",
-            f"user_activity:{sender_id}:share:*",
-            f"user_activity:{sender_id}:*",
-            f"twitter_feed:{sender_id}:*",
-            f"user_flags:{sender_id}:*",
-        ]
-        
-        # Add recipient-specific patterns
-        for recipient_id in recipient_ids:
-            patterns.extend([
-                f"received_shared_tweets:{recipient_id}:*",
-                f"user_activity:{recipient_id}:share:*",
-                f"user_activity:{recipient_id}:*",
-                f"twitter_feed:{recipient_id}:*",
-                f"user_flags:{recipient_id}:*",
-                f"user_recommendations:{recipient_id}:*",
-            ])
-        
-        # Global caches that might be affected
-        patterns.extend([
-            f"twitter_recommendations:*",
-            f"all_user_metadata:*",
-        ])
-        
-        try:
-            total_deleted = 0
-            for pattern in patterns:
-                deleted = await self.delete_pattern(pattern)
-                total_deleted += deleted
-                if deleted > 0:
-                    logger.info(f"Deleted {deleted} keys matching pattern: {pattern}")
-            
-            logger.info(
-                f"Successfully invalidated {total_deleted} cache entries for tweet share: "
-                f"tweet {tweet_id}, sender {sender_id}, recipients {recipient_ids}"
-            )
-            
-        except Exception as e:
-            logger.error(
-                f"Error invalidating tweet share cache for tweet {tweet_id}, "
-                f"sender {sender_id}, recipients {recipient_ids}: {e}"
-            )
-            raise InternalServerError(f"Failed to invalidate tweet share cache: {e}")
+        """Cache invalidation for tweet sharing: sent/received lists and feeds of everyone involved"""
+        await self.bump_generation(
+            GenerationScopes.FEED.format(user_id=sender_id),
+            *(GenerationScopes.FEED.format(user_id=recipient_id) for recipient_id in recipient_ids),
+        )
+        logger.info(
+            f"Invalidated caches for tweet share: "
+            f"tweet {tweet_id}, sender {sender_id}, recipients {recipient_ids}"
+        )
 
     async def acquire_lock(self, key: str, ttl: int = 10) -> bool:
         """Acquire a distributed lock for cache stampede protection."""
+        if self.breaker.bypass():
+            return False
         try:
             async with self._redis_operation("acquire_lock"):
                 lock_key = versioned_key(f"lock:{key}")
@@ -1015,6 +1232,8 @@ class CacheService:
             return False
 
     async def release_lock(self, key: str) -> None:
+        if self.breaker.bypass():
+            return
         try:
             async with self._redis_operation("release_lock"):
                 lock_key = versioned_key(f"lock:{key}")
@@ -1027,81 +1246,29 @@ class CacheService:
             logger.warning(f"Pattern deletion for {pattern} deleted {deleted_count} keys! Consider optimizing cache key design.")
 
     async def invalidate_comment_cache(self, comment_id: int, tweet_id: int = None):
-        """Invalidate comment-related cache"""
-        try:
-            patterns = [
-                f"comment:{comment_id}:*",
-                f"comment_response:{comment_id}:*",
-                f"comment_likes:{comment_id}:*",
-                f"comment_replies:{comment_id}:*",
-            ]
-            if tweet_id:
-                patterns.extend([
-                    f"tweet_comments:{tweet_id}:*",
-                    f"comment_count:{tweet_id}:*",
-                ])
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Invalidated comment cache for comment {comment_id}")
-        except Exception as e:
-            logger.error(f"Failed to invalidate comment cache for comment {comment_id}: {e}")
+        """Invalidate comment-related cache; comment pages live under their tweet's scope"""
+        if tweet_id:
+            await self.bump_generation(GenerationScopes.TWEET.format(tweet_id=tweet_id))
+        logger.info(f"Invalidated comment cache for comment {comment_id}")
 
     async def invalidate_user_interaction_cache(self, user_id: str, interaction_type: str = "all"):
         """Invalidate user interaction cache (likes, bookmarks, shares, comments)"""
-        try:
-            patterns = []
-            if interaction_type in ["all", "like"]:
-                patterns.extend([
-                    f"user_likes:{user_id}:*",
-                    f"liked_tweets:{user_id}:*",
-                ])
-            if interaction_type in ["all", "bookmark"]:
-                patterns.extend([
-                    f"user_bookmarks:{user_id}:*",
-                    f"bookmarked_tweets:{user_id}:*",
-                ])
-            if interaction_type in ["all", "share"]:
-                patterns.extend([
-                    f"user_shares:{user_id}:*",
-                    f"shared_tweets:{user_id}:*",
-                ])
-            if interaction_type in ["all", "comment"]:
-                patterns.extend([
-                    f"user_comments:{user_id}:*",
-                    f"my_comments:{user_id}:*",
-                ])
-            
-            tasks = [self.delete_pattern(pattern) for pattern in patterns]
-            await asyncio.gather(*tasks, return_exceptions=True)
-            logger.info(f"Invalidated {interaction_type} interaction cache for user {user_id}")
-        except Exception as e:
-            logger.error(f"Failed to invalidate interaction cache for user {user_id}: {e}")
+        await self.bump_generation(GenerationScopes.FEED.format(user_id=user_id))
+        logger.info(f"Invalidated {interaction_type} interaction cache for user {user_id}")
 
     async def batch_invalidate_user_feeds(self, user_ids: list[str]):
         """Batch invalidate feeds for multiple users"""
-        try:
-            patterns = []
-            for user_id in user_ids:
-                patterns.extend([
-                    f"tweet_feed:{user_id}:*",
-                    f"twitter_feed:{user_id}:*",
-                    f"merged_feed:{user_id}:*",
-                    f"recommendations:{user_id}:*",
-                ])
-            
-            # Process in batches to avoid overwhelming Redis
-            batch_size = 50
-            for i in range(0, len(patterns), batch_size):
-                batch = patterns[i:i + batch_size]
-                tasks = [self.delete_pattern(pattern) for pattern in batch]
-                await asyncio.gather(*tasks, return_exceptions=True)
-            
-            logger.info(f"Batch invalidated feeds for {len(user_ids)} users")
-        except Exception as e:
-            logger.error(f"Failed to batch invalidate feeds: {e}")
+        await self.bump_generation(*(GenerationScopes.FEED.format(user_id=uid) for uid in user_ids))
+        logger.info(f"Batch invalidated feeds for {len(user_ids)} users")
 
     async def get_cache_health(self) -> dict:
         """Get detailed cache health metrics with application metrics"""
+        if self.breaker.bypass():
+            return {
+                "status": "bypassed",
+                "circuit_breaker": self.breaker.get_stats(),
+                "application_metrics": cache_metrics.get_stats(),
+            }
         try:
             await self.connect()
             info = await self._redis.info()
@@ -1136,124 +1303,35 @@ class CacheService:
                     "version": info.get("redis_version", "unknown"),
                 },
                 "application_metrics": metrics,
+                "l1_cache": {**self.local_cache.get_stats(), "live": self._l1_live},
+                "circuit_breaker": self.breaker.get_stats(),
+                "compute_cost_seconds": dict(self._compute_costs),
                 "compression_enabled": self.compression_enabled,
                 "compression_threshold": self.compression_threshold,
+                "codec": cache_codec.describe(),
                 "key_distribution": pattern_counts,
                 "cache_version": CACHE_VERSION,
             }
         except Exception as e:
             logger.error(f"Failed to get cache health: {e}")
-            return {"status": "unhealthy", "error": str(e)}
+            return {"status": "unhealthy", "error": str(e), "circuit_breaker": self.breaker.get_stats()}
 
     async def batch_get(self, keys: List[str]) -> dict:
-        """Optimized batch get operation with monitoring"""
-        try:
-            cache_metrics.record_operation("batch_get")
-            
-            if not keys:
-                return {}
-            
-            # Get values directly without mget to handle each key properly
-            result = {}
-            for key in keys:
-                value = await self.get(key)
-                if value is not None:
-                    result[key] = value
-                    
-            return result
-            
-        except Exception as e:
-            cache_metrics.record_error()
-            logger.error(f"Batch get error: {e}")
+        """Cached values by key for a batch of keys (misses are left out), in one round trip"""
+        if not keys:
             return {}
+        keys = list(dict.fromkeys(keys))
+        return {key: value for key, value in zip(keys, await self.mget(keys)) if value is not None}
 
-    async def batch_set_optimized(self, mapping: dict, ttl: Optional[int] = None, compress: Optional[bool] = None) -> bool:
-        """Optimized batch set operation with compression support"""
-        try:
-            cache_metrics.record_operation("batch_set_optimized")
-            
-            if not mapping:
-                return True
-            
-            # For large batches, use pipeline for better performance
-            if len(mapping) > 10:
-                return await self._batch_set_pipeline(mapping, ttl, compress)
-            else:
-                return await self.mset(mapping, ttl)
-            
-        except Exception as e:
-            cache_metrics.record_error()
-            logger.error(f"Batch set optimized error: {e}")
-            return False
-
-    async def _batch_set_pipeline(self, mapping: dict, ttl: Optional[int] = None, compress: Optional[bool] = None) -> bool:
-        """Internal method for pipeline-based batch set"""
-        try:
-            async with self._redis_operation("batch_set_pipeline"):
-                pipe = self._redis.pipeline()
-                
-                for key, value in mapping.items():
-                    versioned_key_name = versioned_key(key)
-                    
-                    # Serialize the value
-                    if isinstance(value, (dict, list)):
-                        serialized_value = json.dumps(
-                            value, separators=(",", ":"), cls=DateTimeEncoder
-                        )
-                    elif isinstance(value, str):
-                        serialized_value = value
-                    else:
-                        serialized_value = json.dumps(
-                            value, separators=(",", ":"), cls=DateTimeEncoder
-                        )
-                    
-                    # Apply compression logic
-                    use_compression = compress if compress is not None else (
-                        self.compression_enabled and should_compress(serialized_value, self.compression_threshold)
-                    )
-                    
-                    store_value = serialized_value
-                    compression_flag = "0"
-                    
-                    if use_compression:
-                        try:
-                            original_size = len(serialized_value.encode('utf-8'))
-                            compressed_data = compress_data(serialized_value)
-                            compressed_size = len(compressed_data)
-                            
-                            if compressed_size < original_size * 0.9:
-                                store_value = compressed_data
-                                compression_flag = "1"
-                                cache_metrics.record_compression_savings(original_size, compressed_size)
-                        except Exception as e:
-                            logger.warning(f"Compression failed for key {key}: {e}")
-                    
-                    # Store data
-                    final_value = f"{compression_flag}:{store_value}" if isinstance(store_value, str) else store_value
-                    
-                    if ttl:
-                        if isinstance(store_value, bytes):
-                            # For compressed data, prepend compression flag as bytes
-                            final_bytes = b"1:" + store_value
-                            pipe.setex(versioned_key_name, ttl, final_bytes)
-                        else:
-                            # For uncompressed data, encode to bytes
-                            pipe.setex(versioned_key_name, ttl, final_value.encode('utf-8'))
-                    else:
-                        if isinstance(store_value, bytes):
-                            # For compressed data, prepend compression flag as bytes
-                            final_bytes = b"1:" + store_value
-                            pipe.set(versioned_key_name, final_bytes)
-                        else:
-                            # For uncompressed data, encode to bytes
-                            pipe.set(versioned_key_name, final_value.encode('utf-8'))
-                
-                results = await pipe.execute()
-                return all(results)
-                
-        except Exception as e:
-            logger.error(f"Pipeline batch set error: {e}")
-            return False
+    async def batch_set_optimized(
+        self,
+        mapping: dict,
+        ttl: Optional[int] = None,
+        compress: Optional[bool] = None,
+        ttls: Optional[dict] = None,
+    ) -> bool:
+        """Batch set with compression support and optional per-key TTLs"""
+        return await self.mset(mapping, ttl=ttl, ttls=ttls, compress=compress)
 
     async def get_metrics(self) -> dict:
         """Get detailed cache metrics"""
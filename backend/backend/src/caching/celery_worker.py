@@ -2,14 +2,28 @@ from celery import Celery
 import asyncio
 from tweets.cruds.TweetCruds import tweet_service
 from database.session import AsyncSessionLocal
-from user_profile.models.Follower import Follower
+from caching.timeline_service import timeline_service
+from caching.engagement_counters import engagement_counters
+from tweets.feed.AuthorAffinity import author_affinity_service
+from tweets.feed.CandidatePool import candidate_pool_service
+from core.config import get_settings
 import os
 
+settings = get_settings()
+
 celery_app = Celery(
     "tasks",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
 )
+# Counter persistence, reconciliation and affinity decay run in the API process
+# (caching/periodic_jobs.py); their tasks stay for manual runs
+celery_app.conf.beat_schedule = {
+    "refresh-feed-candidate-pool": {
+        "task": "caching.celery_worker.refresh_feed_candidate_pool",
+        "schedule": settings.FEED_POOL_REFRESH_INTERVAL,
+    },
+}
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def refresh_user_feed(self, user_id: str, page: int = 1):
@@ -34,18 +48,79 @@ async def _refresh_recommend(user_id: str, page: int):
         await tweet_service.get_recommended_tweets(db, user_id, page)
 
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
-def refresh_followers_feeds(self, user_id: str, page: int = 1):
+def rebuild_user_timeline(self, user_id: str):
+    try:
+        asyncio.run(_rebuild_user_timeline(user_id))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+async def _rebuild_user_timeline(user_id: str):
+    async with AsyncSessionLocal() as db:
+        await timeline_service.rebuild_timeline(db, user_id)
+
+@celery_app.task(bind=True, max_retries=1, default_retry_delay=300)
+def backfill_home_timelines(self, batch_size: int = 200):
+    try:
+        return asyncio.run(_backfill_home_timelines(batch_size))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+async def _backfill_home_timelines(batch_size: int):
+    async with AsyncSessionLocal() as db:
+        return await timeline_service.backfill(db, batch_size=batch_size)
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
+def persist_engagement_counters(self):
+    try:
+        return asyncio.run(_persist_engagement_counters())
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+async def _persist_engagement_counters():
+    async with AsyncSessionLocal() as db:
+        return await engagement_counters.persist_dirty(db)
+
+@celery_app.task(bind=True, max_retries=1, default_retry_delay=300)
+def reconcile_engagement_counters(self, days: int = None):
     try:
-        asyncio.run(_refresh_followers_feeds(user_id, page))
+        return asyncio.run(_reconcile_engagement_counters(days))
     except Exception as exc:
         raise self.retry(exc=exc)
-    
-async def _refresh_followers_feeds(user_id: str, page: int):
+
+async def _reconcile_engagement_counters(days: int):
+    async with AsyncSessionLocal() as db:
+        return await engagement_counters.reconcile(db, days=days)
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+def decay_author_affinity(self):
+    try:
+        return asyncio.run(_decay_author_affinity())
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+async def _decay_author_affinity():
+    async with AsyncSessionLocal() as db:
+        return await author_affinity_service.decay(db)
+
+@celery_app.task(bind=True, max_retries=1, default_retry_delay=300)
+def rebuild_author_affinity(self, days: int = None):
+    try:
+        return asyncio.run(_rebuild_author_affinity(days))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+async def _rebuild_author_affinity(days: int):
+    async with AsyncSessionLocal() as db:
+        return await author_affinity_service.rebuild(db, days=days)
+
+@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
+def refresh_feed_candidate_pool(self):
+    try:
+        pool = asyncio.run(_refresh_feed_candidate_pool())
+        return len(pool.tweets)
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+async def _refresh_feed_candidate_pool():
     async with AsyncSessionLocal() as db:
-        result = await db.execute(
-            Follower.__table__.select().where(Follower.followee_id == user_id)
-        )
-        followers = result.fetchall()
-        for row in followers:
-            follower_id = row.follower_id
-            await tweet_service.get_tweet_feed(db, follower_id, page)
\ No newline at end of file
+        return await candidate_pool_service.build(db)
@@ -0,0 +1,204 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Redis while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around the Redis client.
+
+    Closed: every call goes through and its outcome is recorded over a sliding
+    window. Once the window holds ``min_calls`` calls and either the share of
+    failed calls reaches ``failure_rate`` or the share of calls slower than
+    ``slow_call_ms`` reaches ``slow_rate``, the circuit opens.
+
+    Open: calls are refused immediately (``allow`` is False and the cache raises
+    CircuitOpenError), so callers can fall back to the database without waiting
+    for a socket timeout. A background probe pings Redis every ``probe_interval``
+    seconds; when a ping succeeds the circuit goes half-open.
+
+    Half-open: ``half_open_calls`` trial calls are let through. If they all
+    succeed the circuit closes; any failure opens it again. A trial call that ends
+    without an outcome is ``release``d, so its slot goes to the next call.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[None]],
+        window_seconds: float = 10.0,
+        min_calls: int = 20,
+        failure_rate: float = 0.5,
+        slow_call_ms: float = 250.0,
+        slow_rate: float = 0.8,
+        probe_interval: float = 5.0,
+        half_open_calls: int = 5,
+        enabled: bool = True,
+    ):
+        self._probe = probe
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate = slow_rate
+        self.probe_interval = probe_interval
+        self.half_open_calls = half_open_calls
+        self.enabled = enabled
+        self.state = CLOSED
+        # (finished_at, failed, slow) per call in the window
+        self._calls: deque = deque()
+        self._failures = 0
+        self._slow = 0
+        self._trial_calls = 0
+        self._trial_successes = 0
+        self._probe_task: Optional[asyncio.Task] = None
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.short_circuited = 0
+        self.last_error: Optional[str] = None
+
+    def bypass(self) -> bool:
+        """True while open: skip Redis altogether and use the fallback result"""
+        if self.enabled and self.state == OPEN:
+            self.short_circuited += 1
+            self._ensure_probe()
+            return True
+        return False
+
+    def allow(self) -> bool:
+        if not self.enabled or self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self._trial_calls < self.half_open_calls:
+            self._trial_calls += 1
+            return True
+        self.short_circuited += 1
+        self._ensure_probe()
+        return False
+
+    def release(self) -> None:
+        """A call let through by ``allow`` ended without reaching Redis: free its trial slot"""
+        if self.enabled and self.state == HALF_OPEN and self._trial_calls > 0:
+            self._trial_calls -= 1
+
+    def record_success(self, duration: float) -> None:
+        if not self.enabled:
+            return
+        if self.state == HALF_OPEN:
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self._close()
+            return
+        self._record(failed=False, slow=duration * 1000 >= self.slow_call_ms)
+
+    def record_failure(self, error: BaseException) -> None:
+        if not self.enabled:
+            return
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._record(failed=True, slow=False)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        now = time.monotonic()
+        self._calls.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            _, old_failed, old_slow = self._calls.popleft()
+            self._failures -= old_failed
+            self._slow -= old_slow
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        total = len(self._calls)
+        if self._failures / total >= self.failure_rate:
+            self._open()
+        elif self._slow / total >= self.slow_rate:
+            self.last_error = f"{self._slow}/{total} calls slower than {self.slow_call_ms:.0f}ms"
+            self._open()
+
+    def _reset_window(self) -> None:
+        self._calls.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.times_opened += 1
+        self._reset_window()
+        logger.error(f"Redis circuit opened, bypassing the cache: {self.last_error}")
+        self._ensure_probe()
+
+    def _ensure_probe(self) -> None:
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No running loop; the next refused call tries again
+            self._probe_task = None
+            return
+        # Fresh context: the probe is not part of the request that opened the circuit
+        self._probe_task = asyncio.create_task(self._probe_loop(), context=contextvars.Context())
+
+    def _half_open(self) -> None:
+        self.state = HALF_OPEN
+        self._trial_calls = 0
+        self._trial_successes = 0
+        logger.info("Redis probe succeeded, circuit half-open")
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self._reset_window()
+        logger.info("Redis circuit closed, cache back in use")
+
+    async def _probe_loop(self) -> None:
+        while self.state != CLOSED:
+            if self.state == OPEN:
+                await asyncio.sleep(self.probe_interval)
+                try:
+                    await self._probe()
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    continue
+                if self.state == OPEN:
+                    self._half_open()
+            else:
+                # Half-open: wait for the trial calls to close or reopen it
+                await asyncio.sleep(self.probe_interval)
+                if self.state == HALF_OPEN and self._trial_calls == 0:
+                    # No traffic to decide on; a successful probe is enough
+                    self._close()
+
+    async def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    def get_stats(self) -> dict:
+        total = len(self._calls)
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "window_calls": total,
+            "failure_rate": (self._failures / total) if total else 0.0,
+            "slow_call_rate": (self._slow / total) if total else 0.0,
+            "opened_at": self.opened_at,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+            "last_error": self.last_error,
+        }
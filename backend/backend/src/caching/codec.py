@@ -0,0 +1,233 @@
+"""
+Cache value codec.
+
+Every value is stored as a frame: one header byte, then the serialized and
+optionally compressed payload. The header has the high bit set, so frames never
+start like the values written before this codec ("0:"/"1:" prefixed JSON, or bare
+JSON), which are all ASCII; those are still read by CacheService._decode.
+
+    header = 0x80 | serializer << 3 | compressor
+
+The serializer and compressor used for writing are chosen by settings; reads
+always follow the header, so the settings can change without flushing Redis.
+"""
+
+import gzip
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Tuple
+from core.config import get_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FRAME_FLAG = 0x80
+
+SERIALIZER_JSON = 1
+SERIALIZER_MSGPACK = 2
+SERIALIZERS = {"json": SERIALIZER_JSON, "msgpack": SERIALIZER_MSGPACK}
+
+COMPRESSOR_NONE = 0
+COMPRESSOR_GZIP = 1
+COMPRESSOR_ZSTD = 2
+COMPRESSOR_LZ4 = 3
+COMPRESSOR_ZSTD_DICT = 4
+COMPRESSORS = {"none": COMPRESSOR_NONE, "gzip": COMPRESSOR_GZIP, "zstd": COMPRESSOR_ZSTD, "lz4": COMPRESSOR_LZ4}
+
+# Compressed payloads that save less than this share are stored uncompressed
+MIN_COMPRESSION_SAVING = 0.1
+
+
+class CodecError(ValueError):
+    """A stored frame that cannot be decoded (unknown format or missing library)"""
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # NumPy scalars and arrays
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class _StdlibJSONEncoder(json.JSONEncoder):
+    def default(self, obj):
+        try:
+            return _default(obj)
+        except TypeError:
+            return super().default(obj)
+
+
+def is_frame(data: bytes) -> bool:
+    return bool(data) and data[0] & FRAME_FLAG != 0
+
+
+def is_compressed(frame: bytes) -> bool:
+    return frame[0] & 0x07 != COMPRESSOR_NONE
+
+
+class CacheCodec:
+    def __init__(
+        self,
+        serializer: str = "json",
+        compressor: str = "zstd",
+        threshold: int = 1024,
+        zstd_level: int = 3,
+        zstd_dictionary: Optional[bytes] = None,
+    ):
+        self.serializer = self._available_serializer(serializer)
+        self.compressor = self._available_compressor(compressor)
+        self.threshold = threshold
+        self._zstd_compressor = self._zstd_decompressor = None
+        self._zstd_dict_compressor = self._zstd_dict_decompressor = None
+        if zstandard is not None:
+            self._zstd_compressor = zstandard.ZstdCompressor(level=zstd_level)
+            self._zstd_decompressor = zstandard.ZstdDecompressor()
+            if zstd_dictionary:
+                dictionary = zstandard.ZstdCompressionDict(zstd_dictionary)
+                self._zstd_dict_compressor = zstandard.ZstdCompressor(level=zstd_level, dict_data=dictionary)
+                self._zstd_dict_decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+    @staticmethod
+    def _available_serializer(name: str) -> int:
+        serializer = SERIALIZERS.get(name, SERIALIZER_JSON)
+        if serializer == SERIALIZER_MSGPACK and msgpack is None:
+            logger.warning("msgpack is not installed; cache values are serialized as JSON")
+            return SERIALIZER_JSON
+        return serializer
+
+    @staticmethod
+    def _available_compressor(name: str) -> int:
+        compressor = COMPRESSORS.get(name, COMPRESSOR_GZIP)
+        if (compressor == COMPRESSOR_ZSTD and zstandard is None) or (compressor == COMPRESSOR_LZ4 and lz4_frame is None):
+            logger.warning(f"{name} is not installed; large cache values are compressed with gzip")
+            return COMPRESSOR_GZIP
+        return compressor
+
+    # Serialization
+
+    def serialize(self, value: Any, serializer: Optional[int] = None) -> bytes:
+        serializer = serializer or self.serializer
+        if serializer == SERIALIZER_MSGPACK:
+            return msgpack.packb(value, default=_default, use_bin_type=True)
+        if orjson is not None:
+            return orjson.dumps(
+                value, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        return json.dumps(value, separators=(",", ":"), cls=_StdlibJSONEncoder).encode("utf-8")
+
+    @staticmethod
+    def deserialize(payload: bytes, serializer: int) -> Any:
+        if serializer == SERIALIZER_JSON:
+            return orjson.loads(payload) if orjson is not None else json.loads(payload)
+        if serializer == SERIALIZER_MSGPACK:
+            if msgpack is None:
+                raise CodecError("msgpack frame but msgpack is not installed")
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        raise CodecError(f"Unknown serializer {serializer}")
+
+    # Compression
+
+    def compress(self, payload: bytes, compressor: Optional[int] = None) -> Tuple[bytes, int]:
+        compressor = self.compressor if compressor is None else compressor
+        if compressor == COMPRESSOR_ZSTD and self._zstd_dict_compressor is not None:
+            return self._zstd_dict_compressor.compress(payload), COMPRESSOR_ZSTD_DICT
+        if compressor == COMPRESSOR_ZSTD:
+            return self._zstd_compressor.compress(payload), COMPRESSOR_ZSTD
+        if compressor == COMPRESSOR_LZ4:
+            return lz4_frame.compress(payload), COMPRESSOR_LZ4
+        if compressor == COMPRESSOR_GZIP:
+            return gzip.compress(payload, compresslevel=6), COMPRESSOR_GZIP
+        return payload, COMPRESSOR_NONE
+
+    def decompress(self, payload: bytes, compressor: int) -> bytes:
+        if compressor == COMPRESSOR_NONE:
+            return payload
+        if compressor == COMPRESSOR_GZIP:
+            return gzip.decompress(payload)
+        if compressor == COMPRESSOR_ZSTD and self._zstd_decompressor is not None:
+            return self._zstd_decompressor.decompress(payload)
+        if compressor == COMPRESSOR_ZSTD_DICT and self._zstd_dict_decompressor is not None:
+            return self._zstd_dict_decompressor.decompress(payload)
+        if compressor == COMPRESSOR_LZ4 and lz4_frame is not None:
+            return lz4_frame.decompress(payload)
+        raise CodecError(f"Cannot decompress format {compressor} in this process")
+
+    # Frames
+
+    def encode(self, value: Any, compress: Optional[bool] = None) -> Tuple[bytes, int]:
+        """Frame for value, and the serialized size before compression.
+
+        compress=None compresses above the threshold with the configured compressor;
+        True always tries (gzip when compression is configured off); False never does.
+        """
+        payload = self.serialize(value)
+        raw_size = len(payload)
+        compressor = COMPRESSOR_NONE
+        if compress or (compress is None and self.compressor != COMPRESSOR_NONE and raw_size > self.threshold):
+            compressed, used = self.compress(payload, self.compressor or COMPRESSOR_GZIP)
+            if len(compressed) <= raw_size * (1 - MIN_COMPRESSION_SAVING):
+                payload, compressor = compressed, used
+        header = FRAME_FLAG | (self.serializer << 3) | compressor
+        return bytes((header,)) + payload, raw_size
+
+    def decode(self, data: bytes) -> Any:
+        header = data[0]
+        serializer, compressor = (header >> 3) & 0x0F, header & 0x07
+        return self.deserialize(self.decompress(data[1:], compressor), serializer)
+
+    def describe(self) -> dict:
+        names = {v: k for k, v in SERIALIZERS.items()}
+        compressors = {v: k for k, v in COMPRESSORS.items()}
+        return {
+            "serializer": names[self.serializer],
+            "json_backend": "orjson" if orjson is not None else "json",
+            "compressor": compressors[self.compressor],
+            "zstd_dictionary": self._zstd_dict_compressor is not None,
+            "threshold": self.threshold,
+        }
+
+
+def train_zstd_dictionary(samples: Iterable[bytes], size: int = 64 * 1024) -> bytes:
+    """Train a zstd dictionary on serialized (uncompressed) sample payloads"""
+    if zstandard is None:
+        raise RuntimeError("zstandard is not installed")
+    return zstandard.train_dictionary(size, list(samples)).as_bytes()
+
+
+def _load_dictionary(path: str) -> Optional[bytes]:
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        logger.warning(f"Could not read zstd dictionary {path}, compressing without it: {e}")
+        return None
+
+
+cache_codec = CacheCodec(
+    serializer=settings.CACHE_SERIALIZER,
+    compressor=settings.CACHE_COMPRESSOR,
+    threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+    zstd_level=settings.CACHE_ZSTD_LEVEL,
+    zstd_dictionary=_load_dictionary(settings.CACHE_ZSTD_DICT_PATH),
+)
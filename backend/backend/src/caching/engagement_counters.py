@@ -0,0 +1,407 @@
+import logging
+from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, case
+from caching.cache_service import cache_service, versioned_key
+from database.fanout import query_fanout
+from database.upsert import upsert
+from core.config import get_settings
+from tweets.models.Tweet import Tweet
+from tweets.models.TweetLike import TweetLike
+from tweets.models.Comment import Comment
+from tweets.models.Share import Share
+from tweets.models.Bookmark import Bookmark
+from tweets.models.TweetStats import TweetStats
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+COUNTER_FIELDS = ("likes", "comments", "shares", "bookmarks")
+# Counter field -> tweet_stats column
+STATS_COLUMNS = {
+    "likes": "like_count",
+    "comments": "comment_count",
+    "shares": "share_count",
+    "bookmarks": "bookmark_count",
+}
+
+# Longest a cold read may take between marking its load and seeding the hash
+LOAD_MARK_TTL = 60
+# Longest a write may hold its mark between the database commit and the counter update
+WRITE_MARK_TTL = 60
+
+# A change committed to the database but not yet applied to the counters cannot be told
+# apart in a snapshot, so a cold hash is only seeded when none can be in between: no
+# write holds its mark, and none finished since the load marked itself.
+# KEYS[1] = hash key, KEYS[2] = write mark, KEYS[3] = load mark, KEYS[4] = dirty set
+# ARGV[1] = ttl, ARGV[2] = tweet id to mark dirty or "", ARGV[3..] = field/value pairs
+SEED_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local clean = redis.call('GET', KEYS[3]) == '0' and redis.call('EXISTS', KEYS[2]) == 0
+redis.call('DEL', KEYS[3])
+if not clean then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if ARGV[2] ~= '' then
+    redis.call('SADD', KEYS[4], ARGV[2])
+end
+return 1
+"""
+
+# Apply a delta to a loaded counter hash, clamp at zero, mark the tweet dirty and
+# release the write mark. Returns -1 when the hash is not loaded so the caller can
+# update tweet_stats instead; the mark is then released by FINISH_SCRIPT.
+# KEYS[1] = hash key, KEYS[2] = dirty set, KEYS[3] = write mark
+# ARGV = field, delta, ttl, tweet id
+INCREMENT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if value < 0 then
+    redis.call('HSET', KEYS[1], ARGV[1], 0)
+    value = 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[4])
+if redis.call('DECR', KEYS[3]) <= 0 then
+    redis.call('DEL', KEYS[3])
+end
+return value
+"""
+
+# Release a write mark without touching the hash, and spoil any load running meanwhile.
+# KEYS[1] = write mark, KEYS[2] = load mark
+FINISH_SCRIPT = """
+if redis.call('DECR', KEYS[1]) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('INCR', KEYS[2])
+end
+return 1
+"""
+
+# Move a batch of dirty tweets into the in-flight set of a persist run.
+# KEYS[1] = dirty set, KEYS[2] = in-flight set, ARGV[1] = batch size
+CLAIM_SCRIPT = """
+local ids = redis.call('SPOP', KEYS[1], ARGV[1])
+if #ids > 0 then
+    redis.call('SADD', KEYS[2], unpack(ids))
+end
+return ids
+"""
+
+
+class EngagementCounterService:
+    """Per-tweet like/comment/share/bookmark counters.
+
+    Live values are Redis hashes updated atomically on every write path, which wraps
+    its commit in ``change``; a batch of tweets is read with one pipelined HMGET.
+    Tweets touched since the last flush are tracked in a dirty set and periodically
+    persisted to the tweet_stats table, which is also what a cold hash is seeded from.
+    Reads never write the table: a tweet without a row is counted from the source
+    tables, seeded and marked dirty. A reconciliation job recounts the source tables
+    to repair any drift.
+    """
+
+    def _key(self, tweet_id: int) -> str:
+        return versioned_key(f"tweet_stats:{tweet_id}")
+
+    def _dirty_key(self) -> str:
+        return versioned_key("tweet_stats:dirty")
+
+    def _persisting_key(self) -> str:
+        return versioned_key("tweet_stats:persisting")
+
+    def _write_mark_key(self, tweet_id: int) -> str:
+        return versioned_key(f"tweet_stats:{tweet_id}:writing")
+
+    def _load_mark_key(self, tweet_id: int) -> str:
+        return versioned_key(f"tweet_stats:{tweet_id}:loading")
+
+    @asynccontextmanager
+    async def change(self, db: AsyncSession, tweet_id: int, field: str, delta: int = 1):
+        """Wrap the commit of an engagement change; the counters follow once it succeeds.
+
+        The tweet carries a write mark from before the commit until the counters are
+        updated, so a cold read never seeds a hash from a snapshot that already holds
+        this change and then has it applied a second time.
+        """
+        if delta == 0:
+            yield
+            return
+        await self._mark_write(tweet_id)
+        try:
+            yield
+        except BaseException:
+            await self._release_write(tweet_id)
+            raise
+        await self._apply(db, tweet_id, field, delta)
+
+    async def _mark_write(self, tweet_id: int) -> None:
+        key = self._write_mark_key(tweet_id)
+        try:
+            async with cache_service.pipeline("engagement_mark") as pipe:
+                pipe.incr(key)
+                pipe.expire(key, WRITE_MARK_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to mark engagement write for tweet {tweet_id}: {e}")
+
+    async def _release_write(self, tweet_id: int) -> None:
+        try:
+            script = await cache_service.get_script("engagement_finish", FINISH_SCRIPT)
+            async with cache_service.pipeline("engagement_finish") as pipe:
+                await script(
+                    keys=[self._write_mark_key(tweet_id), self._load_mark_key(tweet_id)],
+                    client=pipe,
+                )
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to release engagement write for tweet {tweet_id}: {e}")
+
+    async def _apply(self, db: AsyncSession, tweet_id: int, field: str, delta: int) -> None:
+        """Apply a committed engagement change to the tweet's counters"""
+        try:
+            script = await cache_service.get_script("engagement_increment", INCREMENT_SCRIPT)
+            async with cache_service.pipeline("engagement_increment") as pipe:
+                await script(
+                    keys=[self._key(tweet_id), self._dirty_key(), self._write_mark_key(tweet_id)],
+                    args=[field, delta, settings.ENGAGEMENT_COUNTER_TTL, tweet_id],
+                    client=pipe,
+                )
+                (value,) = await pipe.execute()
+            if value is not None and int(value) >= 0:
+                return
+        except Exception as e:
+            logger.error(f"Failed to increment {field} counter for tweet {tweet_id}: {e}")
+        # Counter not loaded (or Redis unavailable): keep the persisted row in step
+        column = getattr(TweetStats, STATS_COLUMNS[field])
+        try:
+            await db.execute(
+                update(TweetStats)
+                .where(TweetStats.tweet_id == tweet_id)
+                .values({column: case((column + delta < 0, 0), else_=column + delta)})
+            )
+            await db.commit()
+        finally:
+            await self._release_write(tweet_id)
+
+    async def get_counts(self, db: AsyncSession, tweet_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """Counters for a batch of tweets: one HMGET pipeline, DB only for cold tweets"""
+        tweet_ids = list(dict.fromkeys(int(t) for t in tweet_ids))
+        if not tweet_ids:
+            return {}
+        counts: Dict[int, Dict[str, int]] = {}
+        missing: List[int] = []
+        try:
+            async with cache_service.pipeline("engagement_get") as pipe:
+                for tweet_id in tweet_ids:
+                    pipe.hmget(self._key(tweet_id), *COUNTER_FIELDS)
+                results = await pipe.execute()
+            for tweet_id, values in zip(tweet_ids, results):
+                if values is None or all(v is None for v in values):
+                    missing.append(tweet_id)
+                else:
+                    counts[tweet_id] = {
+                        field: int(v or 0) for field, v in zip(COUNTER_FIELDS, values)
+                    }
+        except Exception as e:
+            logger.error(f"Failed to read engagement counters: {e}")
+            missing = [t for t in tweet_ids if t not in counts]
+        if missing:
+            await self._mark_load(missing)
+            loaded, recounted = await self._load_counts(db, missing)
+            counts.update(loaded)
+            await self._seed(loaded, dirty=recounted)
+        return counts
+
+    async def _mark_load(self, tweet_ids: List[int]) -> None:
+        """Start the load marks a seed checks; a load already running keeps its own"""
+        try:
+            async with cache_service.pipeline("engagement_load") as pipe:
+                for tweet_id in tweet_ids:
+                    pipe.set(self._load_mark_key(tweet_id), 0, ex=LOAD_MARK_TTL, nx=True)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to mark engagement counter loads: {e}")
+
+    async def _load_counts(self, db: AsyncSession, tweet_ids: List[int]):
+        """Cold tweets from tweet_stats, falling back to counting the source tables.
+        Returns the counts and the ids that had no tweet_stats row."""
+        result = await db.execute(select(TweetStats).where(TweetStats.tweet_id.in_(tweet_ids)))
+        loaded = {
+            row.tweet_id: {field: getattr(row, column) or 0 for field, column in STATS_COLUMNS.items()}
+            for row in result.scalars().all()
+        }
+        uncounted = [t for t in tweet_ids if t not in loaded]
+        if uncounted:
+            loaded.update(await self.count_from_source(db, uncounted))
+        return loaded, uncounted
+
+    async def count_from_source(self, db: AsyncSession, tweet_ids: List[int]) -> Dict[int, Dict[str, int]]:
+        """Authoritative counts from the engagement tables"""
+        counts = {tweet_id: {field: 0 for field in COUNTER_FIELDS} for tweet_id in tweet_ids}
+        queries = {
+            "likes": select(TweetLike.tweet_id, func.count().label("count"))
+            .where(TweetLike.tweet_id.in_(tweet_ids))
+            .group_by(TweetLike.tweet_id),
+            "comments": select(Comment.tweet_id, func.count().label("count"))
+            .where(Comment.tweet_id.in_(tweet_ids), Comment.parent_comment_id.is_(None))
+            .group_by(Comment.tweet_id),
+            "shares": select(Share.tweet_id, func.count().label("count"))
+            .where(Share.tweet_id.in_(tweet_ids))
+            .group_by(Share.tweet_id),
+            "bookmarks": select(Bookmark.tweet_id, func.count().label("count"))
+            .where(Bookmark.tweet_id.in_(tweet_ids))
+            .group_by(Bookmark.tweet_id),
+        }
+        results = await query_fanout.gather(db, *queries.values(), name="engagement_counts")
+        for field, result in zip(queries, results):
+            for row in result.all():
+                counts[row.tweet_id][field] = row.count
+        return counts
+
+    async def _seed(self, counts: Dict[int, Dict[str, int]], dirty: List[int] = ()) -> None:
+        """Load cold counters; ``dirty`` tweets are queued for the persist job to write their row.
+        A tweet written to during its load is left cold for the next read."""
+        if not counts:
+            return
+        dirty = set(dirty)
+        try:
+            script = await cache_service.get_script("engagement_seed", SEED_SCRIPT)
+            async with cache_service.pipeline("engagement_seed") as pipe:
+                for tweet_id, values in counts.items():
+                    args = [settings.ENGAGEMENT_COUNTER_TTL, tweet_id if tweet_id in dirty else ""]
+                    for field in COUNTER_FIELDS:
+                        args.extend([field, values.get(field, 0)])
+                    keys = [
+                        self._key(tweet_id),
+                        self._write_mark_key(tweet_id),
+                        self._load_mark_key(tweet_id),
+                        self._dirty_key(),
+                    ]
+                    await script(keys=keys, args=args, client=pipe)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to seed engagement counters: {e}")
+
+    async def _upsert_stats(self, db: AsyncSession, counts: Dict[int, Dict[str, int]]) -> None:
+        if not counts:
+            return
+        rows = [
+            {"tweet_id": tweet_id, **{STATS_COLUMNS[f]: values.get(f, 0) for f in COUNTER_FIELDS}}
+            for tweet_id, values in counts.items()
+        ]
+        stmt = upsert(
+            db, TweetStats, rows, ["tweet_id"],
+            lambda inserted: {column: inserted[column] for column in STATS_COLUMNS.values()},
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    async def _overwrite(self, counts: Dict[int, Dict[str, int]]) -> None:
+        """Replace loaded counter hashes with known-good values"""
+        async with cache_service.pipeline("engagement_overwrite") as pipe:
+            for tweet_id, values in counts.items():
+                key = self._key(tweet_id)
+                pipe.hset(key, mapping={field: values.get(field, 0) for field in COUNTER_FIELDS})
+                pipe.expire(key, settings.ENGAGEMENT_COUNTER_TTL)
+            await pipe.execute()
+
+    async def delete(self, tweet_id: int) -> None:
+        """Drop a deleted tweet's live counters; its tweet_stats row goes with the tweet"""
+        try:
+            async with cache_service.pipeline("engagement_delete") as pipe:
+                pipe.delete(self._key(tweet_id))
+                pipe.srem(self._dirty_key(), tweet_id)
+                pipe.srem(self._persisting_key(), tweet_id)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to delete engagement counters for tweet {tweet_id}: {e}")
+
+    async def persist_dirty(self, db: AsyncSession) -> int:
+        """Flush counters changed since the last run into tweet_stats.
+
+        Each batch is moved to an in-flight set and only removed from it once its rows
+        are committed; batches left there by a failed or interrupted run go back to
+        the dirty set at the start of the next one.
+        """
+        dirty, persisting = self._dirty_key(), self._persisting_key()
+        async with cache_service.pipeline("engagement_persist", transaction=True) as pipe:
+            pipe.sunionstore(dirty, [dirty, persisting])
+            pipe.delete(persisting)
+            await pipe.execute()
+        claim = await cache_service.get_script("engagement_claim", CLAIM_SCRIPT)
+        persisted = 0
+        while True:
+            async with cache_service.pipeline("engagement_persist") as pipe:
+                await claim(keys=[dirty, persisting], args=[settings.ENGAGEMENT_PERSIST_BATCH_SIZE], client=pipe)
+                (members,) = await pipe.execute()
+            tweet_ids = [int(m) for m in members or []]
+            if not tweet_ids:
+                break
+            async with cache_service.pipeline("engagement_persist") as pipe:
+                for tweet_id in tweet_ids:
+                    pipe.hmget(self._key(tweet_id), *COUNTER_FIELDS)
+                results = await pipe.execute()
+            counts = {
+                tweet_id: {field: int(v or 0) for field, v in zip(COUNTER_FIELDS, values)}
+                for tweet_id, values in zip(tweet_ids, results)
+                if values and any(v is not None for v in values)
+            }
+            existing = (
+                await db.execute(select(Tweet.id).where(Tweet.id.in_(list(counts))))
+            ).scalars().all() if counts else []
+            counts = {tweet_id: counts[tweet_id] for tweet_id in existing}
+            await self._upsert_stats(db, counts)
+            async with cache_service.pipeline("engagement_persist") as pipe:
+                pipe.srem(persisting, *tweet_ids)
+                await pipe.execute()
+            persisted += len(counts)
+        if persisted:
+            logger.info(f"Persisted engagement counters for {persisted} tweets")
+        return persisted
+
+    async def reconcile(self, db: AsyncSession, days: int = None, batch_size: int = 500) -> int:
+        """Recount recent tweets from the source tables and repair drifted counters"""
+        days = days or settings.ENGAGEMENT_RECONCILE_DAYS
+        cutoff = datetime.now() - timedelta(days=days)
+        repaired = 0
+        last_id = 0
+        while True:
+            tweet_ids = (
+                await db.execute(
+                    select(Tweet.id)
+                    .where(Tweet.id > last_id, Tweet.created_at >= cutoff)
+                    .order_by(Tweet.id)
+                    .limit(batch_size)
+                )
+            ).scalars().all()
+            if not tweet_ids:
+                break
+            last_id = tweet_ids[-1]
+            actual = await self.count_from_source(db, list(tweet_ids))
+            stored = await self.get_counts(db, tweet_ids)
+            drifted = {
+                tweet_id: values
+                for tweet_id, values in actual.items()
+                if stored.get(tweet_id) != values
+            }
+            if drifted:
+                await self._upsert_stats(db, drifted)
+                await self._overwrite(drifted)
+                repaired += len(drifted)
+                logger.warning(f"Repaired engagement counter drift for {len(drifted)} tweets")
+        logger.info(f"Engagement counter reconciliation finished, {repaired} tweets repaired")
+        return repaired
+
+
+engagement_counters = EngagementCounterService()
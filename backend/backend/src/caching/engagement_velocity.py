@@ -0,0 +1,162 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+from caching.cache_service import cache_service, versioned_key
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+VELOCITY_KINDS = ("likes", "comments", "shares")
+TRENDING_CACHE_KEY = "trending_tweets"
+TRENDING_CACHE_SIZE = 200
+
+# Count one engagement in the tweet's current minute bucket and mark the tweet active.
+# Buckets older than two windows are pruned once the hash grows past ARGV[6] fields.
+# KEYS[1] = bucket hash, KEYS[2] = active set
+# ARGV = field, delta, ttl, minute, oldest minute to keep, max fields, tweet id
+RECORD_SCRIPT = """
+redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[7])
+if redis.call('HLEN', KEYS[1]) > tonumber(ARGV[6]) then
+    local oldest = tonumber(ARGV[5])
+    for _, field in ipairs(redis.call('HKEYS', KEYS[1])) do
+        local minute = tonumber(string.match(field, '^(%d+):'))
+        if minute and minute < oldest then
+            redis.call('HDEL', KEYS[1], field)
+        end
+    end
+end
+return 1
+"""
+
+
+class EngagementVelocityService:
+    """Rolling engagement velocity from per-minute like/comment/share buckets.
+
+    Each tweet has one hash of ``{minute}:{kind}`` counters that expires
+    VELOCITY_BUCKET_TTL seconds after its last engagement. Velocity compares the last
+    VELOCITY_WINDOW_MINUTES with the window before it. The numbers are global, so one
+    pipelined read serves every viewer's ranking as well as the trending list.
+    """
+
+    def _key(self, tweet_id: int) -> str:
+        return versioned_key(f"tweet_velocity:{tweet_id}")
+
+    def _active_key(self) -> str:
+        return versioned_key("tweet_velocity:active")
+
+    def _current_minute(self) -> int:
+        return int(time.time() // 60)
+
+    async def record(self, tweet_id: int, kind: str, count: int = 1) -> None:
+        """Add engagements to the tweet's current minute bucket"""
+        if count <= 0:
+            return
+        window = settings.VELOCITY_WINDOW_MINUTES
+        minute = self._current_minute()
+        try:
+            script = await cache_service.get_script("velocity_record", RECORD_SCRIPT)
+            async with cache_service.pipeline("velocity_record") as pipe:
+                await script(
+                    keys=[self._key(tweet_id), self._active_key()],
+                    args=[
+                        f"{minute}:{kind}",
+                        count,
+                        settings.VELOCITY_BUCKET_TTL,
+                        minute,
+                        minute - 2 * window,
+                        2 * window * len(VELOCITY_KINDS),
+                        tweet_id,
+                    ],
+                    client=pipe,
+                )
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to record {kind} velocity for tweet {tweet_id}: {e}")
+
+    async def get_window_counts(self, tweet_ids: Iterable[int]) -> Dict[int, tuple]:
+        """(recent, previous) engagement counts per tweet, read in one pipeline"""
+        tweet_ids = list(dict.fromkeys(int(t) for t in tweet_ids))
+        if not tweet_ids:
+            return {}
+        window = settings.VELOCITY_WINDOW_MINUTES
+        recent_start = self._current_minute() - window + 1
+        previous_start = recent_start - window
+        async with cache_service.pipeline("velocity_read") as pipe:
+            for tweet_id in tweet_ids:
+                pipe.hgetall(self._key(tweet_id))
+            results = await pipe.execute()
+
+        counts = {}
+        for tweet_id, buckets in zip(tweet_ids, results):
+            recent = previous = 0
+            for field, value in (buckets or {}).items():
+                minute = int(field.split(b":", 1)[0])
+                if minute >= recent_start:
+                    recent += int(value)
+                elif minute >= previous_start:
+                    previous += int(value)
+            counts[tweet_id] = (recent, previous)
+        return counts
+
+    @staticmethod
+    def _velocity(recent: int, previous: int) -> float:
+        velocity = (recent - previous) / max(previous, 1) if previous > 0 else recent
+        return max(0, velocity)
+
+    async def get_velocity(self, tweet_ids: Iterable[int]) -> Dict[int, float]:
+        """Velocity per tweet: relative growth over the previous window, or the recent count"""
+        tweet_ids = list(tweet_ids)
+        try:
+            counts = await self.get_window_counts(tweet_ids)
+        except Exception as e:
+            logger.warning(f"Failed to read engagement velocity: {e}")
+            return {tweet_id: 0 for tweet_id in tweet_ids}
+        return {tweet_id: self._velocity(*window) for tweet_id, window in counts.items()}
+
+    async def _compute_trending(self) -> List[dict]:
+        window = settings.VELOCITY_WINDOW_MINUTES
+        recent_start = self._current_minute() - window + 1
+        # Only tweets engaged with in the current window can trend
+        async with cache_service.pipeline("trending_candidates") as pipe:
+            pipe.zremrangebyscore(self._active_key(), "-inf", f"({recent_start - window}")
+            pipe.zrevrangebyscore(
+                self._active_key(), "+inf", recent_start,
+                start=0, num=settings.TRENDING_MAX_CANDIDATES,
+            )
+            _, members = await pipe.execute()
+        counts = await self.get_window_counts(int(m) for m in members)
+        trending = []
+        for tweet_id, (recent, previous) in counts.items():
+            if recent == 0:
+                continue
+            velocity = self._velocity(recent, previous)
+            trending.append({
+                "tweet_id": tweet_id,
+                "recent": recent,
+                "previous": previous,
+                "velocity": velocity,
+                # Volume in the current window, boosted by how fast it is growing
+                "score": recent * (1 + velocity),
+            })
+        trending.sort(key=lambda t: (t["score"], t["recent"], t["tweet_id"]), reverse=True)
+        return trending[:TRENDING_CACHE_SIZE]
+
+    async def get_trending(self, limit: Optional[int] = None) -> List[dict]:
+        """Tweets with the most engagement momentum, shared by all viewers"""
+        try:
+            trending = await cache_service.cache_with_lock(
+                TRENDING_CACHE_KEY,
+                self._compute_trending,
+                ttl=settings.TRENDING_CACHE_TTL,
+                lock_ttl=10,
+            )
+        except Exception as e:
+            logger.error(f"Failed to compute trending tweets: {e}")
+            return []
+        return (trending or [])[:limit] if limit else (trending or [])
+
+
+engagement_velocity = EngagementVelocityService()
@@ -0,0 +1,214 @@
+import logging
+from typing import Dict, Iterable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, literal, union_all
+from caching.cache_service import cache_service, versioned_key
+from core.config import get_settings
+from tweets.models.TweetLike import TweetLike
+from tweets.models.Bookmark import Bookmark
+from tweets.models.Share import Share
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Overlay flag -> (set name, model holding the viewer's rows)
+INTERACTIONS = {
+    "is_liked": ("liked", TweetLike),
+    "is_bookmarked": ("bookmarked", Bookmark),
+    "is_shared": ("shared", Share),
+}
+# Member present in every loaded set, so an empty history still counts as loaded
+SENTINEL = 0
+LOAD_CHUNK_SIZE = 1000
+# Longest a load may take between opening its journal and building the set
+LOAD_JOURNAL_TTL = 60
+
+# Only touch sets that have been loaded; unloaded ones are built from the DB on first read.
+# While a load is running its journal exists, and changes are recorded there instead.
+# KEYS[1] = set, KEYS[2] = load journal, ARGV[1] = "add" or "remove", ARGV[2] = ttl,
+# ARGV[3..] = tweet ids
+UPDATE_IF_LOADED_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        local op = string.sub(ARGV[1], 1, 1)
+        for i = 3, #ARGV do
+            redis.call('RPUSH', KEYS[2], op .. ':' .. ARGV[i])
+        end
+    end
+    return 0
+end
+if ARGV[1] == 'add' then
+    redis.call('SADD', KEYS[1], unpack(ARGV, 3))
+else
+    redis.call('SREM', KEYS[1], unpack(ARGV, 3))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# Build a set from a database snapshot, then replay the changes journaled since the
+# load started (the snapshot may or may not include them; replaying is idempotent).
+# A set already built by a concurrent load is current and left alone.
+# KEYS[1] = set, KEYS[2] = load journal, ARGV[1] = ttl, ARGV[2] = sentinel,
+# ARGV[3..] = snapshot tweet ids
+LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('SADD', KEYS[1], ARGV[2])
+for i = 3, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+for _, entry in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+    local op = string.sub(entry, 1, 1)
+    if op == 'a' then
+        redis.call('SADD', KEYS[1], string.sub(entry, 3))
+    elseif op == 'r' then
+        redis.call('SREM', KEYS[1], string.sub(entry, 3))
+    end
+end
+redis.call('DEL', KEYS[2])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class InteractionSetService:
+    """The viewer's liked, bookmarked and shared tweet ids as Redis sets.
+
+    Sets are loaded from the database the first time a viewer's flags are needed and
+    kept current by the write paths; integer members keep small sets in Redis' compact
+    intset encoding. Resolving the flags for a page of tweets is one pipelined
+    SMISMEMBER per set. While Redis is unavailable the flags come from one database
+    query instead.
+    """
+
+    def _cache_key(self, user_id: str, name: str) -> str:
+        return f"user_interactions:{user_id}:{name}"
+
+    def _key(self, user_id: str, name: str) -> str:
+        return versioned_key(self._cache_key(user_id, name))
+
+    def _journal_key(self, user_id: str, name: str) -> str:
+        return versioned_key(f"{self._cache_key(user_id, name)}:loading")
+
+    async def _update(self, user_id: str, name: str, action: str, tweet_ids: List[int]) -> None:
+        if not tweet_ids:
+            return
+        try:
+            script = await cache_service.get_script("interaction_update", UPDATE_IF_LOADED_SCRIPT)
+            await script(
+                keys=[self._key(user_id, name), self._journal_key(user_id, name)],
+                args=[action, settings.INTERACTION_SET_TTL, *tweet_ids],
+            )
+        except Exception as e:
+            logger.error(f"Failed to update {name} set for {user_id}: {e}")
+            # A stale set is worse than a cold one
+            await cache_service.delete(self._cache_key(user_id, name))
+
+    async def add(self, user_id: str, name: str, *tweet_ids: int) -> None:
+        await self._update(user_id, name, "add", list(tweet_ids))
+
+    async def remove(self, user_id: str, name: str, *tweet_ids: int) -> None:
+        await self._update(user_id, name, "remove", list(tweet_ids))
+
+    async def _load(self, db: AsyncSession, user_id: str, names: List[str]) -> None:
+        """Build sets from the database. The journal is opened before the snapshot is
+        read, so a like committed while loading is replayed onto the new set."""
+        models = {name: model for name, model in INTERACTIONS.values()}
+        async with cache_service.pipeline("interaction_load") as pipe:
+            for name in names:
+                journal = self._journal_key(user_id, name)
+                pipe.rpush(journal, "start")
+                pipe.expire(journal, LOAD_JOURNAL_TTL)
+            await pipe.execute()
+        snapshots = {}
+        for name in names:
+            model = models[name]
+            snapshots[name] = (
+                await db.execute(select(model.tweet_id).where(model.user_id == user_id).distinct())
+            ).scalars().all()
+        script = await cache_service.get_script("interaction_load", LOAD_SCRIPT)
+        async with cache_service.pipeline("interaction_load") as pipe:
+            for name, tweet_ids in snapshots.items():
+                await script(
+                    keys=[self._key(user_id, name), self._journal_key(user_id, name)],
+                    args=[settings.INTERACTION_SET_TTL, SENTINEL, *tweet_ids],
+                    client=pipe,
+                )
+            await pipe.execute()
+
+    async def _check(self, user_id: str, tweet_ids: List[int]) -> Dict[str, list]:
+        async with cache_service.pipeline("interaction_check") as pipe:
+            for name, _ in INTERACTIONS.values():
+                pipe.smismember(self._key(user_id, name), SENTINEL, *tweet_ids)
+            results = await pipe.execute()
+        return {name: result for (name, _), result in zip(INTERACTIONS.values(), results)}
+
+    async def get_flags(
+        self, db: AsyncSession, user_id: str, tweet_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, bool]]:
+        """is_liked / is_bookmarked / is_shared for each tweet"""
+        tweet_ids = list(dict.fromkeys(int(t) for t in tweet_ids))
+        if not tweet_ids:
+            return {}
+        try:
+            membership = await self._check(user_id, tweet_ids)
+            unloaded = [name for name, result in membership.items() if not result[0]]
+            if unloaded:
+                await self._load(db, user_id, unloaded)
+                membership = await self._check(user_id, tweet_ids)
+        except Exception as e:
+            logger.warning(f"Interaction sets unavailable for {user_id}, reading flags from the database: {e}")
+            return await self._get_flags_from_database(db, user_id, tweet_ids)
+        return {
+            tweet_id: {
+                flag: bool(membership[name][index + 1])
+                for flag, (name, _) in INTERACTIONS.items()
+            }
+            for index, tweet_id in enumerate(tweet_ids)
+        }
+
+    async def _get_flags_from_database(
+        self, db: AsyncSession, user_id: str, tweet_ids: List[int]
+    ) -> Dict[int, Dict[str, bool]]:
+        flags = {tweet_id: {flag: False for flag in INTERACTIONS} for tweet_id in tweet_ids}
+        query = union_all(*(
+            select(literal(flag).label("flag"), model.tweet_id.label("tweet_id"))
+            .where(model.user_id == user_id, model.tweet_id.in_(tweet_ids))
+            for flag, (_, model) in INTERACTIONS.items()
+        ))
+        for row in (await db.execute(query)).all():
+            flags[row.tweet_id][row.flag] = True
+        return flags
+
+    async def get_memory_report(self, user_id: str) -> dict:
+        """Members and Redis memory per interaction set of one user"""
+        names = [name for name, _ in INTERACTIONS.values()]
+        async with cache_service.pipeline("interaction_memory") as pipe:
+            for name in names:
+                key = self._key(user_id, name)
+                pipe.scard(key)
+                pipe.memory_usage(key)
+                pipe.object("encoding", key)
+            # OBJECT ENCODING errors for sets that are not loaded
+            results = await pipe.execute(raise_on_error=False)
+        sets = {}
+        for index, name in enumerate(names):
+            members, memory, encoding = results[index * 3 : index * 3 + 3]
+            if isinstance(encoding, Exception):
+                encoding = None
+            sets[name] = {
+                "loaded": members > 0,
+                "members": max(members - 1, 0),
+                "memory_bytes": memory or 0,
+                "encoding": encoding.decode() if isinstance(encoding, bytes) else encoding,
+            }
+        return {
+            "user_id": user_id,
+            "sets": sets,
+            "total_memory_bytes": sum(s["memory_bytes"] for s in sets.values()),
+        }
+
+
+interaction_sets = InteractionSetService()
@@ -0,0 +1,191 @@
+import asyncio
+import contextvars
+import json
+import logging
+import secrets
+from typing import Dict, Iterable, List, Tuple
+from caching.cache_service import cache_service, versioned_key
+from core.config import get_settings
+from database.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STREAM_KEY = "invalidation_stream"
+CONSUMER_GROUP = "invalidators"
+# Invalidations that look up followers and need a database session of their own
+DB_METHODS = {"invalidate_feed_for_followers"}
+# Entries a consumer has held this long without acknowledging are taken over by another
+CLAIM_IDLE_MS = 30000
+
+Call = Tuple[str, tuple]
+
+
+class InvalidationQueue:
+    """Cache invalidations applied off the request path.
+
+    Write paths ``defer`` a call to one of the ``CacheService.invalidate_*`` methods.
+    Calls are buffered in process, where identical calls collapse into one (100
+    likes on a tweet in one interval are one engagement invalidation). Every
+    INVALIDATION_FLUSH_INTERVAL the buffer is appended to a Redis stream as one
+    entry; a consumer group spread over all instances reads the stream, collapses
+    identical calls across the entries it reads and applies them. Entries are only
+    acknowledged once applied, so those held by a crashed consumer are taken over.
+
+    Deferred invalidations land within about a second. Invalidations the acting
+    user must see on their very next read stay inline at the call site.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Call, None] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._consumer = f"consumer-{secrets.token_hex(6)}"
+        self._running = False
+        self.deferred = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.failed = 0
+        self.stream_errors = 0
+
+    async def start(self) -> None:
+        if self._running or not settings.INVALIDATION_QUEUE_ENABLED:
+            return
+        try:
+            async with cache_service.pipeline("invalidation_group") as pipe:
+                pipe.xgroup_create(versioned_key(STREAM_KEY), CONSUMER_GROUP, id="0", mkstream=True)
+                await pipe.execute()
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                logger.error(f"Invalidation queue unavailable, invalidating inline: {e}")
+                return
+        self._running = True
+        for loop_func in (self._flush_loop, self._consume_loop):
+            self._tasks.append(asyncio.create_task(loop_func(), context=contextvars.Context()))
+        logger.info("Invalidation queue started")
+
+    async def stop(self) -> None:
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Nothing buffered is lost on shutdown
+        await self._apply(self._drain())
+
+    async def defer(self, method: str, *args) -> None:
+        """Queue cache_service.<method>(*args); applied inline when the queue is not running"""
+        if not method.startswith("invalidate_") or not hasattr(cache_service, method):
+            raise ValueError(f"Unknown invalidation: {method}")
+        call = (method, _freeze(args))
+        if not self._running:
+            await self._apply([call])
+            return
+        self.deferred += 1
+        if call in self._pending:
+            self.coalesced += 1
+        self._pending[call] = None
+
+    def _drain(self) -> List[Call]:
+        calls = list(self._pending)
+        self._pending.clear()
+        return calls
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(settings.INVALIDATION_FLUSH_INTERVAL)
+            calls = self._drain()
+            if not calls:
+                continue
+            try:
+                async with cache_service.pipeline("invalidation_enqueue") as pipe:
+                    pipe.xadd(
+                        versioned_key(STREAM_KEY),
+                        {"calls": json.dumps(calls)},
+                        maxlen=settings.INVALIDATION_STREAM_MAXLEN,
+                        approximate=True,
+                    )
+                    await pipe.execute()
+            except Exception as e:
+                self.stream_errors += 1
+                logger.warning(f"Failed to publish {len(calls)} invalidations, applying locally: {e}")
+                await self._apply(calls)
+
+    async def _consume_loop(self) -> None:
+        stream = versioned_key(STREAM_KEY)
+        while self._running:
+            try:
+                async with cache_service.pipeline("invalidation_claim") as pipe:
+                    pipe.xautoclaim(stream, CONSUMER_GROUP, self._consumer, CLAIM_IDLE_MS, "0-0", count=100)
+                    pipe.xreadgroup(CONSUMER_GROUP, self._consumer, {stream: ">"}, count=100, block=1000)
+                    claimed, fresh = await pipe.execute()
+                entries = list(claimed[1]) + _stream_entries(fresh)
+                if not entries:
+                    continue
+                calls: Dict[Call, None] = {}
+                for _, fields in entries:
+                    payload = fields.get(b"calls") if fields else None
+                    for method, args in json.loads(payload or "[]"):
+                        calls[(method, _freeze(args))] = None
+                await self._apply(list(calls))
+                async with cache_service.pipeline("invalidation_ack") as pipe:
+                    pipe.xack(stream, CONSUMER_GROUP, *[entry_id for entry_id, _ in entries])
+                    await pipe.execute()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stream_errors += 1
+                logger.warning(f"Invalidation consumer failed, retrying: {e}")
+                await asyncio.sleep(1)
+
+    async def _apply(self, calls: Iterable[Call]) -> None:
+        calls = list(calls)
+        if not calls:
+            return
+        cache_calls = [call for call in calls if call[0] not in DB_METHODS]
+        db_calls = [call for call in calls if call[0] in DB_METHODS]
+        results = await asyncio.gather(
+            *(getattr(cache_service, method)(*args) for method, args in cache_calls),
+            return_exceptions=True,
+        )
+        if db_calls:
+            # One session, used by one call at a time
+            async with AsyncSessionLocal() as db:
+                for method, args in db_calls:
+                    try:
+                        results.append(await getattr(cache_service, method)(db, *args))
+                    except Exception as e:
+                        results.append(e)
+        for (method, args), result in zip(cache_calls + db_calls, results):
+            if isinstance(result, Exception):
+                self.failed += 1
+                logger.error(f"Deferred invalidation {method}{args} failed: {result}")
+            else:
+                self.applied += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self._running,
+            "pending": len(self._pending),
+            "deferred": self.deferred,
+            "coalesced": self.coalesced,
+            "applied": self.applied,
+            "failed": self.failed,
+            "stream_errors": self.stream_errors,
+        }
+
+
+def _freeze(args) -> tuple:
+    """Hashable arguments, so identical calls collapse (lists such as recipient ids become tuples)"""
+    return tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
+
+
+def _stream_entries(response) -> list:
+    """Entries of an XREADGROUP reply, RESP3 ({stream: [entries]}) or RESP2 ([[stream, entries]])"""
+    if not response:
+        return []
+    if isinstance(response, dict):
+        return [entry for batches in response.values() for batch in batches for entry in batch]
+    return [entry for _, batch in response for entry in batch]
+
+
+invalidation_queue = InvalidationQueue()
@@ -0,0 +1,101 @@
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Returned by get() for keys that are not cached locally (None is a cacheable value)
+MISS = object()
+
+
+class LocalCache:
+    """Bounded in-process LRU with a TTL per entry, in front of Redis.
+
+    Only keys whose namespace (the part before the first ':') has been enabled are
+    kept, each namespace with its own TTL. Values are the decoded objects shared by
+    every reader in the process, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._namespace_ttls: Dict[str, int] = {}
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def enable(self, namespace: str, ttl: int) -> None:
+        self._namespace_ttls[namespace] = ttl
+
+    def namespace_ttl(self, key: str) -> Optional[int]:
+        return self._namespace_ttls.get(key.split(":", 1)[0])
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            if self.namespace_ttl(key) is not None:
+                self.misses += 1
+            return MISS
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[int] = None) -> None:
+        namespace_ttl = self.namespace_ttl(key)
+        if namespace_ttl is None or value is None or size > self.max_bytes:
+            return
+        ttl = min(namespace_ttl, ttl) if ttl else namespace_ttl
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self.memory_bytes += size
+        while len(self._entries) > self.max_entries or self.memory_bytes > self.max_bytes:
+            oldest, _ = next(iter(self._entries.items()))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.memory_bytes -= entry[2]
+        return True
+
+    def invalidate(self, keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> int:
+        removed = sum(1 for key in keys if self._remove(key))
+        for pattern in patterns:
+            for key in [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]:
+                removed += self._remove(key)
+        self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.memory_bytes = 0
+
+    def is_cached_namespace(self, key_or_pattern: str) -> bool:
+        namespace = key_or_pattern.split(":", 1)[0]
+        if any(ch in namespace for ch in "*?["):
+            return any(fnmatch.fnmatchcase(ns, namespace) for ns in self._namespace_ttls)
+        return namespace in self._namespace_ttls
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "memory_bytes": self.memory_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total > 0 else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "namespaces": dict(self._namespace_ttls),
+        }
@@ -0,0 +1,93 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from caching.cache_service import cache_service
+from caching.engagement_counters import engagement_counters
+from core.config import get_settings
+from database.session import AsyncSessionLocal
+from tweets.feed.AuthorAffinity import author_affinity_service
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Job = Callable[[AsyncSession], Awaitable[Any]]
+# Longest wait between attempts to claim a job, so restarts don't push back daily jobs
+CLAIM_POLL_SECONDS = 60
+
+
+class PeriodicJobs:
+    """Maintenance jobs run inside the API process.
+
+    Every instance runs a loop per job that regularly tries to claim the next run
+    with a Redis lock held for the job's interval and never released, so a job
+    runs once per interval across all instances and restarts, on whichever
+    instance claims it. Each run gets a session of its own on the primary. While
+    Redis is unreachable no run is claimed; the jobs flush state kept in Redis anyway.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, tuple] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.stats: Dict[str, dict] = {}
+
+    def register(self, name: str, interval: float, job: Job) -> None:
+        self._jobs[name] = (interval, job)
+        self.stats[name] = {"interval": interval, "runs": 0, "failures": 0, "last_run": None, "last_error": None}
+
+    async def start(self) -> None:
+        if self._tasks or not settings.BACKGROUND_JOBS_ENABLED:
+            return
+        for name in self._jobs:
+            self._tasks.append(asyncio.create_task(self._loop(name), context=contextvars.Context()))
+        logger.info(f"Periodic jobs started: {', '.join(self._jobs)}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _loop(self, name: str) -> None:
+        interval, _ = self._jobs[name]
+        while True:
+            await asyncio.sleep(min(interval, CLAIM_POLL_SECONDS))
+            if await cache_service.acquire_lock(f"job:{name}", ttl=max(1, int(interval))):
+                await self.run(name)
+
+    async def run(self, name: str) -> Any:
+        """Run a job now, on this instance; errors are logged, not raised"""
+        _, job = self._jobs[name]
+        stats = self.stats[name]
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await job(db)
+            stats["runs"] += 1
+            stats["last_error"] = None
+            logger.debug(f"Job {name} finished in {(time.perf_counter() - started) * 1000:.0f}ms: {result}")
+            return result
+        except Exception as e:
+            stats["failures"] += 1
+            stats["last_error"] = f"{type(e).__name__}: {e}"
+            logger.error(f"Job {name} failed: {e}")
+        finally:
+            stats["last_run"] = time.time()
+
+    def get_stats(self) -> dict:
+        return {"running": bool(self._tasks), "jobs": self.stats}
+
+
+periodic_jobs = PeriodicJobs()
+periodic_jobs.register(
+    "persist_engagement_counters", settings.ENGAGEMENT_PERSIST_INTERVAL, engagement_counters.persist_dirty
+)
+periodic_jobs.register(
+    "reconcile_engagement_counters", settings.ENGAGEMENT_RECONCILE_INTERVAL, engagement_counters.reconcile
+)
+periodic_jobs.register(
+    "fold_author_affinity", settings.AFFINITY_FOLD_INTERVAL, author_affinity_service.fold_pending
+)
+periodic_jobs.register("decay_author_affinity", settings.AFFINITY_DECAY_INTERVAL, author_affinity_service.decay)
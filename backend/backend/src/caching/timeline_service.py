@@ -0,0 +1,433 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, desc, func, or_
+from caching.cache_service import cache_service, versioned_key
+from core.config import get_settings
+from tweets.models.Tweet import Tweet
+from user_profile.models.Follower import Follower
+from auth.models.User import User
+from auth.models.UserProfile import UserProfile
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Member used to mark a timeline that was materialized but has no tweets yet,
+# so an empty home timeline is not rebuilt from the database on every read.
+TIMELINE_SENTINEL = 0
+CELEBRITY_SENTINEL = "0:"
+
+# Append to a timeline only if it is already materialized, then trim it to the cap.
+# Missing timelines are rebuilt lazily on the next read instead of being left partial.
+# KEYS[1] = timeline key, ARGV[1] = max size, ARGV[2..] = score/member pairs
+APPEND_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 2, #ARGV, 2 do
+    redis.call('ZADD', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[1]) + 1))
+return 1
+"""
+
+
+class TimelineService:
+    """Per-user home timelines stored as capped Redis sorted sets.
+
+    Members are tweet ids scored by creation time. Tweets from regular authors are
+    pushed into their followers' timelines when posted (fan-out on write). Tweets
+    from celebrity authors - prime/organizational accounts or accounts above
+    TIMELINE_CELEBRITY_FOLLOWER_THRESHOLD followers - go into one shared timeline
+    that is merged in at read time (pull), since pushing them would mean writing
+    into nearly every user's timeline.
+    """
+
+    def _key(self, user_id: str) -> str:
+        return versioned_key(f"home_timeline:{user_id}")
+
+    def _celebrity_key(self) -> str:
+        return versioned_key("celebrity_timeline")
+
+    def _stats_key(self) -> str:
+        return versioned_key("timeline_fanout_stats")
+
+    async def _append_script(self):
+        return await cache_service.get_script("timeline_append", APPEND_IF_EXISTS_SCRIPT)
+
+    async def _get_follower_ids(self, db: AsyncSession, user_id: str) -> List[str]:
+        result = await db.execute(
+            select(Follower.follower_id).where(Follower.followee_id == user_id)
+        )
+        return [row[0] for row in result.all()]
+
+    async def classify_author(self, db: AsyncSession, author_id: str) -> Tuple[bool, int]:
+        """Return (is_celebrity, follower_count) for an author, cached briefly"""
+        cache_key = f"timeline_author_class:{author_id}"
+        cached = await cache_service.get(cache_key)
+        if cached:
+            return cached["celebrity"], cached["followers"]
+        profile = (
+            await db.execute(
+                select(UserProfile.is_prime, UserProfile.is_organizational).where(
+                    UserProfile.user_id == author_id
+                )
+            )
+        ).first()
+        follower_count = (
+            await db.execute(
+                select(func.count()).select_from(Follower).where(Follower.followee_id == author_id)
+            )
+        ).scalar() or 0
+        celebrity = follower_count >= settings.TIMELINE_CELEBRITY_FOLLOWER_THRESHOLD or bool(
+            profile and (profile.is_prime or profile.is_organizational)
+        )
+        await cache_service.set(
+            cache_key,
+            {"celebrity": celebrity, "followers": follower_count},
+            ttl=settings.TIMELINE_AUTHOR_CLASS_TTL,
+        )
+        return celebrity, follower_count
+
+    async def _get_popular_author_ids(
+        self, db: AsyncSession, among_followees_of: Optional[str] = None
+    ) -> List[str]:
+        """Authors at or above the celebrity follower threshold"""
+        query = (
+            select(Follower.followee_id)
+            .group_by(Follower.followee_id)
+            .having(func.count() >= settings.TIMELINE_CELEBRITY_FOLLOWER_THRESHOLD)
+        )
+        if among_followees_of:
+            query = query.where(
+                Follower.followee_id.in_(
+                    select(Follower.followee_id).where(Follower.follower_id == among_followees_of)
+                )
+            )
+        result = await db.execute(query)
+        return [row[0] for row in result.all()]
+
+    async def fan_out_tweet(
+        self, db: AsyncSession, author_id: str, tweet_id: int, created_at: datetime
+    ) -> int:
+        """Push a freshly committed tweet into every follower's home timeline.
+
+        Celebrity tweets are written once to the shared timeline instead.
+        """
+        if not settings.TIMELINE_ENABLED:
+            return 0
+        try:
+            score = created_at.timestamp()
+            script = await self._append_script()
+            celebrity, follower_count = await self.classify_author(db, author_id)
+            if celebrity:
+                async with cache_service.pipeline("timeline_fanout_celebrity") as pipe:
+                    await script(
+                        keys=[self._celebrity_key()],
+                        args=[settings.TIMELINE_CELEBRITY_MAX_SIZE, score, f"{tweet_id}:{author_id}"],
+                        client=pipe,
+                    )
+                    pipe.hincrby(self._stats_key(), "celebrity_tweets", 1)
+                    pipe.hincrby(self._stats_key(), "saved_writes", follower_count)
+                    await pipe.execute()
+                logger.info(
+                    f"Tweet {tweet_id} from celebrity {author_id} stored in shared timeline, "
+                    f"skipped {follower_count} fan-out writes"
+                )
+                return 0
+
+            follower_ids = await self._get_follower_ids(db, author_id)
+            batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+            updated = 0
+            for i in range(0, len(follower_ids), batch_size):
+                chunk = follower_ids[i : i + batch_size]
+                async with cache_service.pipeline("timeline_fanout") as pipe:
+                    for follower_id in chunk:
+                        await script(
+                            keys=[self._key(follower_id)],
+                            args=[settings.TIMELINE_MAX_SIZE, score, tweet_id],
+                            client=pipe,
+                        )
+                    results = await pipe.execute()
+                updated += sum(1 for r in results if r)
+            async with cache_service.pipeline("timeline_fanout_stats") as pipe:
+                pipe.hincrby(self._stats_key(), "regular_tweets", 1)
+                pipe.hincrby(self._stats_key(), "pushed_writes", len(follower_ids))
+                await pipe.execute()
+            logger.info(
+                f"Fanned out tweet {tweet_id} from {author_id} to {updated}/{len(follower_ids)} timelines"
+            )
+            return updated
+        except Exception as e:
+            logger.error(f"Failed to fan out tweet {tweet_id} from {author_id}: {e}")
+            return 0
+
+    async def remove_tweet(self, db: AsyncSession, author_id: str, tweet_id: int) -> None:
+        """Remove a deleted tweet from the shared timeline and the author's followers' timelines.
+
+        Both are cleaned whatever the author's class is now: an author who crossed the
+        celebrity threshold after posting still has the tweet in follower timelines, and
+        one who dropped below it still has it in the shared timeline.
+        """
+        if not settings.TIMELINE_ENABLED:
+            return
+        try:
+            async with cache_service.pipeline("timeline_remove_tweet") as pipe:
+                pipe.zrem(self._celebrity_key(), f"{tweet_id}:{author_id}")
+                await pipe.execute()
+            follower_ids = await self._get_follower_ids(db, author_id)
+            batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+            for i in range(0, len(follower_ids), batch_size):
+                chunk = follower_ids[i : i + batch_size]
+                async with cache_service.pipeline("timeline_remove_tweet") as pipe:
+                    for follower_id in chunk:
+                        pipe.zrem(self._key(follower_id), tweet_id)
+                    await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to remove tweet {tweet_id} from timelines: {e}")
+
+    async def merge_author(self, db: AsyncSession, follower_id: str, followee_id: str) -> None:
+        """Merge a newly followed author's recent tweets into the follower's timeline"""
+        if not settings.TIMELINE_ENABLED:
+            return
+        try:
+            celebrity, _ = await self.classify_author(db, followee_id)
+            if celebrity:
+                # Already merged at read time from the shared timeline
+                return
+            cutoff = datetime.now() - timedelta(days=settings.TIMELINE_REBUILD_DAYS)
+            result = await db.execute(
+                select(Tweet.id, Tweet.created_at)
+                .where(Tweet.user_id == followee_id, Tweet.created_at >= cutoff)
+                .order_by(desc(Tweet.created_at))
+                .limit(settings.TIMELINE_MAX_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                return
+            args = [settings.TIMELINE_MAX_SIZE]
+            for row in rows:
+                args.extend([row.created_at.timestamp(), row.id])
+            script = await self._append_script()
+            async with cache_service.pipeline("timeline_merge_author") as pipe:
+                await script(keys=[self._key(follower_id)], args=args, client=pipe)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to merge {followee_id} into timeline of {follower_id}: {e}")
+
+    async def remove_author(self, db: AsyncSession, follower_id: str, followee_id: str) -> None:
+        """Drop an unfollowed author's tweets from the follower's timeline"""
+        if not settings.TIMELINE_ENABLED:
+            return
+        try:
+            result = await db.execute(
+                select(Tweet.id)
+                .where(Tweet.user_id == followee_id)
+                .order_by(desc(Tweet.created_at))
+                .limit(settings.TIMELINE_MAX_SIZE)
+            )
+            tweet_ids = [row[0] for row in result.all()]
+            if not tweet_ids:
+                return
+            async with cache_service.pipeline("timeline_remove_author") as pipe:
+                pipe.zrem(self._key(follower_id), *tweet_ids)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to remove {followee_id} from timeline of {follower_id}: {e}")
+
+    async def rebuild_timeline(self, db: AsyncSession, user_id: str) -> int:
+        """Materialize a user's timeline from the tweets of the regular authors they follow"""
+        cutoff = datetime.now() - timedelta(days=settings.TIMELINE_REBUILD_DAYS)
+        popular_ids = await self._get_popular_author_ids(db, among_followees_of=user_id)
+        query = (
+            select(Tweet.id, Tweet.created_at)
+            .join(Follower, Follower.followee_id == Tweet.user_id)
+            .join(UserProfile, UserProfile.user_id == Tweet.user_id)
+            .where(
+                Follower.follower_id == user_id,
+                Tweet.created_at >= cutoff,
+                UserProfile.is_prime == False,
+                UserProfile.is_organizational == False,
+            )
+        )
+        if popular_ids:
+            query = query.where(Tweet.user_id.notin_(popular_ids))
+        result = await db.execute(
+            query.order_by(desc(Tweet.created_at)).limit(settings.TIMELINE_MAX_SIZE)
+        )
+        rows = result.all()
+        mapping = {TIMELINE_SENTINEL: 0}
+        for row in rows:
+            mapping[row.id] = row.created_at.timestamp()
+        key = self._key(user_id)
+        async with cache_service.pipeline("timeline_rebuild", transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.zadd(key, mapping)
+            pipe.expire(key, settings.TIMELINE_TTL)
+            await pipe.execute()
+        logger.info(f"Rebuilt home timeline for {user_id} with {len(rows)} tweets")
+        return len(rows)
+
+    async def rebuild_celebrity_timeline(self, db: AsyncSession) -> int:
+        """Materialize the shared timeline from recent tweets of all celebrity authors"""
+        cutoff = datetime.now() - timedelta(days=settings.TIMELINE_REBUILD_DAYS)
+        popular_ids = await self._get_popular_author_ids(db)
+        celebrity_condition = or_(
+            UserProfile.is_prime == True, UserProfile.is_organizational == True
+        )
+        if popular_ids:
+            celebrity_condition = or_(celebrity_condition, Tweet.user_id.in_(popular_ids))
+        result = await db.execute(
+            select(Tweet.id, Tweet.user_id, Tweet.created_at)
+            .join(UserProfile, UserProfile.user_id == Tweet.user_id)
+            .where(Tweet.created_at >= cutoff, celebrity_condition)
+            .order_by(desc(Tweet.created_at))
+            .limit(settings.TIMELINE_CELEBRITY_MAX_SIZE)
+        )
+        rows = result.all()
+        mapping = {CELEBRITY_SENTINEL: 0}
+        for row in rows:
+            mapping[f"{row.id}:{row.user_id}"] = row.created_at.timestamp()
+        key = self._celebrity_key()
+        async with cache_service.pipeline("timeline_rebuild_celebrity", transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.zadd(key, mapping)
+            pipe.expire(key, settings.TIMELINE_TTL)
+            await pipe.execute()
+        logger.info(f"Rebuilt shared celebrity timeline with {len(rows)} tweets")
+        return len(rows)
+
+    async def _read_timeline(
+        self,
+        key: str,
+        rebuild: Callable[[], Awaitable[int]],
+        min_time: Optional[datetime],
+        max_time: Optional[datetime],
+        limit: int,
+    ) -> Optional[List[bytes]]:
+        """Newest-first members within the time window, rebuilding the timeline once if missing"""
+        max_score = f"({max_time.timestamp()}" if max_time else "+inf"
+        min_score = min_time.timestamp() if min_time else "(0"
+        for attempt in range(2):
+            async with cache_service.pipeline("timeline_read") as pipe:
+                pipe.exists(key)
+                pipe.zrevrangebyscore(key, max_score, min_score, start=0, num=limit)
+                pipe.expire(key, settings.TIMELINE_TTL)
+                exists, members, _ = await pipe.execute()
+            if exists:
+                return members
+            if attempt == 0:
+                await rebuild()
+        return None
+
+    async def get_tweet_ids(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        min_time: Optional[datetime] = None,
+        max_time: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[List[int]]:
+        """Newest-first tweet ids from the user's timeline within an optional time window.
+
+        Returns None when the timeline cannot be read so callers can fall back to a scan.
+        """
+        if not settings.TIMELINE_ENABLED:
+            return None
+        try:
+            members = await self._read_timeline(
+                self._key(user_id),
+                lambda: self.rebuild_timeline(db, user_id),
+                min_time,
+                max_time,
+                limit or settings.TIMELINE_MAX_SIZE,
+            )
+            if members is None:
+                return None
+            return [int(m) for m in members if int(m) != TIMELINE_SENTINEL]
+        except Exception as e:
+            logger.error(f"Failed to read home timeline for {user_id}: {e}")
+            return None
+
+    async def get_celebrity_tweet_ids(
+        self,
+        db: AsyncSession,
+        author_ids: Iterable[str],
+        min_time: Optional[datetime] = None,
+        max_time: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[List[int]]:
+        """Newest-first tweet ids from the shared timeline, restricted to the given authors"""
+        if not settings.TIMELINE_ENABLED:
+            return None
+        try:
+            members = await self._read_timeline(
+                self._celebrity_key(),
+                lambda: self.rebuild_celebrity_timeline(db),
+                min_time,
+                max_time,
+                settings.TIMELINE_CELEBRITY_MAX_SIZE,
+            )
+            if members is None:
+                return None
+            allowed = set(author_ids)
+            tweet_ids = []
+            for member in members:
+                tweet_id, _, author_id = member.decode().partition(":")
+                if author_id in allowed and tweet_id != "0":
+                    tweet_ids.append(int(tweet_id))
+            return tweet_ids[:limit] if limit else tweet_ids
+        except Exception as e:
+            logger.error(f"Failed to read celebrity timeline: {e}")
+            return None
+
+    async def get_fanout_stats(self) -> dict:
+        """Counters for fan-out writes performed and writes avoided by the celebrity timeline"""
+        async with cache_service.pipeline("timeline_fanout_stats") as pipe:
+            pipe.hgetall(self._stats_key())
+            (raw,) = await pipe.execute()
+        stats = {k.decode(): int(v) for k, v in (raw or {}).items()}
+        pushed = stats.get("pushed_writes", 0)
+        saved = stats.get("saved_writes", 0)
+        total = pushed + saved
+        return {
+            "regular_tweets": stats.get("regular_tweets", 0),
+            "celebrity_tweets": stats.get("celebrity_tweets", 0),
+            "pushed_writes": pushed,
+            "saved_writes": saved,
+            "saved_percent": round(saved / total * 100, 2) if total else 0.0,
+            "celebrity_follower_threshold": settings.TIMELINE_CELEBRITY_FOLLOWER_THRESHOLD,
+        }
+
+    async def backfill(self, db: AsyncSession, batch_size: int = 200) -> int:
+        """Rebuild the shared timeline and the timelines of every active user"""
+        await self.rebuild_celebrity_timeline(db)
+        rebuilt = 0
+        last_user_id = ""
+        while True:
+            result = await db.execute(
+                select(User.user_id)
+                .where(
+                    User.user_id > last_user_id,
+                    User.is_active == True,
+                    User.is_blocked == False,
+                )
+                .order_by(User.user_id)
+                .limit(batch_size)
+            )
+            user_ids = [row[0] for row in result.all()]
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                try:
+                    await self.rebuild_timeline(db, user_id)
+                    rebuilt += 1
+                except Exception as e:
+                    logger.error(f"Failed to backfill timeline for {user_id}: {e}")
+            last_user_id = user_ids[-1]
+            logger.info(f"Backfilled {rebuilt} home timelines so far (last user {last_user_id})")
+        return rebuilt
+
+
+timeline_service = TimelineService()
@@ -0,0 +1,116 @@
+import logging
+from typing import Dict, Iterable, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from caching.cache_service import cache_service, jittered_ttl
+from caching.interaction_sets import interaction_sets
+from core.config import get_settings
+from tweets.models.Tweet import Tweet
+from tweets.models.TweetMedia import TweetMedia
+from auth.models.User import User
+from auth.models.UserProfile import UserProfile
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump when the document layout changes so old entries are simply never read again
+TWEET_DOC_VERSION = 1
+
+
+class TweetDocumentService:
+    """Two-layer tweet cache.
+
+    The document layer holds everything that is the same for every viewer (text,
+    media, author) under one key per tweet and document version; counts come from the
+    engagement counters. The overlay layer is the viewer's own is_liked /
+    is_bookmarked / is_shared flags, resolved against the viewer's interaction sets.
+    Documents are read with a single MGET per batch and only misses touch the
+    database; invalidation deletes exact keys instead of scanning for patterns.
+    """
+
+    def _doc_key(self, tweet_id: int) -> str:
+        return f"tweet_doc:v{TWEET_DOC_VERSION}:{tweet_id}"
+
+    async def get_documents(self, db: AsyncSession, tweet_ids: Iterable[int]) -> Dict[int, dict]:
+        """Shared documents for existing tweets; deleted tweets are left out"""
+        tweet_ids = list(dict.fromkeys(int(t) for t in tweet_ids))
+        if not tweet_ids:
+            return {}
+        cached = await cache_service.mget([self._doc_key(t) for t in tweet_ids])
+        documents = {
+            tweet_id: doc
+            for tweet_id, doc in zip(tweet_ids, cached)
+            if isinstance(doc, dict)
+        }
+        missing = [t for t in tweet_ids if t not in documents]
+        if missing:
+            loaded = await self._load_documents(db, missing)
+            if loaded:
+                # Per-key jitter, so a page of documents loaded together expires apart
+                keys = {self._doc_key(t): doc for t, doc in loaded.items()}
+                await cache_service.mset(
+                    keys, ttls={key: jittered_ttl(settings.TWEET_DOC_TTL) for key in keys}
+                )
+            documents.update(loaded)
+        return documents
+
+    async def _load_documents(self, db: AsyncSession, tweet_ids: List[int]) -> Dict[int, dict]:
+        rows = (
+            await db.execute(
+                select(
+                    Tweet.id,
+                    Tweet.user_id,
+                    Tweet.text,
+                    Tweet.view_count,
+                    Tweet.created_at,
+                    Tweet.edited_at,
+                    User.is_blocked,
+                    UserProfile.name,
+                    UserProfile.photo_path,
+                    UserProfile.photo_content_type,
+                    UserProfile.is_organizational,
+                    UserProfile.is_prime,
+                )
+                .join(User, User.user_id == Tweet.user_id)
+                .outerjoin(UserProfile, UserProfile.user_id == Tweet.user_id)
+                .where(Tweet.id.in_(tweet_ids))
+            )
+        ).all()
+        media: Dict[int, list] = {}
+        for item in (
+            await db.execute(
+                select(TweetMedia).where(TweetMedia.tweet_id.in_(tweet_ids)).order_by(TweetMedia.id)
+            )
+        ).scalars().all():
+            media.setdefault(item.tweet_id, []).append(
+                {"media_type": item.media_type, "media_path": item.media_path}
+            )
+        return {
+            row.id: {
+                "id": row.id,
+                "user_id": row.user_id,
+                "text": row.text,
+                "media": media.get(row.id, []),
+                "view_count": row.view_count or 0,
+                "created_at": row.created_at,
+                "edited_at": row.edited_at,
+                "user_name": row.name or "Unknown User",
+                "photo": row.photo_path if row.photo_path and row.photo_content_type else None,
+                "is_organizational": bool(row.is_organizational),
+                "is_prime": bool(row.is_prime),
+                "author_blocked": bool(row.is_blocked),
+            }
+            for row in rows
+        }
+
+    async def get_overlays(
+        self, db: AsyncSession, user_id: str, tweet_ids: Iterable[int]
+    ) -> Dict[int, Dict[str, bool]]:
+        """The viewer's is_liked / is_bookmarked / is_shared flags for a batch of tweets"""
+        return await interaction_sets.get_flags(db, user_id, tweet_ids)
+
+    async def invalidate_document(self, *tweet_ids: int) -> None:
+        await cache_service.delete(*[self._doc_key(t) for t in tweet_ids])
+
+
+tweet_documents = TweetDocumentService()
@@ -9,6 +9,7 @@ class CacheConstants:
     
     # Core Data Types
     PROFILE_TTL = 1800          # 30 minutes - User profiles
+    PROFILE_STALE_TTL = 1800    # 30 minutes - Expired profiles served while they revalidate
     SOCIAL_GRAPH_TTL = 1800     # 30 minutes - Follow/following relationships
     FEED_TTL = 600              # 10 minutes - Tweet feeds
     ENGAGEMENT_TTL = 300        # 5 minutes - Likes, comments, shares
@@ -22,6 +23,7 @@ class CacheConstants:
     ACTIVITY_TTL = 300          # 5 minutes - Recent activity
     NOTIFICATIONS_TTL = 180     # 3 minutes - Notifications
     PRESENCE_TTL = 60           # 1 minute - Online status
+    USER_STATUS_TTL = 60        # 1 minute - Active/blocked check on every authenticated request
     
     # Media and Static Content
     MEDIA_TTL = 7200           # 2 hours - Media metadata
@@ -75,6 +77,21 @@ class CacheKeyPatterns:
     VELOCITY_SCORES = "velocity:{tweet_ids_hash}"
 
 
+class GenerationScopes:
+    """Generation counters (gen:{scope}) embedded in cache keys.
+
+    Keys are built with ``cache_service.gen_key(base, *scopes)``; bumping a scope
+    orphans every key built on it in one INCR, and the orphans age out by TTL.
+    """
+
+    USER = "user:{user_id}"      # profile, social graph lists, mutual followers
+    FEED = "feed:{user_id}"      # ranked feed, following ids/metadata, shared tweet lists
+    TWEET = "tweet:{tweet_id}"   # comment pages and anything else derived from one tweet
+    GLOBAL_FEED = "global:feed"  # every feed (global ranking inputs changed)
+    GLOBAL_SEARCH = "global:search"
+    GLOBAL_ADMIN = "global:admin"
+
+
 class CacheStrategies(Enum):
     """Cache strategy types for different operations"""
     
@@ -107,6 +124,26 @@ class CacheSettings:
     ENABLE_METRICS = True
     METRICS_SAMPLE_RATE = 0.1  # 10% sampling for detailed metrics
     
+    # In-process L1 in front of Redis, per key namespace (the part before the first ':').
+    # TTLs are short bounds; deletes and writes evict L1 entries on every instance.
+    L1_NAMESPACES = {
+        "interests_catalog": 300,      # interest catalog
+        "top_accounts": 120,           # prime/org top accounts
+        "timeline_author_class": 60,   # prime/org and celebrity classification per author
+        "access_token": 30,            # token checks on every authenticated request
+        "user_status": 30,             # active/blocked checks on every authenticated request
+        "gen": 5,                      # generation counters read while building keys
+    }
+    L1_MAX_ENTRIES = 10000
+    L1_MAX_BYTES = 32 * 1024 * 1024
+
+    # Generation counters: idle expiry must exceed the longest TTL of a key built on them
+    GENERATION_TTL = 30 * 24 * 3600
+    GENERATION_BUMP_BATCH = 500  # scopes per pipeline round trip
+
+    # Keys per MGET in batched reads (all chunks still share one round trip)
+    PIPELINE_BATCH = 500
+
     # Cache warming
     ENABLE_WARM_UP = True
     WARM_UP_BATCH_SIZE = 50
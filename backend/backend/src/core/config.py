@@ -15,9 +15,33 @@ class Settings(BaseSettings):
     DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", 20))
     DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", 0))
     DATABASE_POOL_TIMEOUT: int = int(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+    # Read replicas (database/replicas.py): comma-separated URLs, empty sends every read to the primary
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    DATABASE_REPLICA_POOL_SIZE: int = int(os.getenv("DATABASE_REPLICA_POOL_SIZE", 20))
+    DATABASE_REPLICA_MAX_OVERFLOW: int = int(os.getenv("DATABASE_REPLICA_MAX_OVERFLOW", 40))
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", 5))
+    DATABASE_REPLICA_HEALTH_INTERVAL: float = float(os.getenv("DATABASE_REPLICA_HEALTH_INTERVAL", 5))
+    DATABASE_REPLICA_HEALTH_TIMEOUT: float = float(os.getenv("DATABASE_REPLICA_HEALTH_TIMEOUT", 2))
+    # Reads from a client stay on the primary this long after it sent a write
+    DATABASE_PRIMARY_PIN_SECONDS: int = int(os.getenv("DATABASE_PRIMARY_PIN_SECONDS", 10))
+    # Independent read queries on separate connections (database/fanout.py)
+    QUERY_FANOUT_ENABLED: bool = os.getenv("QUERY_FANOUT_ENABLED", "TRUE").upper() == "TRUE"
+    QUERY_FANOUT_CONCURRENCY: int = int(os.getenv("QUERY_FANOUT_CONCURRENCY", 4))
+    QUERY_FANOUT_MAX_CONNECTIONS: int = int(os.getenv("QUERY_FANOUT_MAX_CONNECTIONS", 20))
+    QUERY_FANOUT_TIMEOUT: float = float(os.getenv("QUERY_FANOUT_TIMEOUT", 5.0))
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     REDIS_POOL_SIZE: int = int(os.getenv("REDIS_POOL_SIZE", 20))
     REDIS_TIMEOUT: int = int(os.getenv("REDIS_TIMEOUT", 5))
+    # Circuit breaker around Redis (caching/circuit_breaker.py): while open the cache is bypassed
+    REDIS_CIRCUIT_ENABLED: bool = os.getenv("REDIS_CIRCUIT_ENABLED", "TRUE").upper() == "TRUE"
+    REDIS_CIRCUIT_WINDOW_SECONDS: float = float(os.getenv("REDIS_CIRCUIT_WINDOW_SECONDS", 10))
+    REDIS_CIRCUIT_MIN_CALLS: int = int(os.getenv("REDIS_CIRCUIT_MIN_CALLS", 20))
+    REDIS_CIRCUIT_FAILURE_RATE: float = float(os.getenv("REDIS_CIRCUIT_FAILURE_RATE", 0.5))
+    REDIS_CIRCUIT_SLOW_CALL_MS: float = float(os.getenv("REDIS_CIRCUIT_SLOW_CALL_MS", 250))
+    REDIS_CIRCUIT_SLOW_RATE: float = float(os.getenv("REDIS_CIRCUIT_SLOW_RATE", 0.8))
+    REDIS_CIRCUIT_PROBE_INTERVAL: float = float(os.getenv("REDIS_CIRCUIT_PROBE_INTERVAL", 5))
+    REDIS_CIRCUIT_PROBE_TIMEOUT: float = float(os.getenv("REDIS_CIRCUIT_PROBE_TIMEOUT", 0.5))
+    REDIS_CIRCUIT_HALF_OPEN_CALLS: int = int(os.getenv("REDIS_CIRCUIT_HALF_OPEN_CALLS", 5))
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_HOURS: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_HOURS", 8))
@@ -25,6 +49,9 @@ class Settings(BaseSettings):
     BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
     PASSWORD_MIN_LENGTH: int = int(os.getenv("PASSWORD_MIN_LENGTH", 8))
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", 60))
+    # In-process token bucket in front of the shared Redis window (core/rate_limit.py)
+    RATE_LIMIT_LOCAL_BUCKET: bool = os.getenv("RATE_LIMIT_LOCAL_BUCKET", "FALSE").upper() == "TRUE"
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_LOCAL_MAX_KEYS", 10000))
     SENTRY_DSN: Optional[str] = os.getenv("SENTRY_DSN", "")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     PROFILE_CACHE_TTL: int = int(os.getenv("PROFILE_CACHE_TTL", 3600))
@@ -48,7 +75,80 @@ class Settings(BaseSettings):
     RECOMMENDATION_FOLLOWING_WITHOUT_ENGAGEMENT_PERCENT: int = int(os.getenv("RECOMMENDATION_FOLLOWING_WITHOUT_ENGAGEMENT_PERCENT", 15))
     RECOMMENDATION_MAX_TWEETS_LIMIT: int = int(os.getenv("RECOMMENDATION_MAX_TWEETS_LIMIT", 2000))
     RECOMMENDATION_QUERY_TIMEOUT: int = int(os.getenv("RECOMMENDATION_QUERY_TIMEOUT", 5))
-    
+
+    # Materialized home timelines (fan-out on write)
+    TIMELINE_ENABLED: bool = os.getenv("TIMELINE_ENABLED", "TRUE").upper() == "TRUE"
+    TIMELINE_MAX_SIZE: int = int(os.getenv("TIMELINE_MAX_SIZE", 800))
+    TIMELINE_TTL: int = int(os.getenv("TIMELINE_TTL", 604800))
+    TIMELINE_REBUILD_DAYS: int = int(os.getenv("TIMELINE_REBUILD_DAYS", 30))
+    TIMELINE_FANOUT_BATCH_SIZE: int = int(os.getenv("TIMELINE_FANOUT_BATCH_SIZE", 500))
+    TIMELINE_CELEBRITY_FOLLOWER_THRESHOLD: int = int(os.getenv("TIMELINE_CELEBRITY_FOLLOWER_THRESHOLD", 10000))
+    TIMELINE_CELEBRITY_MAX_SIZE: int = int(os.getenv("TIMELINE_CELEBRITY_MAX_SIZE", 2000))
+    TIMELINE_AUTHOR_CLASS_TTL: int = int(os.getenv("TIMELINE_AUTHOR_CLASS_TTL", 600))
+
+    # Feed sessions (ranked snapshot served through an opaque cursor)
+    FEED_SESSION_TTL: int = int(os.getenv("FEED_SESSION_TTL", 900))
+    FEED_SESSION_REUSE_TTL: int = int(os.getenv("FEED_SESSION_REUSE_TTL", 300))
+    FEED_SESSION_MAX_ITEMS: int = int(os.getenv("FEED_SESSION_MAX_ITEMS", 1000))
+
+    # Engagement counters (Redis hash per tweet, persisted to tweet_stats)
+    ENGAGEMENT_COUNTER_TTL: int = int(os.getenv("ENGAGEMENT_COUNTER_TTL", 604800))
+    ENGAGEMENT_PERSIST_INTERVAL: int = int(os.getenv("ENGAGEMENT_PERSIST_INTERVAL", 60))
+    ENGAGEMENT_PERSIST_BATCH_SIZE: int = int(os.getenv("ENGAGEMENT_PERSIST_BATCH_SIZE", 500))
+    ENGAGEMENT_RECONCILE_INTERVAL: int = int(os.getenv("ENGAGEMENT_RECONCILE_INTERVAL", 86400))
+    ENGAGEMENT_RECONCILE_DAYS: int = int(os.getenv("ENGAGEMENT_RECONCILE_DAYS", 7))
+
+    # Engagement velocity (per-minute buckets shared by ranking and trending)
+    VELOCITY_WINDOW_MINUTES: int = int(os.getenv("VELOCITY_WINDOW_MINUTES", 30))
+    VELOCITY_BUCKET_TTL: int = int(os.getenv("VELOCITY_BUCKET_TTL", 7200))
+    TRENDING_MAX_CANDIDATES: int = int(os.getenv("TRENDING_MAX_CANDIDATES", 2000))
+    TRENDING_CACHE_TTL: int = int(os.getenv("TRENDING_CACHE_TTL", 30))
+
+    # Tweet cache layers (shared document + per-viewer interaction sets)
+    TWEET_DOC_TTL: int = int(os.getenv("TWEET_DOC_TTL", 900))
+    INTERACTION_SET_TTL: int = int(os.getenv("INTERACTION_SET_TTL", 86400))
+
+    # Author affinity (viewer -> author engagement score with exponential decay)
+    AFFINITY_HALF_LIFE_HOURS: float = float(os.getenv("AFFINITY_HALF_LIFE_HOURS", 168))
+    AFFINITY_DECAY_INTERVAL: int = int(os.getenv("AFFINITY_DECAY_INTERVAL", 3600))
+    AFFINITY_FOLD_INTERVAL: int = int(os.getenv("AFFINITY_FOLD_INTERVAL", 60))
+    AFFINITY_MIN_SCORE: float = float(os.getenv("AFFINITY_MIN_SCORE", 0.05))
+    AFFINITY_MAX_AUTHORS: int = int(os.getenv("AFFINITY_MAX_AUTHORS", 200))
+    AFFINITY_CACHE_TTL: int = int(os.getenv("AFFINITY_CACHE_TTL", 300))
+    AFFINITY_REBUILD_DAYS: int = int(os.getenv("AFFINITY_REBUILD_DAYS", 30))
+
+    # Shared feed candidate pool (prime organizational authors)
+    FEED_POOL_REFRESH_INTERVAL: int = int(os.getenv("FEED_POOL_REFRESH_INTERVAL", 60))
+    FEED_POOL_WINDOW_DAYS: int = int(os.getenv("FEED_POOL_WINDOW_DAYS", 30))
+    FEED_POOL_MAX_TWEETS: int = int(os.getenv("FEED_POOL_MAX_TWEETS", 2000))
+
+    # Feed pipeline (stage timeouts and per-request trace logging)
+    FEED_QUERY_TIMEOUT: float = float(os.getenv("FEED_QUERY_TIMEOUT", 5.0))
+    FEED_TRACE_SLOW_MS: float = float(os.getenv("FEED_TRACE_SLOW_MS", 1000))
+    FEED_TRENDING_CANDIDATES: int = int(os.getenv("FEED_TRENDING_CANDIDATES", 200))
+
+    # In-process L1 cache (namespaces and sizes in core/cache_config.py)
+    L1_CACHE_ENABLED: bool = os.getenv("L1_CACHE_ENABLED", "TRUE").upper() == "TRUE"
+
+    # Cache expiry spreading (jittered TTLs and XFetch early recomputation; beta > 1 refreshes earlier)
+    CACHE_TTL_JITTER: float = float(os.getenv("CACHE_TTL_JITTER", 0.1))
+    CACHE_XFETCH_BETA: float = float(os.getenv("CACHE_XFETCH_BETA", 1.0))
+
+    # Cache value codec (caching/codec.py); msgpack, zstandard and lz4 are optional
+    CACHE_SERIALIZER: str = os.getenv("CACHE_SERIALIZER", "json")          # json | msgpack
+    CACHE_COMPRESSOR: str = os.getenv("CACHE_COMPRESSOR", "zstd")          # zstd | lz4 | gzip | none
+    CACHE_COMPRESSION_THRESHOLD: int = int(os.getenv("CACHE_COMPRESSION_THRESHOLD", 1024))
+    CACHE_ZSTD_LEVEL: int = int(os.getenv("CACHE_ZSTD_LEVEL", 3))
+    CACHE_ZSTD_DICT_PATH: str = os.getenv("CACHE_ZSTD_DICT_PATH", "")
+
+    # Deferred cache invalidation (in-process buffer flushed to a Redis stream)
+    INVALIDATION_QUEUE_ENABLED: bool = os.getenv("INVALIDATION_QUEUE_ENABLED", "TRUE").upper() == "TRUE"
+    INVALIDATION_FLUSH_INTERVAL: float = float(os.getenv("INVALIDATION_FLUSH_INTERVAL", 0.25))
+    INVALIDATION_STREAM_MAXLEN: int = int(os.getenv("INVALIDATION_STREAM_MAXLEN", 10000))
+
+    # Maintenance jobs (counter persistence, reconciliation, affinity folding and decay) run in the API process
+    BACKGROUND_JOBS_ENABLED: bool = os.getenv("BACKGROUND_JOBS_ENABLED", "TRUE").upper() == "TRUE"
+
     COMMENT_PAGE_SIZE: int = int(os.getenv("COMMENT_PAGE_SIZE", 20))
     COMMENT_CACHE_TTL: int = int(os.getenv("COMMENT_CACHE_TTL", 300))
     SHARE_CACHE_TTL: int = int(os.getenv("SHARE_CACHE_TTL", 300))
@@ -5,10 +5,11 @@ from database.session import get_database_session
 from caching.cache_service import cache_service
 from core.security import verify_token
 from core.exceptions import create_http_exception, AuthenticationError, AuthorizationError, NotFoundError
+from core.cache_config import CacheConstants
 import logging
 from sqlalchemy import select
 from auth.models.User import User
-from datetime import datetime
+from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
@@ -39,20 +40,34 @@ async def get_current_active_user(
     current_user: str = Depends(get_current_user),
     db: AsyncSession = Depends(get_database_session)
 ) -> str:
-    result = await db.execute(
-        select(User).filter(User.user_id == current_user, User.is_active == True)
-    )
-    user = result.scalar_one_or_none()
-    if not user:
-        raise NotFoundError("User not found or inactive")
-    if user.block_until and user.block_until <= datetime.now().date():
-        user.is_blocked = False
-        user.block_until = None
-        await db.commit()
-    if user.is_blocked:
+    # Runs on every authenticated request; cached so requests served from the cache
+    # never touch the database. Blocking a user deletes the entry.
+    status_key = f"user_status:{current_user}"
+    user_status = await cache_service.get(status_key)
+    if user_status is None:
+        result = await db.execute(
+            select(User).filter(User.user_id == current_user, User.is_active == True)
+        )
+        user = result.scalar_one_or_none()
+        if not user:
+            raise NotFoundError("User not found or inactive")
+        if user.block_until and user.block_until <= datetime.now().date():
+            user.is_blocked = False
+            user.block_until = None
+            await db.commit()
+        user_status = {
+            "is_blocked": user.is_blocked,
+            "block_until": user.block_until.isoformat() if user.block_until else None,
+        }
+        await cache_service.set(status_key, user_status, ttl=CacheConstants.USER_STATUS_TTL)
+    block_until = date.fromisoformat(user_status["block_until"]) if user_status["block_until"] else None
+    if block_until and block_until <= datetime.now().date():
+        # Lapsed since it was cached; the row is cleared on the next load
+        return current_user
+    if user_status["is_blocked"]:
         raise AuthorizationError("Your account has been blocked permanently. Please contact support.")
-    if user.block_until and user.block_until > datetime.now().date():
-        raise AuthorizationError(f"Your account has been blocked until {user.block_until}. Please contact support.")
+    if block_until and block_until > datetime.now().date():
+        raise AuthorizationError(f"Your account has been blocked until {block_until}. Please contact support.")
     return current_user
 
 async def get_current_admin_user(
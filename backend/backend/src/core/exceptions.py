@@ -32,7 +32,7 @@ class InternalServerError(BaseCustomException):
 class RateLimitError(BaseCustomException):
     pass
 
-def create_http_exception(exc: BaseCustomException) -> HTTPException:
+def create_http_exception(exc: BaseCustomException, headers: Optional[dict] = None) -> HTTPException:
     status_code_map = {
         AuthenticationError: status.HTTP_401_UNAUTHORIZED,
         AuthorizationError: status.HTTP_403_FORBIDDEN,
@@ -49,7 +49,8 @@ def create_http_exception(exc: BaseCustomException) -> HTTPException:
             "message": exc.message,
             "details": exc.details,
             "type": type(exc).__name__
-        }
+        },
+        headers=headers,
     )
 
 def custom_exception_handler(request: Request, exc: BaseCustomException):
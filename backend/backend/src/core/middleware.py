@@ -14,4 +14,16 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         return response
 
 def add_request_id_middleware(app):
-    app.add_middleware(RequestIDMiddleware) 
\ No newline at end of file
+    app.add_middleware(RequestIDMiddleware) 
+
+class RateLimitHeadersMiddleware(BaseHTTPMiddleware):
+    """Adds the X-RateLimit-* headers set by core.rate_limit to successful responses"""
+
+    async def dispatch(self, request: Request, call_next):
+        response: Response = await call_next(request)
+        for name, value in getattr(request.state, "rate_limit_headers", {}).items():
+            response.headers.setdefault(name, value)
+        return response
+
+def add_rate_limit_headers_middleware(app):
+    app.add_middleware(RateLimitHeadersMiddleware)
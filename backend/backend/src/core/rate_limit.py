@@ -1,67 +1,181 @@
 import logging
+import math
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from core.config import get_settings
 from core.exceptions import RateLimitError, create_http_exception
-from caching.cache_service import cache_service
+from caching.cache_service import cache_service, versioned_key
 from fastapi import Request
 from functools import wraps
 from core.logging import setup_logging
 import json
-import time
 
 setup_logging()
 logger = logging.getLogger("rate_limit")
 settings = get_settings()
 
+# Sliding-window log: one sorted-set member per admitted request, scored by its time.
+# Trims, counts and admits in one step on the Redis clock, so concurrent requests on
+# any instance can never admit more than ARGV[1] in any window. Refused requests are
+# not recorded, so hammering does not extend the lockout.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, now .. '-' .. ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    count = count + 1
+    allowed = 1
+end
+local reset_at = now + window
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset_at = tonumber(oldest[2]) + window
+end
+return {allowed, limit - count, reset_at, now}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_at: float  # epoch seconds at which the oldest request leaves the window
+    retry_after: int = 0
+
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_at)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class LocalTokenBucket:
+    """Per-process token buckets checked before Redis.
+
+    Each key gets a bucket of ``limit`` tokens refilled at limit/window per second;
+    requests the shared window refuses give their token back. A bucket therefore
+    only runs dry once this process alone has had about ``limit`` admitted requests
+    in the trailing window, which the shared window refuses as well, so bursts past
+    that are refused without a round trip.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def take(self, key: str, limit: int, window: int) -> float:
+        """0 when a token was taken, otherwise seconds until the next one"""
+        now = time.monotonic()
+        rate = limit / window
+        tokens, updated_at = self._buckets.get(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - updated_at) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key: str) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets[key] = (bucket[0] + 1, bucket[1])
+
+
+local_buckets = LocalTokenBucket(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
+async def check_rate_limit(key: str, limit: int, window: int = 60) -> RateLimitResult:
+    """Admit or refuse one request against the shared window, in one round trip"""
+    if settings.RATE_LIMIT_LOCAL_BUCKET:
+        wait = local_buckets.take(key, limit, window)
+        if wait:
+            return RateLimitResult(False, limit, 0, time.time() + wait, math.ceil(wait))
+    try:
+        script = await cache_service.get_script("rate_limit_window", SLIDING_WINDOW_SCRIPT)
+        async with cache_service.pipeline("rate_limit") as pipe:
+            await script(
+                keys=[versioned_key(f"rate_limit_window:{key}")],
+                args=[limit, window * 1000, secrets.token_hex(4)],
+                client=pipe,
+            )
+            ((allowed, remaining, reset_at_ms, now_ms),) = await pipe.execute()
+    except Exception:
+        # The caller fails open; the request is not counted locally either
+        if settings.RATE_LIMIT_LOCAL_BUCKET:
+            local_buckets.refund(key)
+        raise
+    if settings.RATE_LIMIT_LOCAL_BUCKET and not allowed:
+        local_buckets.refund(key)
+    return RateLimitResult(
+        bool(allowed),
+        limit,
+        int(remaining),
+        int(reset_at_ms) / 1000,
+        0 if allowed else max(1, math.ceil((int(reset_at_ms) - int(now_ms)) / 1000)),
+    )
+
+
+def _find_request(args, kwargs):
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, Request):
+            return value
+    return None
+
+
 def rate_limit(requests_per_minute: int = None, scope: str = "ip"):
     limit = requests_per_minute or settings.RATE_LIMIT_PER_MINUTE
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            request = None
-            user_id = None
-            for arg in args:
-                if isinstance(arg, Request):
-                    request = arg
-                    break
+            # FastAPI passes endpoint parameters as keyword arguments
+            request = _find_request(args, kwargs)
             if not request:
                 return await func(*args, **kwargs)
+            user_id = None
             if 'current_user' in kwargs:
                 user_id = kwargs['current_user']
             elif hasattr(request, 'state') and hasattr(request.state, 'user_id'):
                 user_id = getattr(request.state, 'user_id')
-            client_ip = request.client.host
+            client_ip = request.client.host if request.client else "unknown"
             endpoint = f"{request.method}:{request.url.path}"
-            now = int(time.time())
-            window = 60
-            reset = now - (now % window) + window
             if scope == "user" and user_id:
-                cache_key = f"rate_limit:user:{user_id}:{endpoint}"
+                cache_key = f"user:{user_id}:{endpoint}"
             elif scope == "global":
-                cache_key = f"rate_limit:global:{endpoint}"
+                cache_key = f"global:{endpoint}"
             else:
-                cache_key = f"rate_limit:{client_ip}:{endpoint}"
+                cache_key = f"{client_ip}:{endpoint}"
             try:
-                current_requests = await cache_service.get(cache_key) or 0
-                remaining = max(0, limit - int(current_requests))
-                if int(current_requests) >= limit:
-                    logger.warning(json.dumps({"event": "rate_limit_exceeded", "scope": scope, "key": cache_key, "limit": limit}))
-                    headers = {
-                        "X-RateLimit-Limit": str(limit),
-                        "X-RateLimit-Remaining": "0",
-                        "X-RateLimit-Reset": str(reset)
-                    }
-                    raise create_http_exception(RateLimitError(f"Rate limit exceeded. Max {limit} requests per minute."), headers=headers)
-                await cache_service.set(cache_key, int(current_requests) + 1, window)
-                response = await func(*args, **kwargs)
-                if hasattr(response, "headers"):
-                    response.headers["X-RateLimit-Limit"] = str(limit)
-                    response.headers["X-RateLimit-Remaining"] = str(remaining - 1)
-                    response.headers["X-RateLimit-Reset"] = str(reset)
-                return response
-            except RateLimitError:
-                raise
+                result = await check_rate_limit(cache_key, limit)
             except Exception as e:
+                # Fail open: an unavailable limiter must not take the endpoint down
                 logger.error(json.dumps({"event": "rate_limit_error", "error": str(e), "scope": scope, "key": cache_key}))
                 return await func(*args, **kwargs)
+            if not result.allowed:
+                logger.warning(json.dumps({"event": "rate_limit_exceeded", "scope": scope, "key": cache_key, "limit": limit}))
+                raise create_http_exception(
+                    RateLimitError(f"Rate limit exceeded. Max {limit} requests per minute."),
+                    headers=result.headers(),
+                )
+            # Copied onto the response by RateLimitHeadersMiddleware
+            request.state.rate_limit_headers = result.headers()
+            return await func(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
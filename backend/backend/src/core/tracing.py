@@ -0,0 +1,123 @@
+"""
+Per-request stage tracing
+"""
+
+import json
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageTrace:
+    """Timing and volume of one stage of a request"""
+    name: str
+    duration_ms: float = 0.0
+    rows: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    attributes: Dict[str, object] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        data = {
+            "stage": self.name,
+            "duration_ms": round(self.duration_ms, 2),
+            "rows": self.rows,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+        data.update(self.attributes)
+        return data
+
+
+_current_trace: ContextVar[Optional["RequestTrace"]] = ContextVar("current_trace", default=None)
+_current_stage: ContextVar[Optional[StageTrace]] = ContextVar("current_stage", default=None)
+
+
+class RequestTrace:
+    """Stages of one request, in the order they ran.
+
+    Cache lookups made while a stage is active are counted against that stage;
+    lookups outside any stage are counted on the request itself.
+    """
+
+    def __init__(self, name: str, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self.stages: List[StageTrace] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._started = time.perf_counter()
+        self.duration_ms = 0.0
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        stage = StageTrace(name)
+        self.stages.append(stage)
+        token = _current_stage.set(stage)
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.duration_ms = (time.perf_counter() - started) * 1000
+            _current_stage.reset(token)
+
+    def record_cache(self, hits: int, misses: int) -> None:
+        stage = _current_stage.get()
+        target = stage if stage is not None and stage in self.stages else self
+        target.cache_hits += hits
+        target.cache_misses += misses
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "event": "request_trace",
+            "name": self.name,
+            **self.attributes,
+            "duration_ms": round(self.duration_ms, 2),
+            "cache_hits": self.cache_hits + sum(s.cache_hits for s in self.stages),
+            "cache_misses": self.cache_misses + sum(s.cache_misses for s in self.stages),
+            "stages": [s.to_dict() for s in self.stages],
+        }
+
+
+@contextmanager
+def start_trace(name: str, slow_ms: Optional[float] = None, **attributes):
+    """Trace the enclosed request and log it as one JSON line when it finishes"""
+    trace = RequestTrace(name, **attributes)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        trace.finish()
+        level = logging.WARNING if slow_ms is not None and trace.duration_ms >= slow_ms else logging.INFO
+        logger.log(level, json.dumps(trace.to_dict(), default=str))
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@asynccontextmanager
+async def trace_stage(name: str):
+    """Stage of the current request's trace; a detached stage when nothing is traced"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield StageTrace(name)
+        return
+    async with trace.stage(name) as stage:
+        yield stage
+
+
+def record_cache_lookup(hits: int, misses: int = 0) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record_cache(hits, misses)
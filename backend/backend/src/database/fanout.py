@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+from core.config import get_settings
+from core.exceptions import InternalServerError
+from database.replicas import replica_set
+from database.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# A statement (its buffered Result is returned) or a coroutine function given a session
+Query = Union[Executable, Callable[[AsyncSession], Awaitable[Any]]]
+
+# Set inside fan-out queries: a nested fan-out runs on its session instead of waiting
+# for connections its parent may be holding
+_in_fanout: contextvars.ContextVar[bool] = contextvars.ContextVar("in_fanout", default=False)
+
+
+class QueryFanout:
+    """Independent read queries run concurrently, each on a session of its own.
+
+    A session runs one statement at a time, so ``asyncio.gather`` over one
+    session's ``execute`` calls is at best serialized. ``gather`` here checks out
+    one connection per query instead: at most QUERY_FANOUT_CONCURRENCY per call
+    and QUERY_FANOUT_MAX_CONNECTIONS across the process, so fan-outs can't drain
+    the request pool. Every query gets QUERY_FANOUT_TIMEOUT seconds; the first
+    failure or timeout cancels the rest.
+
+    The fan-out sessions read where the parent session reads (a replica for GET
+    requests). They can't see the parent's uncommitted writes, so while the parent
+    has written in an open transaction the queries run one by one on the parent,
+    as do fan-outs started from inside a fan-out query.
+    """
+
+    def __init__(self, max_connections: int, concurrency: int, timeout: float, enabled: bool = True):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.enabled = enabled
+        self._connections = asyncio.Semaphore(max_connections)
+        self.fanouts = 0
+        self.sequential = 0
+        self.timeouts = 0
+
+    async def gather(
+        self,
+        db: AsyncSession,
+        *queries: Query,
+        name: str = "fanout",
+        timeout: float = None,
+    ) -> List[Any]:
+        """Results in the order of ``queries``"""
+        timeout = timeout or self.timeout
+        if len(queries) < 2 or not self.enabled or _in_fanout.get() or self._has_uncommitted_writes(db):
+            self.sequential += 1
+            return [await self._run(db, query, f"{name}[{i}]", timeout) for i, query in enumerate(queries)]
+
+        self.fanouts += 1
+        limit = asyncio.Semaphore(self.concurrency)
+        info = self._session_info(db)
+
+        async def run_isolated(i: int, query: Query):
+            _in_fanout.set(True)
+            async with limit, self._connections:
+                async with AsyncSessionLocal(info=info() if info else None) as session:
+                    return await self._run(session, query, f"{name}[{i}]", timeout)
+
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(run_isolated(i, query)) for i, query in enumerate(queries)]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        logger.debug(f"Fan-out {name}: {len(queries)} queries in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return results
+
+    async def _run(self, session: AsyncSession, query: Query, name: str, timeout: float):
+        call = session.execute(query) if isinstance(query, Executable) else query(session)
+        try:
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.error(f"❌ Query timeout: {name}")
+            raise InternalServerError(f"Database query timeout: {name}")
+
+    @staticmethod
+    def _has_uncommitted_writes(db: AsyncSession) -> bool:
+        return db.info.get("pinned", False) and db.in_transaction()
+
+    @staticmethod
+    def _session_info(db: AsyncSession):
+        """Factory of session info matching the parent's routing, or None for the primary"""
+        read_only = db.info.get("read_only", False)
+        if db.info.get("replica") is not None and not db.info.get("pinned"):
+            # Spread the fan-out over the healthy replicas
+            return lambda: {"read_only": read_only, "replica": replica_set.pick()}
+        if read_only:
+            return lambda: {"read_only": True}
+        return None
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "concurrency": self.concurrency,
+            "fanouts": self.fanouts,
+            "sequential": self.sequential,
+            "timeouts": self.timeouts,
+        }
+
+
+query_fanout = QueryFanout(
+    settings.QUERY_FANOUT_MAX_CONNECTIONS,
+    settings.QUERY_FANOUT_CONCURRENCY,
+    settings.QUERY_FANOUT_TIMEOUT,
+    enabled=settings.QUERY_FANOUT_ENABLED,
+)
@@ -0,0 +1,176 @@
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+from typing import List, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Replication delay in seconds, per dialect. No row (MySQL) means the server is not
+# replicating, as with a plain second instance standing in for a replica locally.
+MYSQL_LAG_QUERIES = (
+    ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+    ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+)
+POSTGRES_LAG_QUERY = (
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END AS lag"
+)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine: AsyncEngine = create_async_engine(
+            url,
+            pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+            max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            echo=False,
+            future=True,
+            connect_args=(
+                {"charset": "utf8mb4", "autocommit": False, "connect_timeout": 10}
+                if "mysql" in url
+                else {}
+            ),
+            execution_options={"isolation_level": "READ_COMMITTED"},
+        )
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        # Unchecked replicas take no traffic until the first health check passes
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.routed = 0
+        event.listen(self.engine.sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # A dropped connection takes the replica out of rotation until the next passing check
+        if context.is_disconnect and self.healthy:
+            self.healthy = False
+            self.last_error = f"{type(context.original_exception).__name__}: {context.original_exception}"
+            logger.warning(f"Replica {self.name} disconnected, reads fall back to the primary")
+
+    async def measure_lag(self) -> float:
+        async with self.engine.connect() as conn:
+            dialect = self.engine.dialect.name
+            if dialect == "mysql":
+                for query, column in MYSQL_LAG_QUERIES:
+                    try:
+                        row = (await conn.exec_driver_sql(query)).mappings().first()
+                    except Exception:
+                        # SHOW REPLICA STATUS needs MySQL 8.0.22+
+                        continue
+                    if row is None:
+                        return 0.0
+                    if row[column] is None:
+                        raise RuntimeError("replication is not running")
+                    return float(row[column])
+                raise RuntimeError("replication status unavailable")
+            if dialect == "postgresql":
+                return float((await conn.exec_driver_sql(POSTGRES_LAG_QUERY)).scalar())
+            await conn.exec_driver_sql("SELECT 1")
+            return 0.0
+
+    async def check(self) -> None:
+        was_healthy = self.healthy
+        try:
+            self.lag = await asyncio.wait_for(self.measure_lag(), settings.DATABASE_REPLICA_HEALTH_TIMEOUT)
+            self.healthy = self.lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+            self.last_error = None if self.healthy else f"lag {self.lag:.1f}s"
+        except Exception as e:
+            self.healthy = False
+            self.last_error = f"{type(e).__name__}: {e}"
+        self.checked_at = time.time()
+        if was_healthy and not self.healthy:
+            logger.warning(f"Replica {self.name} out of rotation: {self.last_error}")
+        elif self.healthy and not was_healthy:
+            logger.info(f"Replica {self.name} in rotation (lag {self.lag:.1f}s)")
+
+    def get_stats(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "url": self.name,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "checked_at": self.checked_at,
+            "last_error": self.last_error,
+            "routed_sessions": self.routed,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        }
+
+
+class ReplicaSet:
+    """Read replicas, each with its own engine and pool.
+
+    A background task checks every replica each DATABASE_REPLICA_HEALTH_INTERVAL
+    seconds and measures its replication lag. ``pick`` round-robins over the
+    replicas that answered and are at most DATABASE_REPLICA_MAX_LAG_SECONDS behind,
+    and returns None when there are none, in which case reads use the primary.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._task: Optional[asyncio.Task] = None
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cycle)]
+            if replica.healthy:
+                replica.routed += 1
+                return replica
+        if self.replicas:
+            self.fallbacks += 1
+        return None
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def start(self) -> None:
+        if not self.replicas or self._task is not None:
+            return
+        await self.check_all()
+        self._task = asyncio.create_task(self._health_loop(), context=contextvars.Context())
+        healthy = sum(replica.healthy for replica in self.replicas)
+        logger.info(f"Read replicas started: {healthy}/{len(self.replicas)} healthy")
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.DATABASE_REPLICA_HEALTH_INTERVAL)
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.error(f"Replica health check failed: {e}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_lag_seconds": settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+            "primary_fallbacks": self.fallbacks,
+            "replicas": [replica.get_stats() for replica in self.replicas],
+        }
+
+
+replica_set = ReplicaSet([url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()])
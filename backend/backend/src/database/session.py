@@ -1,7 +1,14 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy import event
+from fastapi import Request
+from caching.cache_service import cache_service
 from core.config import get_settings
-from typing import AsyncGenerator
+from database.replicas import replica_set
+from typing import AsyncGenerator, Optional
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,9 +39,42 @@ engine = create_async_engine(
         "compiled_cache": {},
     },
 )
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+READ_STATEMENTS = ("SELECT", "SHOW", "WITH", "EXPLAIN")
+
+
+def _is_write(clause) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().upper().startswith(READ_STATEMENTS)
+    # SELECT ... FOR UPDATE locks rows on the primary
+    return getattr(clause, "_for_update_arg", None) is not None
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica in ``info["replica"]``, when one was picked.
+
+    Flushes, INSERT/UPDATE/DELETE, locking reads and raw SQL that is not a read go
+    to the primary, and pin the session there (``info["pinned"]``), so later reads
+    in the same request see its own writes. Sessions without a replica use the
+    primary throughout; they are still marked once they write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or _is_write(clause):
+            self.info["pinned"] = True
+        elif clause is not None and not self.info.get("pinned"):
+            replica = self.info.get("replica")
+            if replica is not None:
+                return replica.engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autoflush=False,
     autocommit=False,
@@ -42,29 +82,72 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
-@event.listens_for(engine.sync_engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    if "sqlite" in settings.DATABASE_URL:
+def connection_setup(dialect: str):
+    def configure_connection(dbapi_connection, connection_record):
+        """Session settings, applied once per physical connection when the pool opens it"""
         cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA synchronous=NORMAL")
-        cursor.execute("PRAGMA cache_size=10000")
-        cursor.execute("PRAGMA temp_store=MEMORY")
+        if dialect == "mysql":
+            cursor.execute(
+                "SET SESSION sql_mode = 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'"
+            )
+        elif dialect == "postgresql":
+            cursor.execute("SET statement_timeout = '10s'")
+        elif dialect == "sqlite":
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA cache_size=10000")
+            cursor.execute("PRAGMA temp_store=MEMORY")
         cursor.close()
+    return configure_connection
+
 
+# Replicas may run another engine locally (a SQLite file standing in for MySQL)
+for _engine in [engine] + [replica.engine for replica in replica_set.replicas]:
+    event.listen(_engine.sync_engine, "connect", connection_setup(_engine.dialect.name))
 
-async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
+
+@event.listens_for(Session, "after_begin")
+def begin_read_only(session, transaction, connection):
+    """Transactions of read-only sessions and on replicas; scoped to the transaction,
+    so pooled connections stay writable"""
+    if not session.info.get("read_only") and connection.engine is engine.sync_engine:
+        return
+    if connection.dialect.name in ("mysql", "postgresql"):
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL statement_timeout = '5s'")
+
+
+def _pin_key(request: Request) -> str:
+    # Per client: the bearer token when there is one, else the address
+    client = request.headers.get("authorization") or (request.client.host if request.client else "unknown")
+    return f"primary_pin:{hashlib.blake2b(client.encode(), digest_size=12).hexdigest()}"
+
+
+async def _pick_replica(request: Optional[Request]):
+    """Replica for this request's reads, or None to stay on the primary"""
+    if request is None or not replica_set.enabled:
+        return None
+    if request.method not in READ_METHODS:
+        # Pin before any write is made, so the client's next reads see it
+        await cache_service.set(_pin_key(request), 1, ttl=settings.DATABASE_PRIMARY_PIN_SECONDS)
+        return None
+    if cache_service.breaker.bypass():
+        # Pins can't be read while Redis is down
+        return None
+    if await cache_service.exists(_pin_key(request)):
+        return None
+    return replica_set.pick()
+
+
+async def get_database_session(request: Request = None) -> AsyncGenerator[AsyncSession, None]:
+    """Request session. It checks out a connection on its first query, so requests
+    answered from the cache never touch the pool. Reads of GET requests go to a
+    healthy replica unless the client wrote within DATABASE_PRIMARY_PIN_SECONDS."""
     session = None
     try:
-        session = AsyncSessionLocal()
-        if "mysql" in settings.DATABASE_URL:
-            await session.execute(
-                text(
-                    "SET SESSION sql_mode = 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'"
-                )
-            )
-        elif "postgresql" in settings.DATABASE_URL:
-            await session.execute(text("SET statement_timeout = '10s'"))
+        replica = await _pick_replica(request)
+        session = AsyncSessionLocal(info={"replica": replica} if replica else None)
         yield session
     except Exception as e:
         if session:
@@ -77,19 +160,11 @@ async def get_database_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 async def get_read_only_session() -> AsyncGenerator[AsyncSession, None]:
+    """Like get_database_session, with every transaction started READ ONLY. Reads go
+    to a replica whenever one is healthy, without read-your-writes pinning."""
     session = None
     try:
-        session = AsyncSessionLocal()
-        if "mysql" in settings.DATABASE_URL:
-            await session.execute(
-                text(
-                    "SET SESSION sql_mode = 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'"
-                )
-            )
-            await session.execute(text("SET SESSION read_only = 1"))
-        elif "postgresql" in settings.DATABASE_URL:
-            await session.execute(text("SET default_transaction_read_only = on"))
-            await session.execute(text("SET statement_timeout = '5s'"))
+        session = AsyncSessionLocal(info={"read_only": True, "replica": replica_set.pick()})
         yield session
     except Exception as e:
         if session:
@@ -110,6 +185,7 @@ async def check_database_health() -> dict:
             "checked_out": pool.checkedout(),
             "overflow": pool.overflow(),
             "checked_in": pool.checkedin(),
+            "replicas": replica_set.get_stats(),
         }
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -118,6 +194,7 @@ async def check_database_health() -> dict:
 
 async def close_database_connections():
     try:
+        await replica_set.stop()
         await engine.dispose()
         logger.info("✅ Database connections closed gracefully")
     except Exception as e:
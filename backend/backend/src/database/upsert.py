@@ -0,0 +1,26 @@
+from typing import Callable, Dict, List, Sequence
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Inserted row -> {column: new value}; the inserted row is MySQL's ``inserted``
+# or PostgreSQL/SQLite's ``excluded``
+UpdateValues = Callable[[object], Dict[str, object]]
+
+
+def upsert(db: AsyncSession, model, rows: List[dict], keys: Sequence[str], update: UpdateValues):
+    """INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE for the session's database.
+
+    ``keys`` are the primary key columns the conflict is detected on (MySQL finds
+    them itself); ``update`` builds the SET clause from the inserted row.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(model).values(rows)
+        return stmt.on_duplicate_key_update(update(stmt.inserted))
+    if dialect == "postgresql":
+        stmt = postgresql.insert(model).values(rows)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(model).values(rows)
+    else:
+        raise NotImplementedError(f"No upsert for the {dialect} dialect")
+    return stmt.on_conflict_do_update(index_elements=list(keys), set_=update(stmt.excluded))
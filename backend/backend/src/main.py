@@ -12,6 +12,8 @@ from auth.middleware.AuthMiddleware import (
     request_logging_middleware,
 )
 from caching.cache_service import cache_service
+from caching.invalidation_queue import invalidation_queue
+from caching.periodic_jobs import periodic_jobs
 from core.config import get_settings
 from core.logging import setup_logging
 from core.exceptions import (
@@ -19,9 +21,11 @@ from core.exceptions import (
     custom_exception_handler,
     general_exception_handler,
 )
-from core.middleware import add_request_id_middleware
+from core.middleware import add_request_id_middleware, add_rate_limit_headers_middleware
 from database.base import Base
 from database.session import engine
+from database.replicas import replica_set
+from database.fanout import query_fanout
 from user_profile.routes.ProfileRouters import router as profile_router
 from tweets.routes.TweetRouters import router as tweet_router
 from admin.routes.AdminRouters import router as admin_router
@@ -96,6 +100,7 @@ app.add_middleware(
 app.middleware("http")(security_headers_middleware)
 app.middleware("http")(request_logging_middleware)
 add_request_id_middleware(app)
+add_rate_limit_headers_middleware(app)
 app.add_exception_handler(BaseCustomException, custom_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
@@ -104,6 +109,9 @@ async def startup_event():
     try:
         await create_tables()
         await cache_service.connect()
+        await invalidation_queue.start()
+        await replica_set.start()
+        await periodic_jobs.start()
         logger.info(
             f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} started successfully"
         )
@@ -113,7 +121,10 @@ async def startup_event():
 
 
 async def shutdown_event():
+    await periodic_jobs.stop()
+    await invalidation_queue.stop()
     await cache_service.disconnect()
+    await replica_set.stop()
     logger.info("🛑 Application shutdown complete")
     if isinstance(engine, AsyncEngine):
         await engine.dispose()
@@ -139,11 +150,15 @@ async def detailed_health_check():
         "service": settings.APP_NAME,
         "version": settings.APP_VERSION,
     }
-    try:
-        await cache_service.set("health_check", "ok", 10)
+    breaker = cache_service.breaker.get_stats()
+    if breaker["state"] == "open":
+        # Requests are already served without the cache; don't wait on Redis here
+        redis_status = f"bypassed: {breaker['last_error']}"
+        health_status["status"] = "degraded"
+    elif await cache_service.set("health_check", "ok", 10):
         redis_status = "healthy"
-    except Exception as e:
-        redis_status = f"unhealthy: {str(e)}"
+    else:
+        redis_status = "unhealthy"
         health_status["status"] = "degraded"
     try:
         async with engine.begin() as conn:
@@ -153,6 +168,16 @@ async def detailed_health_check():
         db_status = f"unhealthy: {str(e)}"
         health_status["status"] = "degraded"
     health_status["dependencies"] = {"redis": redis_status, "database": db_status}
+    if replica_set.enabled:
+        replicas = replica_set.get_stats()
+        if not any(replica["healthy"] for replica in replicas["replicas"]):
+            # Still serving, from the primary alone
+            health_status["status"] = "degraded"
+        health_status["database_replicas"] = replicas
+    health_status["redis_circuit"] = breaker
+    health_status["invalidation_queue"] = invalidation_queue.get_stats()
+    health_status["query_fanout"] = query_fanout.get_stats()
+    health_status["periodic_jobs"] = periodic_jobs.get_stats()
     return health_status
 
 
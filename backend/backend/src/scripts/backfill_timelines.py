@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Backfill materialized home timelines.
+Rebuilds the Redis sorted-set timeline of every active user from the tweets of
+the accounts they follow. Run once after enabling TIMELINE_ENABLED, or after a
+Redis flush, so the first feed reads do not all rebuild at the same time.
+
+Usage: python scripts/backfill_timelines.py [--batch-size 200] [--user USER_ID]
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the src directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from database.session import AsyncSessionLocal
+from caching.cache_service import cache_service
+from caching.timeline_service import timeline_service
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill home timelines")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--user", type=str, default=None, help="Rebuild a single user's timeline")
+    args = parser.parse_args()
+
+    await cache_service.connect()
+    start = time.time()
+    try:
+        async with AsyncSessionLocal() as db:
+            if args.user:
+                count = await timeline_service.rebuild_timeline(db, args.user)
+                print(f"✅ Rebuilt timeline for {args.user} with {count} tweets")
+            else:
+                rebuilt = await timeline_service.backfill(db, batch_size=args.batch_size)
+                print(f"✅ Rebuilt {rebuilt} home timelines in {time.time() - start:.1f}s")
+    finally:
+        await cache_service.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
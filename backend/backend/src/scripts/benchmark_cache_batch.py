@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark of batched cache reads and writes against the configured Redis.
+Writes and reads N tweet-document-sized values under a scratch prefix, with
+the previous per-key patterns and with the batch primitives:
+
+  read   get() per key (the old batch_get)   vs  batch_get() - one round trip
+  write  mset() then set() per key for TTLs  vs  mset(ttls=...) - one round trip
+         (the old bulk_cache_operations)
+
+Reports the wall time and Redis round trips of each, per batch size. The
+scratch keys are deleted afterwards.
+
+Usage: python scripts/benchmark_cache_batch.py [--sizes 10 50 200 1000] [--repeat 5]
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the src directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from caching.cache_service import cache_service
+
+PREFIX = "bench_batch"
+
+
+def document(i: int) -> dict:
+    return {
+        "id": i,
+        "user_id": f"user_{i % 997}",
+        "text": "benchmark tweet text " * 8,
+        "media": [{"media_type": "image/jpeg", "media_path": f"/assets/tweets/{i}.jpg"}],
+        "view_count": i * 3,
+        "user_name": "Bench User",
+        "is_prime": False,
+    }
+
+
+async def per_key_read(keys):
+    return {key: value for key in keys if (value := await cache_service.get(key)) is not None}
+
+
+async def per_key_write(mapping, ttls):
+    await cache_service.mset(mapping)
+    for key, ttl in ttls.items():
+        await cache_service.set(key, mapping[key], ttl)
+
+
+async def timed(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Batched cache read/write benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    await cache_service.connect()
+    try:
+        print(f"{'keys':>6} {'op':<6} {'per-key ms':>11} {'trips':>6} {'batched ms':>11} {'trips':>6} {'speedup':>8}")
+        for size in args.sizes:
+            mapping = {f"{PREFIX}:{i}": document(i) for i in range(size)}
+            ttls = {key: 300 + i % 60 for i, key in enumerate(mapping)}
+            keys = list(mapping)
+
+            old_write = await timed(args.repeat, per_key_write, mapping, ttls)
+            new_write = await timed(args.repeat, cache_service.mset, mapping, None, ttls)
+            print(f"{size:>6} {'write':<6} {old_write:>11.2f} {size + 1:>6} {new_write:>11.2f} {1:>6} {old_write / new_write:>7.1f}x")
+
+            old_read = await timed(args.repeat, per_key_read, keys)
+            new_read = await timed(args.repeat, cache_service.batch_get, keys)
+            assert len(await cache_service.batch_get(keys)) == size
+            print(f"{size:>6} {'read':<6} {old_read:>11.2f} {size:>6} {new_read:>11.2f} {1:>6} {old_read / new_read:>7.1f}x")
+    finally:
+        await cache_service.delete_pattern(f"{PREFIX}:*")
+        await cache_service.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
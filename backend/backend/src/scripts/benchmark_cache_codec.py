@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the cache value codec.
+Encodes and decodes representative cache payloads - a feed session, a profile,
+a page of tweet documents, a comment page and an access token - with the codec
+used before caching/codec.py (json.dumps + gzip behind a "0:"/"1:" prefix) and
+with every serializer/compressor combination installed here. Reports the stored
+bytes and the mean encode and decode time per payload type. With zstandard
+installed a dictionary is trained on other samples of the same payload types.
+
+Usage: python scripts/benchmark_cache_codec.py [--iterations 2000] [--seed 7]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from caching import codec as codec_module  # noqa: E402
+from caching.codec import CacheCodec, train_zstd_dictionary  # noqa: E402
+
+WORDS = "the a cirkle update launch team event today new great thanks join welcome product release".split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def feed_session(rng: random.Random) -> dict:
+    return {
+        "id": "".join(rng.choice("abcdefghijklmnop") for _ in range(16)),
+        "tweet_ids": [rng.randint(1, 5_000_000) for _ in range(1000)],
+        "feed_type": "latest",
+        "include_recommendations": True,
+        "created_at": time.time(),
+    }
+
+
+def profile(rng: random.Random) -> dict:
+    return {
+        "user_id": f"user_{rng.randint(1, 100000)}",
+        "name": _text(rng, 2).title(),
+        "bio": _text(rng, 25),
+        "photo": f"/assets/profile/{rng.randint(1, 100000)}.jpg",
+        "banner": f"/assets/banner/{rng.randint(1, 100000)}.jpg",
+        "followers_count": rng.randint(0, 50000),
+        "following_count": rng.randint(0, 2000),
+        "tweets_count": rng.randint(0, 5000),
+        "is_private": rng.random() < 0.2,
+        "is_organizational": rng.random() < 0.1,
+        "is_prime": rng.random() < 0.05,
+        "is_following": rng.random() < 0.5,
+        "interests": [{"id": i, "name": _text(rng, 1)} for i in rng.sample(range(50), 5)],
+        "mutual_followers": [f"user_{rng.randint(1, 100000)}" for _ in range(10)],
+        "created_at": datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 10**7)),
+    }
+
+
+def tweet_page(rng: random.Random) -> list:
+    return [
+        {
+            "id": rng.randint(1, 5_000_000),
+            "user_id": f"user_{rng.randint(1, 100000)}",
+            "text": _text(rng, rng.randint(5, 45)),
+            "media": [{"media_type": "image/jpeg", "media_path": f"/assets/tweets/{rng.randint(1, 10**6)}.jpg"}],
+            "like_count": rng.randint(0, 1000),
+            "comment_count": rng.randint(0, 200),
+            "bookmark_count": rng.randint(0, 100),
+            "share_count": rng.randint(0, 50),
+            "view_count": rng.randint(0, 100000),
+            "is_liked": rng.random() < 0.3,
+            "is_bookmarked": rng.random() < 0.1,
+            "created_at": datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 10**7)),
+            "user": {"name": _text(rng, 2).title(), "photo": f"/assets/profile/{rng.randint(1, 10**5)}.jpg"},
+        }
+        for _ in range(20)
+    ]
+
+
+def comment_page(rng: random.Random) -> dict:
+    return {
+        "comments": [
+            {
+                "id": rng.randint(1, 10**7),
+                "user_id": f"user_{rng.randint(1, 100000)}",
+                "text": _text(rng, rng.randint(3, 30)),
+                "like_count": rng.randint(0, 100),
+                "is_liked": rng.random() < 0.2,
+                "created_at": (datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 10**7))).isoformat(),
+            }
+            for _ in range(20)
+        ],
+        "total": rng.randint(20, 500),
+    }
+
+
+def token(rng: random.Random) -> str:
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789._-") for _ in range(180))
+
+
+PAYLOADS = {
+    "feed_session": feed_session,
+    "profile": profile,
+    "tweet_page": tweet_page,
+    "comment_page": comment_page,
+    "token": token,
+}
+
+
+class LegacyCodec:
+    """The encoding CacheService used before the frame codec"""
+
+    def encode(self, value) -> bytes:
+        serialized = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"), default=str)
+        raw = serialized.encode("utf-8")
+        if len(raw) > 1024:
+            compressed = gzip.compress(raw)
+            if len(compressed) < len(raw) * 0.9:
+                return b"1:" + compressed
+        return b"0:" + raw
+
+    def decode(self, data: bytes):
+        if data.startswith(b"1:"):
+            return json.loads(gzip.decompress(data[2:]).decode("utf-8"))
+        text = data.decode("utf-8")[2:]
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
+
+
+class FrameCodec:
+    def __init__(self, codec: CacheCodec):
+        self.codec = codec
+
+    def encode(self, value) -> bytes:
+        return self.codec.encode(value)[0]
+
+    def decode(self, data: bytes):
+        return self.codec.decode(data)
+
+
+def variants(dictionary):
+    yield "legacy json+gzip", LegacyCodec()
+    serializers = ["json"] + (["msgpack"] if codec_module.msgpack is not None else [])
+    compressors = ["none", "gzip"]
+    compressors += ["zstd"] if codec_module.zstandard is not None else []
+    compressors += ["lz4"] if codec_module.lz4_frame is not None else []
+    json_name = "orjson" if codec_module.orjson is not None else "json"
+    for serializer in serializers:
+        for compressor in compressors:
+            name = f"{json_name if serializer == 'json' else serializer}+{compressor}"
+            yield name, FrameCodec(CacheCodec(serializer, compressor))
+            if compressor == "zstd" and dictionary:
+                yield name + "+dict", FrameCodec(CacheCodec(serializer, compressor, zstd_dictionary=dictionary))
+
+
+def measure(codec, value, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        data = codec.encode(value)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(data)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+    return len(data), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache codec micro-benchmark")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    dictionary = None
+    if codec_module.zstandard is not None:
+        # Trained on other samples than the measured ones
+        train_rng = random.Random(args.seed + 1)
+        serializer = CacheCodec("json", "none")
+        samples = [
+            serializer.serialize(make(train_rng)) for make in PAYLOADS.values() for _ in range(200)
+        ]
+        dictionary = train_zstd_dictionary(samples, 32 * 1024)
+
+    rng = random.Random(args.seed)
+    payloads = {name: make(rng) for name, make in PAYLOADS.items()}
+    codecs = list(variants(dictionary))
+    for payload_name, value in payloads.items():
+        print(f"\n{payload_name}")
+        print(f"  {'codec':<22} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+        for codec_name, codec in codecs:
+            size, encode_us, decode_us = measure(codec, value, args.iterations)
+            print(f"  {codec_name:<22} {size:>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the request database session against the configured database.
+Simulates requests through the session dependency and counts, per request,
+pool checkouts, new physical connections and statements sent:
+
+  legacy  session + SET SESSION on creation (the previous get_database_session)
+  lazy    database.session.get_database_session
+
+each for a request answered from the cache (no query) and one that runs a
+query (SELECT 1). A cached request through the lazy dependency should show
+zero checkouts and zero statements.
+
+Usage: python scripts/benchmark_db_checkouts.py [--requests 2000] [--concurrency 50]
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import time
+
+# Add the src directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from sqlalchemy import event, text
+from database.session import AsyncSessionLocal, engine, get_database_session, settings
+
+
+class Counters:
+    def __init__(self):
+        self.checkouts = 0
+        self.connects = 0
+        self.statements = 0
+
+    def reset(self):
+        self.checkouts = self.connects = self.statements = 0
+
+
+counters = Counters()
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def count_checkout(dbapi_connection, connection_record, connection_proxy):
+    counters.checkouts += 1
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def count_connect(dbapi_connection, connection_record):
+    counters.connects += 1
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    counters.statements += 1
+
+
+async def legacy_session():
+    """The dependency before lazy checkout: a SET on every new session"""
+    session = AsyncSessionLocal()
+    try:
+        if "mysql" in settings.DATABASE_URL:
+            await session.execute(text("SET SESSION sql_mode = 'STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'"))
+        elif "postgresql" in settings.DATABASE_URL:
+            await session.execute(text("SET statement_timeout = '10s'"))
+        yield session
+    finally:
+        await session.close()
+
+
+async def request(dependency, query: bool):
+    sessions = dependency()
+    session = await sessions.__anext__()
+    try:
+        if query:
+            await session.execute(text("SELECT 1"))
+    finally:
+        await sessions.aclose()
+
+
+async def run(dependency, query: bool, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await request(dependency, query)
+
+    counters.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return elapsed / requests * 1e6, counters.checkouts / requests, counters.connects, counters.statements / requests
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Request session checkout benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    try:
+        # Warm the pool so connection setup is not counted against either dependency
+        await run(get_database_session, True, args.concurrency, args.concurrency)
+        print(f"{args.requests} requests, concurrency {args.concurrency}")
+        print(f"{'dependency':<10} {'request':<8} {'us/req':>9} {'checkouts/req':>14} {'new conns':>10} {'stmts/req':>10}")
+        for name, dependency in (("legacy", legacy_session), ("lazy", get_database_session)):
+            for kind, query in (("cached", False), ("db", True)):
+                us, checkouts, connects, statements = await run(dependency, query, args.requests, args.concurrency)
+                print(f"{name:<10} {kind:<8} {us:>9.1f} {checkouts:>14.2f} {connects:>10} {statements:>10.2f}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
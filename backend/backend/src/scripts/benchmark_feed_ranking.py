@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the vectorized feed ranking.
+Compares the NumPy ranking in tweets/feed/FeedRanking.py against the previous
+per-row implementation (scoring closure, category closure, full sort per
+category) on synthetic candidate sets, checks that both select the same tweets
+in the same order, and reports per-request CPU time.
+
+Usage: python scripts/benchmark_feed_ranking.py [--sizes 2000 20000] [--pages 3]
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Add the src directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from tweets.feed.FeedRanking import CandidateBatch, rank_page
+
+TweetRow = namedtuple("TweetRow", ["id", "user_id", "view_count", "created_at"])
+
+
+def generate_candidates(size: int, now: datetime, seed: int = 42):
+    """Synthetic candidate rows with a realistic mix of authors and engagement"""
+    rng = random.Random(seed)
+    authors = [f"u{i:05d}" for i in range(max(50, size // 20))]
+    user_metadata = {}
+    for author in authors:
+        roll = rng.random()
+        user_metadata[author] = {
+            "is_prime": roll < 0.15,
+            "is_organizational": roll < 0.10 or 0.5 < roll < 0.55,
+        }
+    following_set = set(rng.sample(authors, len(authors) // 3))
+    rows, engagement, velocity = [], {}, {}
+    for i in range(size):
+        tweet_id = size * 10 - i
+        author = rng.choice(authors)
+        rows.append(
+            TweetRow(
+                id=tweet_id,
+                user_id=author,
+                view_count=rng.choice([0, 0, 3, 40, 120, 900]),
+                created_at=now - timedelta(minutes=i * 2 + rng.randint(0, 1)),
+            )
+        )
+        engagement[tweet_id] = {
+            "likes": rng.choice([0, 0, 1, 2, 5, 12, 40]),
+            "comments": rng.choice([0, 0, 1, 3]),
+            "shares": rng.choice([0, 0, 0, 1, 2, 6]),
+            "bookmarks": rng.choice([0, 0, 1, 4]),
+        }
+        velocity[tweet_id] = rng.choice([0, 0, 0, 0.5, 1, 3])
+    affinity = {author: round(rng.random(), 2) for author in rng.sample(authors, len(authors) // 4)}
+    return rows, engagement, user_metadata, following_set, velocity, affinity
+
+
+def reference_rank(rows, engagement, user_metadata, following_set, velocity, affinity, page, page_size, now):
+    """The per-row ranking as previously inlined in TweetCruds._compute_merged_feed_internal"""
+
+    def calculate_twitter_style_score(eng, tweet_created_at, tweet_id, user_affinity=0):
+        hours_old = (now - tweet_created_at).total_seconds() / 3600
+        base_score = (
+            eng.get("likes", 0) * 3
+            + eng.get("shares", 0) * 4
+            + eng.get("bookmarks", 0) * 2
+            + eng.get("comments", 0) * 2
+            + (eng.get("views", 0) or 0) * 0.1
+        )
+        if base_score > 50:
+            decay_window = 72
+        elif base_score > 20:
+            decay_window = 48
+        elif base_score > 5:
+            decay_window = 24
+        else:
+            decay_window = 12
+        time_decay = max(0.1, 1.0 - (hours_old / decay_window))
+        velocity_bonus = velocity.get(tweet_id, 0) * 10
+        affinity_bonus = user_affinity * base_score * 0.5
+        diversity_penalty = 1.0 - (user_affinity * 0.3) if user_affinity > 0.8 else 1.0
+        return max(0, (base_score * time_decay + velocity_bonus + affinity_bonus) * diversity_penalty)
+
+    def get_enhanced_priority_category(tweet_row, metadata, eng):
+        is_org = metadata.get("is_organizational", False)
+        is_prime = metadata.get("is_prime", False)
+        is_following = tweet_row.user_id in following_set
+        has_high_engagement = (
+            eng.get("likes", 0) >= 5
+            or eng.get("shares", 0) >= 2
+            or eng.get("bookmarks", 0) >= 3
+            or eng.get("comments", 0) >= 2
+            or (tweet_row.view_count or 0) >= 100
+        )
+        has_any_engagement = (
+            eng.get("likes", 0) > 0
+            or eng.get("shares", 0) > 0
+            or eng.get("bookmarks", 0) > 0
+            or eng.get("comments", 0) > 0
+            or (tweet_row.view_count or 0) > 0
+        )
+        user_affinity = affinity.get(tweet_row.user_id, 0)
+        if is_prime and is_org and has_high_engagement:
+            return "prime_org_high_engagement"
+        elif is_prime and is_org and has_any_engagement:
+            return "prime_org_medium_engagement"
+        elif is_prime and is_org:
+            return "prime_org_no_engagement"
+        elif is_following and user_affinity > 0.7 and has_any_engagement:
+            return "high_affinity_following"
+        elif is_following and has_high_engagement:
+            return "following_high_engagement"
+        elif is_following and has_any_engagement:
+            return "following_medium_engagement"
+        elif is_following:
+            return "following_no_engagement"
+        elif has_high_engagement and user_affinity > 0.3:
+            return "trending_relevant"
+        elif has_high_engagement:
+            return "trending_general"
+        return "other"
+
+    categorized = {name: [] for name in (
+        "prime_org_high_engagement", "prime_org_medium_engagement", "prime_org_no_engagement",
+        "high_affinity_following", "following_high_engagement", "following_medium_engagement",
+        "following_no_engagement", "trending_relevant", "trending_general", "other",
+    )}
+    for tweet_row in rows:
+        metadata = user_metadata.get(tweet_row.user_id, {})
+        eng = engagement.get(tweet_row.id, {})
+        category = get_enhanced_priority_category(tweet_row, metadata, eng)
+        score = calculate_twitter_style_score(
+            eng, tweet_row.created_at, tweet_row.id, affinity.get(tweet_row.user_id, 0)
+        )
+        categorized[category].append({"tweet_row": tweet_row, "metadata": metadata, "engagement": eng, "score": score})
+    for category in categorized:
+        categorized[category].sort(key=lambda x: x["score"], reverse=True)
+
+    limits = {
+        "prime_org_high_engagement": int(page_size * 0.32),
+        "prime_org_medium_engagement": int(page_size * 0.18),
+        "prime_org_no_engagement": int(page_size * 0.12),
+        "high_affinity_following": int(page_size * 0.18),
+        "following_high_engagement": int(page_size * 0.08),
+        "following_medium_engagement": int(page_size * 0.07),
+        "following_no_engagement": int(page_size * 0.03),
+        "trending_relevant": int(page_size * 0.01),
+        "trending_general": int(page_size * 0.01),
+    }
+    diversity_count = max(2, int(page_size * 0.12))
+    diversity = sorted(categorized["other"][:100], key=lambda x: x["score"], reverse=True)[:diversity_count]
+
+    selected = []
+    for category, limit in limits.items():
+        start_idx = (page - 1) * limit
+        selected.extend(categorized[category][start_idx:start_idx + limit])
+    remaining_space = page_size - len(selected)
+    if remaining_space > 0 and diversity:
+        selected.extend(diversity[:remaining_space])
+    if len(selected) < page_size:
+        remaining_needed = page_size - len(selected)
+        all_remaining = []
+        for category in categorized:
+            if category not in limits:
+                continue
+            all_remaining.extend(categorized[category][page * limits[category]:])
+        all_remaining.sort(key=lambda x: x["score"], reverse=True)
+        selected.extend(all_remaining[:remaining_needed])
+    return [item["tweet_row"].id for item in selected]
+
+
+def vectorized_rank(rows, engagement, user_metadata, following_set, velocity, affinity, page, page_size, now):
+    batch = CandidateBatch.from_rows(rows, engagement, user_metadata, following_set, velocity, affinity, now=now)
+    ranked = rank_page(batch, page, page_size)
+    return [rows[i].id for i in ranked.selected]
+
+
+def measure(fn, args, repeat: int):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.process_time() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feed ranking")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.now()
+    print("📊 FEED RANKING BENCHMARK (CPU ms per request)")
+    print("=" * 72)
+    print(f"{'candidates':>10} {'page':>5} {'per-row':>12} {'vectorized':>12} {'speedup':>9} {'match':>7}")
+    all_match = True
+    for size in args.sizes:
+        data = generate_candidates(size, now)
+        for page in range(1, args.pages + 1):
+            call_args = (*data, page, args.page_size, now)
+            ref_ms, ref_ids = measure(reference_rank, call_args, args.repeat)
+            vec_ms, vec_ids = measure(vectorized_rank, call_args, args.repeat)
+            match = ref_ids == vec_ids
+            all_match &= match
+            print(
+                f"{size:>10} {page:>5} {ref_ms:>10.2f}ms {vec_ms:>10.2f}ms "
+                f"{ref_ms / max(vec_ms, 1e-9):>8.1f}x {'✅' if match else '❌':>6}"
+            )
+    print("=" * 72)
+    if not all_match:
+        print("❌ Vectorized ranking diverged from the per-row ranking")
+        sys.exit(1)
+    print("✅ Vectorized ranking matches the per-row ranking on every page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the query fan-out helper (database/fanout.py) against the
+configured database. Runs the paths moved onto it with the fan-out disabled
+(every query in turn on the one request session, as before) and enabled
+(independent queries on separate connections):
+
+  admin    AdminCruds.get_tweet_stats for the latest day with tweets (6 counts)
+  details  AdminCruds.get_user_details for the most followed user (6 queries)
+  profile  profile build as seen by another user (5 queries)
+  counts   engagement counts from the source tables for recent tweets (4 queries)
+  feed     full feed ranking for the most following user (4 hydrators)
+
+Reports the best and median wall time of each, in milliseconds.
+
+Usage: python scripts/benchmark_query_fanout.py [--repeat 20] [--tweets 500]
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import statistics
+import time
+
+# Add the src directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from sqlalchemy import select, func, desc
+from admin.cruds.AdminCruds import admin_service
+from caching.cache_service import cache_service
+from caching.engagement_counters import engagement_counters
+from database.fanout import query_fanout
+from database.session import AsyncSessionLocal, engine
+from tweets.feed.FeedPipeline import FeedContext, feed_pipeline
+from tweets.models.Tweet import Tweet
+from user_profile.cruds.UserProfileCruds import user_profile_service
+from user_profile.models.Follower import Follower
+
+
+async def sample(db, tweets: int) -> dict:
+    latest = (await db.execute(select(func.max(Tweet.created_at)))).scalar_one()
+    most_followed = (
+        await db.execute(
+            select(Follower.followee_id).group_by(Follower.followee_id).order_by(desc(func.count())).limit(1)
+        )
+    ).scalar_one_or_none()
+    most_following = (
+        await db.execute(
+            select(Follower.follower_id).group_by(Follower.follower_id).order_by(desc(func.count())).limit(1)
+        )
+    ).scalar_one_or_none()
+    tweet_ids = (await db.execute(select(Tweet.id).order_by(desc(Tweet.id)).limit(tweets))).scalars().all()
+    if latest is None or most_followed is None:
+        raise SystemExit("No tweets or followers in the database; load data first (scripts/generate_mock_data.py)")
+    return {
+        "date": latest,
+        "user_id": most_followed,
+        "viewer_id": most_following,
+        "tweet_ids": list(tweet_ids),
+    }
+
+
+def cases(data: dict):
+    return {
+        "admin": lambda db: admin_service.get_tweet_stats(db, data["date"]),
+        "details": lambda db: admin_service.get_user_details(db, data["user_id"]),
+        "profile": lambda db: user_profile_service._compute_profile_internal(
+            db, data["user_id"], data["viewer_id"], use_cache=False
+        ),
+        "counts": lambda db: engagement_counters.count_from_source(db, data["tweet_ids"]),
+        "feed": lambda db: feed_pipeline.rank(FeedContext(db=db, user_id=data["viewer_id"], refresh=True)),
+    }
+
+
+async def timed(run, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await run(db)
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Query fan-out benchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement")
+    parser.add_argument("--tweets", type=int, default=500, help="Tweets in the engagement count batch")
+    args = parser.parse_args()
+
+    await cache_service.connect()
+    try:
+        async with AsyncSessionLocal() as db:
+            data = await sample(db, args.tweets)
+        print(f"{args.repeat} runs each, concurrency {query_fanout.concurrency}")
+        print(f"{'path':<8} {'serial best':>12} {'median':>8} {'fan-out best':>13} {'median':>8} {'speedup':>8}")
+        for name, run in cases(data).items():
+            results = {}
+            for enabled in (False, True):
+                query_fanout.enabled = enabled
+                await timed(run, 1)  # warm the pool and caches for this mode
+                results[enabled] = await timed(run, args.repeat)
+            serial, fanout = results[False], results[True]
+            print(
+                f"{name:<8} {min(serial):>12.2f} {statistics.median(serial):>8.2f} "
+                f"{min(fanout):>13.2f} {statistics.median(fanout):>8.2f} "
+                f"{statistics.median(serial) / statistics.median(fanout):>7.2f}x"
+            )
+    finally:
+        await cache_service.disconnect()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Load test for cache key expiry around the hour boundary.
+Simulates many users reading their per-user feed keys (following ids and
+following metadata) on a virtual clock and counts the recomputes - database
+queries - per second under two policies:
+
+  hour_bucket  keys embed the wall-clock hour (following_optimized:{user}:h{hour}),
+               so every key changes at hh:00 and every user misses at once
+  xfetch       plain per-user keys with a jittered TTL and XFetch early
+               recomputation, as in CacheService.get_or_compute
+
+The clock starts a few minutes before an hour so the run crosses hh:00 with
+warm caches. Reports the peak recomputes per second, the recomputes in the
+minute after each hh:00, the total, and the reads that found their key expired.
+
+Usage: python scripts/load_test_cache_expiry.py [--users 20000] [--minutes 130]
+"""
+
+import argparse
+import heapq
+import math
+import random
+from collections import Counter
+
+KEYS = {"following_optimized": 3600, "following_metadata": 1800}
+
+
+class HourBucketPolicy:
+    name = "hour_bucket"
+
+    def __init__(self):
+        self.expires = {}
+        self.expired_reads = 0
+
+    def read(self, key: str, ttl: int, now: float, rng: random.Random) -> bool:
+        """True when the read recomputes"""
+        bucket_key = (key, int(now // 3600))
+        if self.expires.get(bucket_key, -1) > now:
+            return False
+        self.expired_reads += 1
+        self.expires[bucket_key] = now + ttl
+        return True
+
+
+class XFetchPolicy:
+    name = "xfetch"
+
+    def __init__(self, jitter: float, beta: float, compute_seconds: float):
+        self.jitter = jitter
+        self.beta = beta
+        self.delta = compute_seconds
+        self.expires = {}
+        self.expired_reads = 0
+
+    def _ttl(self, ttl: int, rng: random.Random) -> int:
+        spread = int(ttl * self.jitter)
+        return max(1, ttl + rng.randint(-spread, spread)) if spread else ttl
+
+    def read(self, key: str, ttl: int, now: float, rng: random.Random) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at > now:
+            if now - self.delta * self.beta * math.log(1.0 - rng.random()) < expires_at:
+                return False
+        else:
+            self.expired_reads += 1
+        self.expires[key] = now + self._ttl(ttl, rng)
+        return True
+
+
+def warm_up(policy, users: int, start: float, rng: random.Random) -> None:
+    """Caches as they look in steady state: every key filled at some point of its lifetime"""
+    for user in range(users):
+        for prefix, ttl in KEYS.items():
+            key = f"{prefix}:{user}"
+            if isinstance(policy, HourBucketPolicy):
+                # Every key of the current hour is already filled
+                filled_at = int(start // 3600) * 3600 + rng.uniform(0, start % 3600)
+                policy.expires[(key, int(start // 3600))] = filled_at + ttl
+            else:
+                policy.expires[key] = start + rng.uniform(0, ttl)
+
+
+def run(policy, users: int, minutes: int, read_interval: float, seed: int):
+    rng = random.Random(seed)
+    start = 3600 * 10 - 5 * 60  # 09:55
+    end = start + minutes * 60
+    warm_up(policy, users, start, rng)
+    policy.expired_reads = 0
+
+    # Each user opens the feed at exponentially distributed intervals
+    events = [(start + rng.expovariate(1 / read_interval), user) for user in range(users)]
+    heapq.heapify(events)
+    recomputes = Counter()
+    while events:
+        now, user = heapq.heappop(events)
+        if now >= end:
+            break
+        for prefix, ttl in KEYS.items():
+            if policy.read(f"{prefix}:{user}", ttl, now, rng):
+                recomputes[int(now)] += 1
+        heapq.heappush(events, (now + rng.expovariate(1 / read_interval), user))
+
+    boundaries = [h * 3600 for h in range(int(start // 3600) + 1, int(end // 3600) + 1)]
+    after_boundary = [
+        sum(recomputes[s] for s in range(boundary, boundary + 60)) for boundary in boundaries
+    ]
+    peak_second, peak = max(recomputes.items(), key=lambda item: item[1], default=(start, 0))
+    return {
+        "peak_per_second": peak,
+        "peak_at": f"{int(peak_second // 3600) % 24:02d}:{int(peak_second % 3600 // 60):02d}:{int(peak_second % 60):02d}",
+        "first_minute_after_hour": after_boundary,
+        "mean_per_second": sum(recomputes.values()) / (end - start),
+        "total": sum(recomputes.values()),
+        "expired_reads": policy.expired_reads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hour-boundary cache stampede load test")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--minutes", type=int, default=130)
+    parser.add_argument("--read-interval", type=float, default=300.0, help="mean seconds between feed reads per user")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--beta", type=float, default=1.0, help="XFetch beta (>1 refreshes earlier)")
+    parser.add_argument("--compute-seconds", type=float, default=2.0, help="time to recompute one key")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"Users: {args.users}, duration: {args.minutes} min, mean read interval: {args.read_interval:.0f}s")
+    print(f"{'policy':<12} {'peak/s':>8} {'at':>9} {'mean/s':>8} {'total':>9} {'expired':>8}  first minute after each hh:00")
+    for policy in (HourBucketPolicy(), XFetchPolicy(args.jitter, args.beta, args.compute_seconds)):
+        result = run(policy, args.users, args.minutes, args.read_interval, args.seed)
+        print(
+            f"{policy.name:<12} {result['peak_per_second']:>8} {result['peak_at']:>9} "
+            f"{result['mean_per_second']:>8.1f} {result['total']:>9} {result['expired_reads']:>8}  "
+            f"{result['first_minute_after_hour']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
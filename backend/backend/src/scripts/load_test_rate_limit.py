@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Concurrency test for the Redis rate limiter.
+Several processes fire bursts of concurrent requests at the same rate-limit key
+and count how many were admitted. The sliding-window limiter
+(core.rate_limit.check_rate_limit) must admit exactly --limit per key however
+high the concurrency; the previous get-then-set counter is run on the same
+load for comparison (--legacy) and over-admits.
+
+Usage: python scripts/load_test_rate_limit.py [--processes 4] [--requests 500] [--limit 60] [--rounds 5]
+Exits non-zero when any round admits a number other than --limit.
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import secrets
+import time
+from multiprocessing import Pool
+
+# Add the src directory to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.dirname(current_dir)
+sys.path.append(src_dir)
+
+from caching.cache_service import cache_service
+from core.rate_limit import check_rate_limit
+
+
+async def legacy_check(key: str, limit: int, window: int = 60) -> bool:
+    """The limiter before the sliding window: read the count, then write count + 1"""
+    current = await cache_service.get(f"rate_limit:{key}") or 0
+    if int(current) >= limit:
+        return False
+    await cache_service.set(f"rate_limit:{key}", int(current) + 1, window)
+    return True
+
+
+async def burst(key: str, limit: int, requests: int, legacy: bool) -> int:
+    await cache_service.connect()
+    try:
+        if legacy:
+            results = await asyncio.gather(*(legacy_check(key, limit) for _ in range(requests)))
+        else:
+            results = await asyncio.gather(*(check_rate_limit(key, limit) for _ in range(requests)))
+            results = [result.allowed for result in results]
+        return sum(1 for allowed in results if allowed)
+    finally:
+        await cache_service.disconnect()
+
+
+def run_process(job) -> int:
+    key, limit, requests, legacy = job
+    return asyncio.run(burst(key, limit, requests, legacy))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter concurrency test")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=500, help="concurrent requests per process per round")
+    parser.add_argument("--limit", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--legacy", action="store_true", help="also run the previous get-then-set limiter")
+    args = parser.parse_args()
+
+    total = args.processes * args.requests
+    print(f"{args.rounds} rounds of {total} concurrent requests ({args.processes} processes), limit {args.limit}")
+    limiters = [False, True] if args.legacy else [False]
+    failed = False
+    with Pool(args.processes) as pool:
+        for legacy in limiters:
+            name = "legacy get/set" if legacy else "sliding window"
+            for round_number in range(1, args.rounds + 1):
+                # A fresh key per round, so every round starts with an empty window
+                key = f"load_test:{secrets.token_hex(6)}"
+                start = time.perf_counter()
+                admitted = sum(pool.map(run_process, [(key, args.limit, args.requests, legacy)] * args.processes))
+                elapsed = time.perf_counter() - start
+                exact = admitted == args.limit
+                if not legacy and not exact:
+                    failed = True
+                print(
+                    f"  {name:<15} round {round_number}: admitted {admitted:>5} / {total} "
+                    f"in {elapsed:.2f}s ({total / elapsed:,.0f} req/s) {'OK' if exact else 'WRONG'}"
+                )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
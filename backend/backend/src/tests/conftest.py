@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules import from the src directory, as when the app runs from it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings needs a JWT secret; tests never issue tokens
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
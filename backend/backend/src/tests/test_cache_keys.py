@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("sqlalchemy")
+
+from caching.cache_service import cache_service
+from core.cache_config import GenerationScopes
+
+
+class Generations(dict):
+    """Stands in for the generation counters, remembering each read"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    async def __call__(self, *scopes):
+        self.reads.append(scopes)
+        return [self.get(scope, 0) for scope in scopes]
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    generations = Generations()
+    monkeypatch.setattr(cache_service, "generations", generations)
+    return generations
+
+
+def test_gen_keys_read_generations_once(generations):
+    generations["user:u1"] = 3
+    generations["feed:u1"] = 7
+    keys = asyncio.run(cache_service.gen_keys([
+        ("a", ("user:u1",)),
+        ("b", ("user:u1", "feed:u1")),
+        ("c", ()),
+    ]))
+    assert keys == ["a:g3", "b:g3.7", "c:g"]
+    assert generations.reads == [("user:u1", "feed:u1")]
+
+
+def test_warm_up_checks_the_keys_readers_write(generations, monkeypatch):
+    generations[GenerationScopes.USER.format(user_id="u1")] = 2
+    checked = []
+
+    async def batch_get(keys):
+        checked.extend(keys)
+        return {}
+
+    monkeypatch.setattr(cache_service, "batch_get", batch_get)
+    asyncio.run(cache_service.smart_cache_warm_up_many(["u1", "u1"]))
+
+    async def reader_keys():
+        return [
+            await cache_service.gen_key("profile:u1:req:u1", GenerationScopes.USER.format(user_id="u1")),
+            await cache_service.gen_key("followers:u1:p1:s20", GenerationScopes.USER.format(user_id="u1")),
+        ]
+
+    profile_key, followers_key = asyncio.run(reader_keys())
+    assert profile_key == "profile:u1:req:u1:g2"
+    assert profile_key in checked
+    assert followers_key in checked
+    assert len(checked) == 5
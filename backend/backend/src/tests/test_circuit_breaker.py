@@ -0,0 +1,280 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from caching import circuit_breaker
+from caching.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+class Probe:
+    def __init__(self, healthy: bool = True):
+        self.healthy = healthy
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if not self.healthy:
+            raise ConnectionError("redis down")
+
+
+def make_breaker(probe=None, **kwargs) -> CircuitBreaker:
+    options = dict(window_seconds=10, min_calls=4, failure_rate=0.5, slow_call_ms=100,
+                   slow_rate=0.75, probe_interval=0.01, half_open_calls=2)
+    options.update(kwargs)
+    return CircuitBreaker(probe or Probe(), **options)
+
+
+# Closed
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(ConnectionError("boom"))
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_opens_at_failure_rate(clock):
+    breaker = make_breaker()
+    breaker.record_success(0.001)
+    breaker.record_success(0.001)
+    breaker.record_failure(ConnectionError("boom"))
+    assert breaker.state == CLOSED
+    breaker.record_failure(TimeoutError("slow"))
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+    assert breaker.last_error == "TimeoutError: slow"
+
+
+def test_opens_at_slow_call_rate(clock):
+    breaker = make_breaker()
+    breaker.record_success(0.001)
+    for _ in range(3):
+        breaker.record_success(0.2)
+    assert breaker.state == OPEN
+    assert "slower than 100ms" in breaker.last_error
+
+
+def test_calls_leave_the_window(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(ConnectionError("boom"))
+    clock.now += 11
+    # The old failures have aged out: 1 failure in 4 calls
+    breaker.record_failure(ConnectionError("boom"))
+    for _ in range(3):
+        breaker.record_success(0.001)
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()["window_calls"] == 4
+    assert breaker.get_stats()["failure_rate"] == 0.25
+
+
+def test_disabled_breaker_never_opens(clock):
+    breaker = make_breaker(enabled=False)
+    for _ in range(10):
+        breaker.record_failure(ConnectionError("boom"))
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    assert not breaker.bypass()
+
+
+# Open
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.min_calls):
+        breaker.record_failure(ConnectionError("boom"))
+    assert breaker.state == OPEN
+
+
+def test_open_refuses_calls(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    assert not breaker.allow()
+    assert breaker.bypass()
+    assert breaker.short_circuited == 2
+
+
+def test_opening_outside_an_event_loop_does_not_start_a_probe(clock):
+    breaker = make_breaker()
+    open_breaker(breaker)
+    assert breaker._probe_task is None
+
+
+def test_failing_probe_keeps_it_open():
+    probe = Probe(healthy=False)
+    breaker = make_breaker(probe)
+
+    async def run():
+        open_breaker(breaker)
+        await asyncio.sleep(0.05)
+        await breaker.stop()
+
+    asyncio.run(run())
+    assert breaker.state == OPEN
+    assert probe.calls >= 2
+    assert breaker.last_error == "ConnectionError: redis down"
+
+
+# Half-open
+
+def test_successful_probe_half_opens():
+    breaker = make_breaker(probe_interval=0.01)
+
+    async def run():
+        open_breaker(breaker)
+        for _ in range(50):
+            await asyncio.sleep(0.002)
+            if breaker.state != OPEN:
+                break
+        state = breaker.state
+        await breaker.stop()
+        return state
+
+    assert asyncio.run(run()) == HALF_OPEN
+
+
+def half_open(breaker: CircuitBreaker) -> None:
+    open_breaker(breaker)
+    breaker._half_open()
+
+
+def test_half_open_lets_trial_calls_through(clock):
+    breaker = make_breaker()
+    half_open(breaker)
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_half_open_closes_after_trial_successes(clock):
+    breaker = make_breaker()
+    half_open(breaker)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_success(0.001)
+    assert breaker.state == CLOSED
+    assert breaker.opened_at is None
+    assert breaker.get_stats()["window_calls"] == 0
+
+
+def test_half_open_reopens_on_a_failure(clock):
+    breaker = make_breaker()
+    half_open(breaker)
+    assert breaker.allow()
+    breaker.record_success(0.001)
+    assert breaker.allow()
+    breaker.record_failure(ConnectionError("again"))
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_half_open_without_traffic_closes_after_a_probe_interval():
+    breaker = make_breaker(probe_interval=0.01)
+
+    async def run():
+        open_breaker(breaker)
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if breaker.state == CLOSED:
+                break
+        await breaker.stop()
+
+    asyncio.run(run())
+    assert breaker.state == CLOSED
+
+
+def test_release_frees_a_trial_slot(clock):
+    breaker = make_breaker()
+    half_open(breaker)
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_release_outside_half_open_is_a_noop(clock):
+    breaker = make_breaker()
+    breaker.release()
+    assert breaker._trial_calls == 0
+    open_breaker(breaker)
+    breaker.release()
+    assert breaker._trial_calls == 0
+
+
+# CacheService.pipeline
+
+class FakePipe:
+    def __init__(self):
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(key)
+
+    async def execute(self):
+        return [None] * len(self.commands)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    pytest.importorskip("redis")
+    pytest.importorskip("sqlalchemy")
+    from caching.cache_service import cache_service
+
+    breaker = make_breaker()
+    monkeypatch.setattr(cache_service, "breaker", breaker)
+    monkeypatch.setattr(cache_service, "_connected", True)
+    monkeypatch.setattr(cache_service, "_redis", SimpleNamespace(pipeline=lambda transaction=False: FakePipe()))
+    return cache_service
+
+
+def test_pipeline_body_raising_before_execute_releases_its_slot(clock, service):
+    half_open(service.breaker)
+
+    async def failing_body():
+        async with service.pipeline("test") as pipe:
+            pipe.get("k")
+            raise ValueError("caller bug before execute")
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            asyncio.run(failing_body())
+    # The slots were all given back: trial calls still get through and close the circuit
+    assert service.breaker.state == HALF_OPEN
+
+    async def ok_body():
+        async with service.pipeline("test") as pipe:
+            pipe.get("k")
+            return await pipe.execute()
+
+    for _ in range(2):
+        assert asyncio.run(ok_body()) == [None]
+    assert service.breaker.state == CLOSED
+
+
+def test_pipeline_without_execute_releases_its_slot(clock, service):
+    half_open(service.breaker)
+
+    async def unused():
+        async with service.pipeline("test"):
+            pass
+
+    for _ in range(5):
+        asyncio.run(unused())
+    assert service.breaker._trial_calls == 0
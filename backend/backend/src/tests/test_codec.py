@@ -0,0 +1,195 @@
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from caching import codec
+from caching.codec import (
+    COMPRESSOR_GZIP,
+    COMPRESSOR_NONE,
+    COMPRESSOR_ZSTD,
+    FRAME_FLAG,
+    SERIALIZER_JSON,
+    SERIALIZER_MSGPACK,
+    CacheCodec,
+    CodecError,
+    is_compressed,
+    is_frame,
+)
+
+LARGE = {"tweets": [{"id": i, "text": "the same tweet text " * 5} for i in range(100)]}
+
+
+def compressor_of(frame: bytes) -> int:
+    return frame[0] & 0x07
+
+
+# Frame detection
+
+@pytest.mark.parametrize("value", [None, 0, "text", [1, 2], {"a": 1}, LARGE])
+def test_frames_have_the_flag_bit(value):
+    frame, _ = CacheCodec(compressor="gzip").encode(value)
+    assert frame[0] & FRAME_FLAG
+    assert is_frame(frame)
+
+
+@pytest.mark.parametrize(
+    "legacy",
+    [
+        b'0:{"a": 1}',
+        b"1:" + gzip.compress(b'{"a": 1}'),
+        b'{"a": 1}',
+        b'"plain string"',
+        b"42",
+        b"",
+    ],
+)
+def test_legacy_values_are_not_frames(legacy):
+    assert not is_frame(legacy)
+
+
+# Round trips
+
+def test_small_values_are_not_compressed():
+    c = CacheCodec(compressor="gzip", threshold=1024)
+    frame, raw_size = c.encode({"a": 1})
+    assert not is_compressed(frame)
+    assert raw_size == len(frame) - 1
+    assert c.decode(frame) == {"a": 1}
+
+
+def test_large_values_are_compressed_above_threshold():
+    c = CacheCodec(compressor="gzip", threshold=1024)
+    frame, raw_size = c.encode(LARGE)
+    assert compressor_of(frame) == COMPRESSOR_GZIP
+    assert len(frame) < raw_size
+    assert c.decode(frame) == LARGE
+
+
+def test_compress_flag_overrides_threshold():
+    c = CacheCodec(compressor="none", threshold=1024)
+    value = {"text": "x" * 200}
+    forced, _ = c.encode(value, compress=True)
+    # Compression configured off falls back to gzip when forced
+    assert compressor_of(forced) == COMPRESSOR_GZIP
+    never, _ = CacheCodec(compressor="gzip", threshold=0).encode(LARGE, compress=False)
+    assert compressor_of(never) == COMPRESSOR_NONE
+    assert c.decode(forced) == value
+
+
+def test_payload_that_does_not_shrink_is_stored_raw():
+    c = CacheCodec(compressor="gzip", threshold=0)
+    # The gzip header alone is longer than this payload
+    value = "ab"
+    frame, _ = c.encode(value, compress=True)
+    assert not is_compressed(frame)
+    assert c.decode(frame) == value
+
+
+def test_datetimes_and_dates_become_iso_strings():
+    c = CacheCodec()
+    frame, _ = c.encode({"at": datetime(2024, 5, 1, 12, 30, 15), "day": date(2024, 5, 1)})
+    assert c.decode(frame) == {"at": "2024-05-01T12:30:15", "day": "2024-05-01"}
+
+
+def test_int_keys_come_back_as_strings():
+    c = CacheCodec()
+    frame, _ = c.encode({1: "a", 2: {3: "b"}})
+    assert c.decode(frame) == {"1": "a", "2": {"3": "b"}}
+
+
+def test_numpy_values_serialize():
+    np = pytest.importorskip("numpy")
+    c = CacheCodec()
+    frame, _ = c.encode({"score": np.float64(0.5), "ids": np.array([1, 2, 3])})
+    assert c.decode(frame) == {"score": 0.5, "ids": [1, 2, 3]}
+
+
+def test_stdlib_json_fallback(monkeypatch):
+    monkeypatch.setattr(codec, "orjson", None)
+    c = CacheCodec(compressor="gzip", threshold=0)
+    value = {1: datetime(2024, 1, 2, 3, 4, 5), "list": [1, 2]}
+    frame, _ = c.encode(value)
+    assert c.decode(frame) == {"1": "2024-01-02T03:04:05", "list": [1, 2]}
+
+
+def test_stdlib_and_orjson_frames_are_interchangeable(monkeypatch):
+    if codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    fast, _ = CacheCodec().encode({"a": [1, 2, {"b": None}]})
+    monkeypatch.setattr(codec, "orjson", None)
+    slow, _ = CacheCodec().encode({"a": [1, 2, {"b": None}]})
+    assert CacheCodec().decode(fast) == CacheCodec().decode(slow)
+
+
+# Missing optional libraries
+
+def test_zstd_falls_back_to_gzip_without_zstandard(monkeypatch):
+    monkeypatch.setattr(codec, "zstandard", None)
+    c = CacheCodec(compressor="zstd", threshold=0)
+    assert c.compressor == COMPRESSOR_GZIP
+    frame, _ = c.encode(LARGE)
+    assert compressor_of(frame) == COMPRESSOR_GZIP
+    assert c.decode(frame) == LARGE
+
+
+def test_msgpack_falls_back_to_json_without_msgpack(monkeypatch):
+    monkeypatch.setattr(codec, "msgpack", None)
+    assert CacheCodec(serializer="msgpack").serializer == SERIALIZER_JSON
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    c = CacheCodec(compressor="zstd", threshold=0)
+    frame, _ = c.encode(LARGE)
+    assert compressor_of(frame) == COMPRESSOR_ZSTD
+    assert c.decode(frame) == LARGE
+
+
+def test_msgpack_frame_without_msgpack_is_a_codec_error(monkeypatch):
+    monkeypatch.setattr(codec, "msgpack", None)
+    frame = bytes((FRAME_FLAG | SERIALIZER_MSGPACK << 3 | COMPRESSOR_NONE,)) + b"\x81\xa1a\x01"
+    with pytest.raises(CodecError):
+        CacheCodec().decode(frame)
+
+
+def test_unknown_compressor_is_a_codec_error():
+    frame = bytes((FRAME_FLAG | SERIALIZER_JSON << 3 | 0x07,)) + b"{}"
+    with pytest.raises(CodecError):
+        CacheCodec().decode(frame)
+
+
+# Values read through CacheService, frames and the formats before them
+
+@pytest.fixture
+def cache_service():
+    pytest.importorskip("redis")
+    pytest.importorskip("sqlalchemy")
+    from caching.cache_service import cache_service
+
+    return cache_service
+
+
+@pytest.mark.parametrize(
+    "stored, expected",
+    [
+        (b'0:{"a": 1}', {"a": 1}),
+        (b"0:not json", "not json"),
+        (b"1:" + gzip.compress(json.dumps({"a": [1, 2]}).encode()), {"a": [1, 2]}),
+        (b'{"a": 1}', {"a": 1}),
+    ],
+)
+def test_service_reads_legacy_values(cache_service, stored, expected):
+    assert cache_service._decode(stored, "key") == expected
+
+
+def test_service_reads_its_own_frames(cache_service):
+    for value in ({"a": 1}, LARGE, [1, "two"], "text"):
+        assert cache_service._decode(cache_service._encode(value), "key") == value
+
+
+def test_service_drops_undecodable_frames(cache_service):
+    assert cache_service._decode(bytes((FRAME_FLAG | 0x07,)) + b"junk", "key") is None
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import mysql
+
+from caching.cache_service import cache_service
+from caching.engagement_counters import engagement_counters
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    async def mark_write(tweet_id):
+        calls.append(("mark", tweet_id))
+
+    async def release_write(tweet_id):
+        calls.append(("release", tweet_id))
+
+    async def apply(db, tweet_id, field, delta):
+        calls.append(("apply", tweet_id, field, delta))
+
+    monkeypatch.setattr(engagement_counters, "_mark_write", mark_write)
+    monkeypatch.setattr(engagement_counters, "_release_write", release_write)
+    monkeypatch.setattr(engagement_counters, "_apply", apply)
+    return calls
+
+
+# change
+
+def test_change_marks_the_write_before_the_commit(calls):
+    async def run():
+        async with engagement_counters.change(None, 7, "likes", 1):
+            calls.append(("commit",))
+
+    asyncio.run(run())
+    assert calls == [("mark", 7), ("commit",), ("apply", 7, "likes", 1)]
+
+
+def test_failed_commit_releases_the_mark(calls):
+    async def run():
+        async with engagement_counters.change(None, 7, "likes", 1):
+            raise ConnectionError("commit failed")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+    assert calls == [("mark", 7), ("release", 7)]
+
+
+def test_zero_delta_touches_nothing(calls):
+    async def run():
+        async with engagement_counters.change(None, 7, "comments", 0):
+            calls.append(("commit",))
+
+    asyncio.run(run())
+    assert calls == [("commit",)]
+
+
+# Database fallback
+
+def test_fallback_clamps_with_case_and_releases_the_mark(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    released = []
+
+    async def release_write(tweet_id):
+        released.append(tweet_id)
+
+    monkeypatch.setattr(cache_service, "get_script", broken)
+    monkeypatch.setattr(engagement_counters, "_release_write", release_write)
+    db = RecordingSession()
+
+    asyncio.run(engagement_counters._apply(db, 7, "likes", -1))
+
+    (statement,) = db.statements
+    sql = str(statement.compile(dialect=mysql.dialect())).lower()
+    assert "case when" in sql
+    assert "greatest" not in sql
+    assert db.commits == 1
+    assert released == [7]
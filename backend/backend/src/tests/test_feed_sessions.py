@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("sqlalchemy")
+
+from caching.cache_service import cache_service
+from core.exceptions import ValidationError
+from tweets.feed.FeedSessions import feed_session_service
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    stored = {}
+
+    async def get(key, *args, **kwargs):
+        return stored.get(key)
+
+    async def generations(*scopes):
+        return [0 for _ in scopes]
+
+    monkeypatch.setattr(cache_service, "get", get)
+    monkeypatch.setattr(cache_service, "generations", generations)
+    return stored
+
+
+def save(stored, session):
+    stored[feed_session_service._session_key("u1", session["id"])] = session
+
+
+def test_cursor_round_trip():
+    cursor = feed_session_service.encode_cursor("abc", 40)
+    assert feed_session_service.decode_cursor(cursor) == ("abc", 40)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", feed_session_service.encode_cursor("abc", -1)])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValidationError):
+        feed_session_service.decode_cursor(cursor)
+
+
+def test_cursor_loads_its_session(stored):
+    session = feed_session_service.new_session([1, 2, 3], "latest", True)
+    save(stored, session)
+    assert asyncio.run(feed_session_service.load("u1", session["id"], "latest", True)) == session
+
+
+def test_expired_cursor_loads_nothing(stored):
+    assert asyncio.run(feed_session_service.load("u1", "gone", "latest", True)) is None
+
+
+@pytest.mark.parametrize("feed_type, include_recommendations", [("popular", True), ("latest", False)])
+def test_cursor_from_another_feed_is_rejected(stored, feed_type, include_recommendations):
+    session = feed_session_service.new_session([1, 2, 3], "latest", True)
+    save(stored, session)
+    with pytest.raises(ValidationError):
+        asyncio.run(feed_session_service.load("u1", session["id"], feed_type, include_recommendations))
+
+
+def test_current_session_is_kept_per_page_size(stored):
+    async def keys():
+        return [
+            await feed_session_service.current_key("u1", "latest", True, 20),
+            await feed_session_service.current_key("u1", "latest", True, 50),
+        ]
+
+    small, large = asyncio.run(keys())
+    assert small != large
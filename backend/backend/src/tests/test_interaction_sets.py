@@ -0,0 +1,83 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("sqlalchemy")
+
+from caching.cache_service import cache_service
+from caching.circuit_breaker import CircuitOpenError
+from caching.interaction_sets import interaction_sets
+
+
+class Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class RecordingSession:
+    """Answers every statement with the given rows and keeps the statements"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return Result(self.rows)
+
+
+@pytest.mark.parametrize("error", [CircuitOpenError("open"), ConnectionError("redis down")])
+def test_flags_fall_back_to_one_database_query(monkeypatch, error):
+    @asynccontextmanager
+    async def broken_pipeline(*args, **kwargs):
+        raise error
+        yield
+
+    monkeypatch.setattr(cache_service, "pipeline", broken_pipeline)
+    db = RecordingSession([
+        SimpleNamespace(flag="is_liked", tweet_id=1),
+        SimpleNamespace(flag="is_shared", tweet_id=1),
+        SimpleNamespace(flag="is_bookmarked", tweet_id=3),
+    ])
+
+    flags = asyncio.run(interaction_sets.get_flags(db, "u1", [1, 2, 3, 1]))
+
+    assert len(db.statements) == 1
+    assert flags == {
+        1: {"is_liked": True, "is_bookmarked": False, "is_shared": True},
+        2: {"is_liked": False, "is_bookmarked": False, "is_shared": False},
+        3: {"is_liked": False, "is_bookmarked": True, "is_shared": False},
+    }
+
+
+def test_flags_fall_back_when_the_pipeline_body_fails(monkeypatch):
+    class FailingPipe:
+        def smismember(self, *args):
+            pass
+
+        async def execute(self):
+            raise ConnectionError("connection reset")
+
+    @asynccontextmanager
+    async def pipeline(*args, **kwargs):
+        yield FailingPipe()
+
+    monkeypatch.setattr(cache_service, "pipeline", pipeline)
+    db = RecordingSession([])
+
+    flags = asyncio.run(interaction_sets.get_flags(db, "u1", [7]))
+
+    assert len(db.statements) == 1
+    assert flags == {7: {"is_liked": False, "is_bookmarked": False, "is_shared": False}}
+
+
+def test_no_tweets_needs_no_query():
+    db = RecordingSession([])
+    assert asyncio.run(interaction_sets.get_flags(db, "u1", [])) == {}
+    assert db.statements == []
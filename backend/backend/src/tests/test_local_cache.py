@@ -0,0 +1,153 @@
+import pytest
+
+from caching import local_cache
+from caching.local_cache import MISS, LocalCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(local_cache.time, "monotonic", clock)
+    return clock
+
+
+def make_cache(**kwargs) -> LocalCache:
+    cache = LocalCache(**kwargs)
+    cache.enable("profile", 60)
+    cache.enable("tweet", 30)
+    return cache
+
+
+# Namespaces
+
+def test_only_enabled_namespaces_are_kept(clock):
+    cache = make_cache()
+    cache.set("feed:u1", {"a": 1}, 10)
+    assert cache.get("feed:u1") is MISS
+    # Keys outside the enabled namespaces are not counted as misses
+    assert cache.get_stats()["misses"] == 0
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_hit_and_miss_counts(clock):
+    cache = make_cache()
+    assert cache.get("profile:u1") is MISS
+    cache.set("profile:u1", {"name": "a"}, 10)
+    assert cache.get("profile:u1") == {"name": "a"}
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_none_is_not_cached(clock):
+    cache = make_cache()
+    cache.set("profile:u1", None, 4)
+    assert cache.get("profile:u1") is MISS
+    assert cache.memory_bytes == 0
+
+
+def test_is_cached_namespace(clock):
+    cache = make_cache()
+    assert cache.is_cached_namespace("profile:u1")
+    assert cache.is_cached_namespace("profile:*")
+    assert cache.is_cached_namespace("prof*:u1")
+    assert not cache.is_cached_namespace("feed:*")
+
+
+# Byte accounting
+
+def test_memory_is_the_sum_of_entry_sizes(clock):
+    cache = make_cache()
+    cache.set("profile:u1", "a", 100)
+    cache.set("profile:u2", "b", 250)
+    assert cache.memory_bytes == 350
+
+
+def test_overwrite_replaces_the_size(clock):
+    cache = make_cache()
+    cache.set("profile:u1", "a", 100)
+    cache.set("profile:u1", "b", 40)
+    assert cache.memory_bytes == 40
+    assert cache.get("profile:u1") == "b"
+
+
+def test_invalidate_and_clear_release_bytes(clock):
+    cache = make_cache()
+    cache.set("profile:u1", "a", 100)
+    cache.set("profile:u2", "b", 50)
+    cache.set("tweet:1", "c", 25)
+    assert cache.invalidate(keys=["profile:u1", "profile:missing"]) == 1
+    assert cache.memory_bytes == 75
+    assert cache.invalidate(patterns=["tweet:*"]) == 1
+    assert cache.memory_bytes == 50
+    assert cache.get_stats()["invalidations"] == 2
+    cache.clear()
+    assert cache.memory_bytes == 0
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_expired_entries_release_bytes(clock):
+    cache = make_cache()
+    cache.set("tweet:1", "a", 100)
+    clock.now += 31
+    assert cache.get("tweet:1") is MISS
+    assert cache.memory_bytes == 0
+
+
+# LRU eviction
+
+def test_evicts_least_recently_used_over_max_bytes(clock):
+    cache = make_cache(max_bytes=100)
+    cache.set("profile:u1", "a", 40)
+    cache.set("profile:u2", "b", 40)
+    cache.get("profile:u1")  # u2 is now the least recently used
+    cache.set("profile:u3", "c", 40)
+    assert cache.get("profile:u2") is MISS
+    assert cache.get("profile:u1") == "a"
+    assert cache.memory_bytes == 80
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_evicts_over_max_entries(clock):
+    cache = make_cache(max_entries=2)
+    for i in range(4):
+        cache.set(f"profile:u{i}", i, 1)
+    assert cache.get_stats()["entries"] == 2
+    assert cache.get("profile:u0") is MISS
+    assert cache.get("profile:u3") == 3
+    assert cache.get_stats()["evictions"] == 2
+
+
+def test_entry_larger_than_the_cache_is_skipped(clock):
+    cache = make_cache(max_bytes=100)
+    cache.set("profile:u1", "a", 60)
+    cache.set("profile:u2", "b", 101)
+    assert cache.get("profile:u2") is MISS
+    # Nothing was evicted to make room for it
+    assert cache.get("profile:u1") == "a"
+    assert cache.memory_bytes == 60
+
+
+# TTL
+
+def test_namespace_ttl_caps_the_entry_ttl(clock):
+    cache = make_cache()
+    cache.set("tweet:1", "a", 1, ttl=300)
+    clock.now += 29
+    assert cache.get("tweet:1") == "a"
+    clock.now += 2
+    assert cache.get("tweet:1") is MISS
+
+
+def test_shorter_entry_ttl_wins(clock):
+    cache = make_cache()
+    cache.set("profile:u1", "a", 1, ttl=5)
+    clock.now += 6
+    assert cache.get("profile:u1") is MISS
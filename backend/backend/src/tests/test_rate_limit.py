@@ -0,0 +1,202 @@
+import asyncio
+import secrets
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("redis")
+
+from fastapi import HTTPException, Request
+
+from caching.cache_service import cache_service
+from core import rate_limit
+from core.rate_limit import LocalTokenBucket, RateLimitResult, check_rate_limit, local_buckets, settings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def make_request(path: str = "/tweets/feed") -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [],
+        "client": ("203.0.113.7", 40000),
+        "server": ("testserver", 80),
+        "scheme": "http",
+    })
+
+
+# LocalTokenBucket
+
+def test_bucket_admits_limit_then_reports_wait(clock):
+    bucket = LocalTokenBucket()
+    assert [bucket.take("k", 3, 60) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 3 per 60s is one token every 20s
+    assert bucket.take("k", 3, 60) == pytest.approx(20.0)
+
+
+def test_bucket_refills_at_limit_per_window(clock):
+    bucket = LocalTokenBucket()
+    for _ in range(3):
+        bucket.take("k", 3, 60)
+    clock.now += 10
+    assert bucket.take("k", 3, 60) == pytest.approx(10.0)
+    clock.now += 10
+    assert bucket.take("k", 3, 60) == 0.0
+
+
+def test_bucket_never_refills_past_limit(clock):
+    bucket = LocalTokenBucket()
+    bucket.take("k", 2, 60)
+    clock.now += 3600
+    assert [bucket.take("k", 2, 60) for _ in range(3)][-1] > 0
+
+
+def test_bucket_refund_returns_token(clock):
+    bucket = LocalTokenBucket()
+    bucket.take("k", 1, 60)
+    assert bucket.take("k", 1, 60) > 0
+    bucket.refund("k")
+    assert bucket.take("k", 1, 60) == 0.0
+
+
+def test_bucket_refund_of_unknown_key_is_noop(clock):
+    bucket = LocalTokenBucket()
+    bucket.refund("missing")
+    assert bucket.take("missing", 1, 60) == 0.0
+
+
+def test_bucket_evicts_least_recently_used(clock):
+    bucket = LocalTokenBucket(max_keys=2)
+    bucket.take("a", 1, 60)
+    bucket.take("b", 1, 60)
+    bucket.take("a", 1, 60)  # "a" is now the most recent
+    bucket.take("c", 1, 60)
+    assert list(bucket._buckets) == ["a", "c"]
+    # "b" starts over with a full bucket
+    assert bucket.take("b", 1, 60) == 0.0
+
+
+# RateLimitResult
+
+def test_headers_when_allowed():
+    headers = RateLimitResult(True, 60, 59, 1700000000.2).headers()
+    assert headers == {
+        "X-RateLimit-Limit": "60",
+        "X-RateLimit-Remaining": "59",
+        "X-RateLimit-Reset": "1700000001",
+    }
+
+
+def test_headers_when_refused():
+    headers = RateLimitResult(False, 60, -1, 1700000000.0, retry_after=12).headers()
+    assert headers["X-RateLimit-Remaining"] == "0"
+    assert headers["X-RateLimit-Reset"] == "1700000000"
+    assert headers["Retry-After"] == "12"
+
+
+def test_empty_local_bucket_refuses_without_redis(clock, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BUCKET", True)
+    key = f"test:{secrets.token_hex(4)}"
+    for _ in range(2):
+        local_buckets.take(key, 2, 60)
+
+    async def unreachable(*args, **kwargs):
+        raise AssertionError("Redis must not be called")
+
+    monkeypatch.setattr(cache_service, "get_script", unreachable)
+    result = asyncio.run(check_rate_limit(key, 2, 60))
+    assert not result.allowed
+    assert result.remaining == 0
+    assert result.retry_after == 30
+    assert "Retry-After" in result.headers()
+
+
+# Fail-open path
+
+def test_limiter_error_refunds_local_token(clock, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BUCKET", True)
+    key = f"test:{secrets.token_hex(4)}"
+
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache_service, "get_script", broken)
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            asyncio.run(check_rate_limit(key, 1, 60))
+    # Every failed check gave its token back
+    assert local_buckets.take(key, 1, 60) == 0.0
+
+
+def test_decorator_fails_open(clock, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BUCKET", True)
+
+    async def broken(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache_service, "get_script", broken)
+
+    @rate_limit.rate_limit(requests_per_minute=1)
+    async def endpoint(request: Request):
+        return "ok"
+
+    request = make_request(f"/fail-open/{secrets.token_hex(4)}")
+    assert [asyncio.run(endpoint(request=request)) for _ in range(3)] == ["ok", "ok", "ok"]
+
+
+def test_decorator_refuses_with_headers(clock, monkeypatch):
+    async def refused(key, limit, window=60):
+        return RateLimitResult(False, limit, 0, 1700000000.0, retry_after=7)
+
+    monkeypatch.setattr(rate_limit, "check_rate_limit", refused)
+
+    @rate_limit.rate_limit(requests_per_minute=5)
+    async def endpoint(request: Request):
+        return "ok"
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(endpoint(request=make_request()))
+    assert raised.value.status_code == 429
+    assert raised.value.headers["Retry-After"] == "7"
+    assert raised.value.headers["X-RateLimit-Limit"] == "5"
+
+
+# Shared window against a real Redis (REDIS_URL)
+
+def test_concurrent_requests_admit_exactly_limit(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_LOCAL_BUCKET", False)
+    key = f"test:{secrets.token_hex(4)}"
+    limit = 10
+
+    async def burst():
+        try:
+            await cache_service.connect()
+        except Exception as e:
+            pytest.skip(f"Redis unavailable: {e}")
+        try:
+            return await asyncio.gather(*(check_rate_limit(key, limit, 60) for _ in range(100)))
+        finally:
+            await cache_service.disconnect()
+
+    results = asyncio.run(burst())
+    admitted = [result for result in results if result.allowed]
+    assert len(admitted) == limit
+    assert sorted(result.remaining for result in admitted) == list(range(limit))
+    refused = [result for result in results if not result.allowed]
+    assert all(result.retry_after >= 1 for result in refused)
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+from tweets.cruds.TweetCruds import tweet_service
+from tweets.response.TweetResponse import TweetResponse
+
+
+class Scalars:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return Scalars(self._rows)
+
+
+class RecordingSession:
+    """Answers every statement with the given rows and keeps the statements"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return Result(self.rows)
+
+
+def make_tweet(tweet_id, media=0):
+    return TweetResponse(
+        id=tweet_id, user_id="author", text="text",
+        media=[{"media_type": "image/jpeg", "media_path": f"/m{i}.jpg"} for i in range(media)],
+        view_count=0, like_count=0, comment_count=0, share_count=0, bookmark_count=0,
+        is_shared=False, is_liked=False, is_bookmarked=False, created_at=datetime(2024, 1, 1), edited_at=None,
+        is_organizational=False, is_prime=False,
+        comments=[],
+    )
+
+
+def make_share(share_id, tweet_id, sender="u1", recipient="u2"):
+    return SimpleNamespace(
+        id=share_id, tweet_id=tweet_id, user_id=sender, recipient_id=recipient,
+        message=None, shared_at=datetime(2024, 1, 2),
+    )
+
+
+def test_shared_tweets_are_built_in_one_batch(monkeypatch):
+    batches = []
+
+    async def build_tweet_responses(db, user_id, tweet_ids, skip_blocked_authors=False):
+        batches.append(tweet_ids)
+        return [make_tweet(tweet_id, media=2) for tweet_id in tweet_ids if tweet_id != 99]
+
+    monkeypatch.setattr(tweet_service, "build_tweet_responses", build_tweet_responses)
+    db = RecordingSession([
+        SimpleNamespace(user_id="u1", name="Sender", photo_path="/s.jpg"),
+        SimpleNamespace(user_id="u2", name="Recipient", photo_path=None),
+    ])
+    shares = [make_share(1, 10), make_share(2, 11), make_share(3, 10, recipient="u3"), make_share(4, 99)]
+
+    result = asyncio.run(tweet_service._shared_tweet_responses(db, "u1", shares))
+
+    assert batches == [[10, 11, 99]]
+    # One profile query for every sender and recipient
+    assert len(db.statements) == 1
+    # The share of a deleted tweet is left out
+    assert [item.id for item in result] == [1, 2, 3]
+    assert result[0].sender_name == "Sender"
+    assert result[0].recipient_name == "Recipient"
+    assert result[2].recipient_name == "Unknown"
+    assert result[0].image_count == 2
+
+
+def test_no_shares_need_no_queries():
+    db = RecordingSession([])
+    assert asyncio.run(tweet_service._shared_tweet_responses(db, "u1", [])) == []
+    assert db.statements == []
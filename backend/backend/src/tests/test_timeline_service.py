@@ -0,0 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("redis")
+pytest.importorskip("sqlalchemy")
+
+from caching.cache_service import cache_service
+from caching.timeline_service import settings, timeline_service
+
+
+class RecordingPipe:
+    def __init__(self, removed):
+        self.removed = removed
+
+    def zrem(self, key, member):
+        self.removed.append((key, member))
+
+    async def execute(self):
+        return []
+
+
+@pytest.fixture
+def removed(monkeypatch):
+    removed = []
+
+    @asynccontextmanager
+    async def pipeline(*args, **kwargs):
+        yield RecordingPipe(removed)
+
+    async def follower_ids(db, user_id):
+        return ["f1", "f2", "f3"]
+
+    monkeypatch.setattr(settings, "TIMELINE_ENABLED", True)
+    monkeypatch.setattr(settings, "TIMELINE_FANOUT_BATCH_SIZE", 2)
+    monkeypatch.setattr(cache_service, "pipeline", pipeline)
+    monkeypatch.setattr(timeline_service, "_get_follower_ids", follower_ids)
+    return removed
+
+
+@pytest.mark.parametrize("celebrity", [True, False])
+def test_deleted_tweet_leaves_every_timeline(monkeypatch, removed, celebrity):
+    async def classify_author(db, author_id):
+        return celebrity, 10
+
+    monkeypatch.setattr(timeline_service, "classify_author", classify_author)
+
+    asyncio.run(timeline_service.remove_tweet(None, "author", 42))
+
+    assert (timeline_service._celebrity_key(), "42:author") in removed
+    assert {key for key, member in removed if member == 42} == {
+        timeline_service._key(f) for f in ("f1", "f2", "f3")
+    }
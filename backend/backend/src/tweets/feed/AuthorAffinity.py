@@ -0,0 +1,205 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, delete, func, literal, literal_column, union_all, case, bindparam
+from auth.models.User import User
+from caching.cache_service import cache_service, versioned_key
+from core.config import get_settings
+from database.upsert import upsert
+from tweets.models.AuthorAffinity import AuthorAffinity
+from tweets.models.Tweet import Tweet
+from tweets.models.TweetLike import TweetLike
+from tweets.models.Comment import Comment
+from tweets.models.Bookmark import Bookmark
+from tweets.models.Share import Share
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Affinity added per interaction with an author's tweet
+INTERACTION_WEIGHTS = {
+    "like": 1.0,
+    "bookmark": 1.5,
+    "comment": 2.0,
+    "share": 3.0,
+}
+
+# Take the buffered bumps for folding: a hash left by a failed fold is retried
+# before new bumps are taken. KEYS[1] = pending hash, KEYS[2] = folding hash
+FOLD_CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return {}
+    end
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
+
+class AuthorAffinityService:
+    """Viewer -> author affinity, maintained incrementally.
+
+    Every like, comment, bookmark and share adds a weighted bump for the viewer and the
+    tweet's author (undoing an interaction takes it back). Bumps are summed in a Redis
+    hash and folded into the table by a periodic job, so write paths never touch the
+    database for them. Another job applies exponential decay with a half-life of
+    AFFINITY_HALF_LIFE_HOURS and prunes rows that fall below AFFINITY_MIN_SCORE, so the
+    feed reads one ready-made map per viewer.
+    """
+
+    def _cache_key(self, viewer_id: str) -> str:
+        return f"author_affinity:{viewer_id}"
+
+    def _pending_key(self) -> str:
+        return versioned_key("author_affinity:pending")
+
+    def _folding_key(self) -> str:
+        return versioned_key("author_affinity:folding")
+
+    async def bump(self, viewer_id: str, author_id: str, interaction: str, count: int = 1) -> None:
+        """Record (or with a negative count, undo) an interaction with an author's tweet"""
+        if not author_id or author_id == viewer_id or count == 0:
+            return
+        try:
+            async with cache_service.pipeline("affinity_bump") as pipe:
+                pipe.hincrbyfloat(
+                    self._pending_key(), f"{viewer_id}:{author_id}", INTERACTION_WEIGHTS[interaction] * count
+                )
+                await pipe.execute()
+        except Exception as e:
+            # Lost bumps are recovered by the next rebuild
+            logger.warning(f"Failed to buffer affinity of {viewer_id} for {author_id}: {e}")
+
+    async def fold_pending(self, db: AsyncSession) -> int:
+        """Apply the buffered bumps to the table; the buffer is dropped once committed"""
+        claim = await cache_service.get_script("affinity_fold", FOLD_CLAIM_SCRIPT)
+        async with cache_service.pipeline("affinity_fold") as pipe:
+            await claim(keys=[self._pending_key(), self._folding_key()], client=pipe)
+            (flat,) = await pipe.execute()
+        deltas = {}
+        for field, value in zip(flat[::2], flat[1::2]):
+            viewer_id, author_id = field.decode().split(":", 1)
+            if float(value):
+                deltas[(viewer_id, author_id)] = float(value)
+        # Users deleted since their bumps would fail the foreign keys
+        user_ids = list({user_id for pair in deltas for user_id in pair})
+        existing = set()
+        for i in range(0, len(user_ids), 1000):
+            existing.update(
+                (await db.execute(select(User.user_id).where(User.user_id.in_(user_ids[i : i + 1000])))).scalars()
+            )
+        gains = [
+            {"viewer_id": viewer_id, "author_id": author_id, "score": delta}
+            for (viewer_id, author_id), delta in deltas.items()
+            if delta > 0 and viewer_id in existing and author_id in existing
+        ]
+        losses = [
+            {"viewer": viewer_id, "author": author_id, "delta": delta}
+            for (viewer_id, author_id), delta in deltas.items()
+            if delta < 0
+        ]
+        for i in range(0, len(gains), 1000):
+            await db.execute(
+                upsert(
+                    db, AuthorAffinity, gains[i : i + 1000], ["viewer_id", "author_id"],
+                    lambda inserted: {"score": AuthorAffinity.score + inserted.score},
+                )
+            )
+        if losses:
+            table = AuthorAffinity.__table__
+            score = table.c.score + bindparam("delta")
+            await db.execute(
+                update(table)
+                .where(table.c.viewer_id == bindparam("viewer"), table.c.author_id == bindparam("author"))
+                .values(score=case((score < 0, 0), else_=score)),
+                losses,
+            )
+        await db.commit()
+        async with cache_service.pipeline("affinity_fold") as pipe:
+            pipe.delete(self._folding_key())
+            await pipe.execute()
+        if deltas:
+            logger.info(f"Folded {len(deltas)} buffered author affinity changes")
+        return len(deltas)
+
+    async def get_affinities(self, db: AsyncSession, viewer_id: str) -> Dict[str, float]:
+        """Author id -> affinity in [0, 1], relative to the viewer's strongest author"""
+        cache_key = self._cache_key(viewer_id)
+        cached = await cache_service.get(cache_key)
+        if isinstance(cached, dict):
+            return cached
+        rows = (
+            await db.execute(
+                select(AuthorAffinity.author_id, AuthorAffinity.score)
+                .where(AuthorAffinity.viewer_id == viewer_id, AuthorAffinity.score > 0)
+                .order_by(AuthorAffinity.score.desc())
+                .limit(settings.AFFINITY_MAX_AUTHORS)
+            )
+        ).all()
+        top_score = rows[0].score if rows else 1.0
+        affinities = {row.author_id: min(1.0, row.score / top_score) for row in rows}
+        await cache_service.set(cache_key, affinities, ttl=settings.AFFINITY_CACHE_TTL)
+        return affinities
+
+    async def decay(self, db: AsyncSession, elapsed_hours: float = None) -> int:
+        """Apply one decay step to every row and prune the negligible ones"""
+        if elapsed_hours is None:
+            elapsed_hours = settings.AFFINITY_DECAY_INTERVAL / 3600
+        factor = 0.5 ** (elapsed_hours / settings.AFFINITY_HALF_LIFE_HOURS)
+        await db.execute(update(AuthorAffinity).values(score=AuthorAffinity.score * factor))
+        pruned = await db.execute(
+            delete(AuthorAffinity).where(AuthorAffinity.score < settings.AFFINITY_MIN_SCORE)
+        )
+        await db.commit()
+        logger.info(f"Decayed author affinity by {factor:.4f}, pruned {pruned.rowcount} rows")
+        return pruned.rowcount
+
+    async def rebuild(self, db: AsyncSession, days: int = None) -> int:
+        """Recompute every row from the last ``days`` of interactions, decayed by age"""
+        days = days or settings.AFFINITY_REBUILD_DAYS
+        cutoff = datetime.now() - timedelta(days=days)
+
+        def interactions(model, timestamp, weight):
+            return (
+                select(
+                    model.user_id.label("viewer_id"),
+                    Tweet.user_id.label("author_id"),
+                    timestamp.label("at"),
+                    literal(weight).label("weight"),
+                )
+                .join(Tweet, Tweet.id == model.tweet_id)
+                .where(timestamp >= cutoff, model.user_id != Tweet.user_id)
+            )
+
+        events = union_all(
+            interactions(TweetLike, TweetLike.created_at, INTERACTION_WEIGHTS["like"]),
+            interactions(Bookmark, Bookmark.created_at, INTERACTION_WEIGHTS["bookmark"]),
+            interactions(Comment, Comment.created_at, INTERACTION_WEIGHTS["comment"]),
+            interactions(Share, Share.shared_at, INTERACTION_WEIGHTS["share"]),
+        ).subquery()
+        age_hours = func.timestampdiff(literal_column("HOUR"), events.c.at, func.now())
+        scores = (
+            select(
+                events.c.viewer_id,
+                events.c.author_id,
+                func.sum(events.c.weight * func.pow(0.5, age_hours / settings.AFFINITY_HALF_LIFE_HOURS)).label("score"),
+            )
+            .group_by(events.c.viewer_id, events.c.author_id)
+        )
+        rows = (await db.execute(scores)).all()
+        await db.execute(delete(AuthorAffinity))
+        batch = [
+            {"viewer_id": row.viewer_id, "author_id": row.author_id, "score": float(row.score)}
+            for row in rows
+            if row.score >= settings.AFFINITY_MIN_SCORE
+        ]
+        for i in range(0, len(batch), 1000):
+            await db.execute(insert(AuthorAffinity).values(batch[i : i + 1000]))
+        await db.commit()
+        logger.info(f"Rebuilt author affinity from {days} days of interactions: {len(batch)} rows")
+        return len(batch)
+
+
+author_affinity_service = AuthorAffinityService()
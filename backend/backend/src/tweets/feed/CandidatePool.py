@@ -0,0 +1,163 @@
+import logging
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, desc, and_
+from caching.cache_service import cache_service
+from caching.engagement_counters import engagement_counters
+from core.config import get_settings
+from tweets.models.Tweet import Tweet
+from auth.models.User import User
+from auth.models.UserProfile import UserProfile
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+POOL_CACHE_KEY = "feed_candidate_pool"
+
+# Same attribute names as the candidate rows selected in TweetCruds
+PoolTweet = namedtuple("PoolTweet", ["id", "user_id", "view_count", "created_at"])
+
+
+class CandidatePool:
+    """One snapshot of the shared candidates"""
+
+    def __init__(self, tweets: List[PoolTweet], metadata: Dict[str, dict], engagement: Dict[int, dict], built_at: float):
+        self.tweets = tweets
+        self.metadata = metadata
+        self.engagement = engagement
+        self.built_at = built_at
+
+    @property
+    def author_ids(self):
+        return self.metadata.keys()
+
+    def tweets_between(self, min_time: Optional[datetime] = None, max_time: Optional[datetime] = None) -> List[PoolTweet]:
+        return [
+            t for t in self.tweets
+            if (min_time is None or t.created_at >= min_time)
+            and (max_time is None or t.created_at < max_time)
+        ]
+
+    def to_cache(self) -> dict:
+        return {
+            "tweets": [[t.id, t.user_id, t.view_count, t.created_at.isoformat()] for t in self.tweets],
+            "metadata": self.metadata,
+            "engagement": {str(k): v for k, v in self.engagement.items()},
+            "built_at": self.built_at,
+        }
+
+    @classmethod
+    def from_cache(cls, data: dict) -> "CandidatePool":
+        return cls(
+            tweets=[
+                PoolTweet(tweet_id, author_id, view_count, datetime.fromisoformat(created_at))
+                for tweet_id, author_id, view_count, created_at in data["tweets"]
+            ],
+            metadata=data["metadata"],
+            engagement={int(k): v for k, v in data["engagement"].items()},
+            built_at=data["built_at"],
+        )
+
+
+class CandidatePoolService:
+    """Recent tweets from prime organizational accounts, shared by every feed build.
+
+    These authors are candidates for every user, so their metadata, recent tweets and
+    engagement are gathered once per FEED_POOL_REFRESH_INTERVAL by a background task,
+    stored in Redis and kept in process memory. Per-user feed builds only query the
+    user's own following-specific candidates and merge the pool in.
+    """
+
+    def __init__(self):
+        self._pool: Optional[CandidatePool] = None
+
+    async def build(self, db: AsyncSession) -> CandidatePool:
+        """Query the pool from the database and publish it"""
+        authors = (
+            await db.execute(
+                select(
+                    User.user_id,
+                    User.is_private,
+                    User.is_blocked,
+                    UserProfile.name,
+                    UserProfile.photo_path,
+                    UserProfile.is_organizational,
+                    UserProfile.is_prime,
+                )
+                .join(UserProfile, User.user_id == UserProfile.user_id)
+                .where(
+                    and_(
+                        UserProfile.is_organizational == True,
+                        UserProfile.is_prime == True,
+                        User.is_blocked == False,
+                    )
+                )
+                .limit(1000)
+            )
+        ).all()
+        metadata = {
+            row.user_id: {
+                "is_private": row.is_private,
+                "is_blocked": row.is_blocked,
+                "name": row.name,
+                "photo": row.photo_path,
+                "is_organizational": row.is_organizational,
+                "is_prime": row.is_prime,
+            }
+            for row in authors
+        }
+        tweets = []
+        if metadata:
+            cutoff = datetime.now() - timedelta(days=settings.FEED_POOL_WINDOW_DAYS)
+            rows = (
+                await db.execute(
+                    select(Tweet.id, Tweet.user_id, Tweet.view_count, Tweet.created_at)
+                    .where(Tweet.user_id.in_(list(metadata)), Tweet.created_at >= cutoff)
+                    .order_by(desc(Tweet.created_at))
+                    .limit(settings.FEED_POOL_MAX_TWEETS)
+                )
+            ).all()
+            tweets = [PoolTweet(row.id, row.user_id, row.view_count or 0, row.created_at) for row in rows]
+        engagement = await engagement_counters.get_counts(db, [t.id for t in tweets])
+        pool = CandidatePool(tweets, metadata, engagement, time.time())
+        await cache_service.set(
+            POOL_CACHE_KEY, pool.to_cache(), ttl=settings.FEED_POOL_REFRESH_INTERVAL * 3
+        )
+        self._pool = pool
+        logger.info(f"Built feed candidate pool: {len(metadata)} authors, {len(tweets)} tweets")
+        return pool
+
+    def _is_fresh(self, pool: Optional[CandidatePool]) -> bool:
+        return pool is not None and time.time() - pool.built_at < settings.FEED_POOL_REFRESH_INTERVAL
+
+    async def get_pool(self, db: AsyncSession) -> CandidatePool:
+        """Process copy if fresh, then the Redis copy, then build it under a lock"""
+        if self._is_fresh(self._pool):
+            return self._pool
+        pool = None
+        cached = await cache_service.get(POOL_CACHE_KEY)
+        if isinstance(cached, dict):
+            try:
+                pool = CandidatePool.from_cache(cached)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Discarding malformed feed candidate pool: {e}")
+        if self._is_fresh(pool):
+            self._pool = pool
+            return pool
+        lock_key = f"compute:{POOL_CACHE_KEY}"
+        acquired = await cache_service.acquire_lock(lock_key, 30)
+        if not acquired and pool is not None:
+            # Another worker is already refreshing; keep serving the previous pool
+            self._pool = pool
+            return pool
+        try:
+            return await self.build(db)
+        finally:
+            if acquired:
+                await cache_service.release_lock(lock_key)
+
+
+candidate_pool_service = CandidatePoolService()
@@ -0,0 +1,454 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, desc, and_, or_
+from caching.cache_service import cache_service
+from caching.timeline_service import timeline_service
+from caching.engagement_counters import engagement_counters
+from caching.engagement_velocity import engagement_velocity
+from core.cache_config import GenerationScopes
+from core.config import get_settings
+from core.exceptions import InternalServerError
+from core.tracing import trace_stage
+from database.fanout import query_fanout
+from tweets.feed.AuthorAffinity import author_affinity_service
+from tweets.feed.CandidatePool import CandidatePool, candidate_pool_service
+from tweets.feed.FeedRanking import CandidateBatch, categorize_candidates, rank_snapshot, score_candidates
+from tweets.models.Tweet import Tweet
+from user_profile.models.Follower import Follower
+from auth.models.User import User
+from auth.models.UserProfile import UserProfile
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Candidate rows carry the attributes CandidateBatch.from_rows reads
+TWEET_COLUMNS = (Tweet.id, Tweet.user_id, Tweet.view_count, Tweet.created_at)
+
+
+@dataclass
+class FeedContext:
+    """State of one feed build, filled in stage by stage"""
+    db: AsyncSession
+    user_id: str
+    feed_type: str = "latest"
+    include_recommendations: bool = True
+    refresh: bool = False
+    page_size: int = 20
+    now: datetime = field(default_factory=datetime.now)
+    # Audience
+    following_ids: List[str] = field(default_factory=list)
+    following_set: Set[str] = field(default_factory=set)
+    user_metadata: Dict[str, dict] = field(default_factory=dict)
+    candidate_user_ids: List[str] = field(default_factory=list)
+    pool: Optional[CandidatePool] = None
+    # Candidates and hydrated signals
+    timeline_available: bool = False
+    candidates: list = field(default_factory=list)
+    engagement: Dict[int, dict] = field(default_factory=dict)
+    velocity: Dict[int, float] = field(default_factory=dict)
+    affinity: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def query_limit(self) -> int:
+        return 2000 if self.feed_type == "latest" else 1000
+
+    @property
+    def window(self) -> dict:
+        """Fresh tweets from the last 24 hours, or older ones for infinite scroll"""
+        if self.feed_type == "latest":
+            return {"min_time": self.now - timedelta(hours=24)}
+        return {"max_time": self.now - timedelta(hours=24)}
+
+    def time_conditions(self) -> list:
+        window = self.window
+        if "min_time" in window:
+            return [Tweet.created_at >= window["min_time"]]
+        return [Tweet.created_at < window["max_time"]]
+
+    @property
+    def pool_author_set(self) -> Set[str]:
+        return set(self.pool.author_ids) if self.pool else set()
+
+    async def execute(self, statement, name: str, db: AsyncSession = None):
+        try:
+            return await asyncio.wait_for((db or self.db).execute(statement), timeout=settings.FEED_QUERY_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Query timeout: {name}")
+            raise InternalServerError(f"Database query timeout: {name}")
+
+
+class CandidateSource:
+    """Produces candidate tweet rows (id, user_id, view_count, created_at) for a feed build"""
+
+    name = "source"
+
+    def enabled(self, context: FeedContext) -> bool:
+        return True
+
+    async def fetch(self, context: FeedContext) -> list:
+        raise NotImplementedError
+
+
+class Hydrator:
+    """Attaches one signal to the merged candidates; returns how many rows it looked up.
+
+    Hydrators run concurrently, so each reads through the session it is given (not
+    context.db) and sets only its own fields of the context.
+    """
+
+    name = "hydrator"
+
+    async def hydrate(self, context: FeedContext, db: AsyncSession) -> int:
+        raise NotImplementedError
+
+
+_candidate_sources: Dict[str, CandidateSource] = {}
+_hydrators: Dict[str, Hydrator] = {}
+
+
+def register_candidate_source(source: CandidateSource) -> CandidateSource:
+    """Add a source to every feed build; a source with the same name is replaced"""
+    _candidate_sources[source.name] = source
+    return source
+
+
+def register_hydrator(hydrator: Hydrator) -> Hydrator:
+    _hydrators[hydrator.name] = hydrator
+    return hydrator
+
+
+async def load_user_metadata(
+    context: FeedContext, user_ids: List[str], name: str, db: AsyncSession = None
+) -> Dict[str, dict]:
+    if not user_ids:
+        return {}
+    result = await context.execute(
+        select(
+            User.user_id,
+            User.is_private,
+            User.is_blocked,
+            UserProfile.name,
+            UserProfile.photo_path,
+            UserProfile.is_organizational,
+            UserProfile.is_prime,
+        )
+        .join(UserProfile, User.user_id == UserProfile.user_id)
+        .where(User.user_id.in_(user_ids)),
+        name,
+        db,
+    )
+    return {
+        row.user_id: {
+            "is_private": row.is_private,
+            "is_blocked": row.is_blocked,
+            "name": row.name,
+            "photo": row.photo_path,
+            "is_organizational": row.is_organizational,
+            "is_prime": row.is_prime,
+        }
+        for row in result
+    }
+
+
+async def recent_tweets(context: FeedContext, user_ids: List[str], name: str) -> list:
+    """Newest tweets of the given authors within the feed window"""
+    if not user_ids:
+        return []
+    result = await context.execute(
+        select(*TWEET_COLUMNS)
+        .where(and_(Tweet.user_id.in_(user_ids), *context.time_conditions()))
+        .order_by(desc(Tweet.created_at))
+        .limit(context.query_limit),
+        name,
+    )
+    return result.fetchall()
+
+
+class PrimeOrgSource(CandidateSource):
+    """Prime organizational authors, from the shared candidate pool"""
+
+    name = "prime_org"
+
+    async def fetch(self, context: FeedContext) -> list:
+        return [t for t in context.pool.tweets_between(**context.window) if t.user_id != context.user_id]
+
+
+class FollowingSource(CandidateSource):
+    """Followed regular authors from the materialized home timeline (push) and very
+    popular authors from the shared celebrity timeline (pull); a direct query when
+    the timelines are unavailable"""
+
+    name = "following"
+
+    async def fetch(self, context: FeedContext) -> list:
+        pool_authors = context.pool_author_set
+        author_ids = [uid for uid in context.candidate_user_ids if uid not in pool_authors]
+        tweet_ids = await timeline_service.get_tweet_ids(
+            context.db, context.user_id, limit=context.query_limit, **context.window
+        )
+        if tweet_ids is not None:
+            celebrity_ids = await timeline_service.get_celebrity_tweet_ids(
+                context.db, author_ids, **context.window
+            )
+            tweet_ids = None if celebrity_ids is None else list(dict.fromkeys(tweet_ids + celebrity_ids))
+        context.timeline_available = tweet_ids is not None
+        if tweet_ids is None:
+            followed = [uid for uid in author_ids if uid in context.following_set]
+            return await recent_tweets(context, followed, "get_following_tweets")
+        if not tweet_ids:
+            return []
+        result = await context.execute(
+            select(*TWEET_COLUMNS).where(Tweet.id.in_(tweet_ids)), "get_timeline_tweets"
+        )
+        candidate_user_set = set(context.candidate_user_ids)
+        return [row for row in result.fetchall() if row.user_id in candidate_user_set]
+
+
+class FallbackSource(CandidateSource):
+    """Non-followed candidate authors (recommendation fallback users), pulled directly"""
+
+    name = "fallback"
+
+    async def fetch(self, context: FeedContext) -> list:
+        pool_authors = context.pool_author_set
+        user_ids = []
+        for uid in context.candidate_user_ids:
+            if uid in context.following_set or uid in pool_authors:
+                continue
+            metadata = context.user_metadata.get(uid, {})
+            if context.timeline_available and (metadata.get("is_prime") or metadata.get("is_organizational")):
+                # Already served by the celebrity timeline
+                continue
+            user_ids.append(uid)
+        return await recent_tweets(context, user_ids, "get_fallback_tweets")
+
+
+class TrendingSource(CandidateSource):
+    """Public tweets gaining engagement fastest, for recommendation feeds"""
+
+    name = "trending"
+
+    def enabled(self, context: FeedContext) -> bool:
+        return context.include_recommendations
+
+    async def fetch(self, context: FeedContext) -> list:
+        trending = await engagement_velocity.get_trending(settings.FEED_TRENDING_CANDIDATES)
+        tweet_ids = [t["tweet_id"] for t in trending]
+        if not tweet_ids:
+            return []
+        result = await context.execute(
+            select(*TWEET_COLUMNS)
+            .join(User, User.user_id == Tweet.user_id)
+            .join(UserProfile, UserProfile.user_id == Tweet.user_id)
+            .where(
+                Tweet.id.in_(tweet_ids),
+                Tweet.user_id != context.user_id,
+                User.is_blocked.is_(False),
+                or_(User.is_private.is_(False), UserProfile.is_organizational.is_(True)),
+                *context.time_conditions(),
+            ),
+            "get_trending_tweets",
+        )
+        return result.fetchall()
+
+
+class MetadataHydrator(Hydrator):
+    """Author metadata for candidates whose authors are not in the audience"""
+
+    name = "metadata"
+
+    async def hydrate(self, context: FeedContext, db: AsyncSession) -> int:
+        missing = list({row.user_id for row in context.candidates} - context.user_metadata.keys())
+        context.user_metadata.update(await load_user_metadata(context, missing, "get_missing_user_metadata", db))
+        return len(missing)
+
+
+class EngagementHydrator(Hydrator):
+    """Engagement counts; pool tweets carry the counts snapshotted with the pool"""
+
+    name = "engagement"
+
+    async def hydrate(self, context: FeedContext, db: AsyncSession) -> int:
+        pool_engagement = context.pool.engagement if context.pool else {}
+        tweet_ids = [row.id for row in context.candidates]
+        context.engagement = {t: pool_engagement[t] for t in tweet_ids if t in pool_engagement}
+        missing = [t for t in tweet_ids if t not in context.engagement]
+        context.engagement.update(await engagement_counters.get_counts(db, missing))
+        return len(missing)
+
+
+class VelocityHydrator(Hydrator):
+    """Engagement velocity, shared by every viewer"""
+
+    name = "velocity"
+
+    async def hydrate(self, context: FeedContext, db: AsyncSession) -> int:
+        context.velocity = await engagement_velocity.get_velocity(row.id for row in context.candidates)
+        return len(context.candidates)
+
+
+class AffinityHydrator(Hydrator):
+    """The viewer's author affinity, keyed by author id"""
+
+    name = "affinity"
+
+    async def hydrate(self, context: FeedContext, db: AsyncSession) -> int:
+        context.affinity = await author_affinity_service.get_affinities(db, context.user_id)
+        return len(context.affinity)
+
+
+class FeedPipeline:
+    """Feed build as explicit stages: audience -> candidate sources -> merge -> hydrators
+    -> scorer -> mixer. Serialization of the served page happens in TweetCruds.
+
+    Every stage reports its duration, row count and cache hits to the current request
+    trace. Sources run in registration order on the request's session (the fallback
+    source depends on what the following source found); hydrators are independent
+    and run concurrently, each on a connection of its own.
+    """
+
+    async def _build_audience(self, context: FeedContext) -> None:
+        user_id = context.user_id
+
+        async def load_following_ids():
+            result = await context.execute(
+                select(Follower.followee_id).where(Follower.follower_id == user_id).limit(5000),
+                "get_following",
+            )
+            return list(result.scalars().all())
+
+        feed_scope = GenerationScopes.FEED.format(user_id=user_id)
+        following_cache_key = await cache_service.gen_key(f"following_optimized:{user_id}", feed_scope)
+        if context.refresh:
+            following_ids = await cache_service.compute_and_store(following_cache_key, load_following_ids, 3600)
+        else:
+            following_ids = await cache_service.get_or_compute(
+                following_cache_key, load_following_ids, ttl=3600, operation="social_graph"
+            )
+        context.following_ids = following_ids
+        context.following_set = set(following_ids)
+
+        context.pool = await candidate_pool_service.get_pool(context.db)
+
+        async def load_following_metadata():
+            return await load_user_metadata(context, following_ids[:1000], "get_following_metadata")
+
+        # Followed users' profiles change through global invalidations, not the viewer's own
+        following_metadata_key = await cache_service.gen_key(
+            f"following_metadata:{user_id}", feed_scope, GenerationScopes.GLOBAL_FEED
+        )
+        if context.refresh:
+            following_metadata = await cache_service.compute_and_store(
+                following_metadata_key, load_following_metadata, 1800
+            )
+        else:
+            following_metadata = await cache_service.get_or_compute(
+                following_metadata_key, load_following_metadata, ttl=1800, operation="feed"
+            )
+        # Following users override the pool entry for the same author
+        context.user_metadata = {**context.pool.metadata, **following_metadata}
+
+        valid_user_ids = self._valid_user_ids(context)
+        if not valid_user_ids and context.include_recommendations:
+            # Fallback: some active users so recommendation feeds are never empty
+            result = await context.execute(
+                select(User.user_id)
+                .where(and_(User.is_blocked == False, User.user_id != user_id))
+                .limit(100),
+                "get_fallback_users",
+            )
+            fallback_user_ids = [row[0] for row in result.all()]
+            context.user_metadata.update(
+                await load_user_metadata(context, fallback_user_ids, "get_fallback_metadata")
+            )
+            valid_user_ids = self._valid_user_ids(context)
+            logger.info(f"🔄 Added {len(fallback_user_ids)} fallback users for recommendations")
+        context.candidate_user_ids = valid_user_ids[:2000]
+
+    def _valid_user_ids(self, context: FeedContext) -> List[str]:
+        return [
+            uid for uid, metadata in context.user_metadata.items()
+            if not metadata.get("is_blocked", False) and uid != context.user_id
+        ]
+
+    async def rank(self, context: FeedContext) -> List[int]:
+        """Every candidate id in display order"""
+        async with trace_stage("audience") as stage:
+            await self._build_audience(context)
+            stage.rows = len(context.candidate_user_ids)
+
+        rows = []
+        for source in list(_candidate_sources.values()):
+            if not source.enabled(context):
+                continue
+            async with trace_stage(f"source:{source.name}") as stage:
+                fetched = await source.fetch(context)
+                stage.rows = len(fetched)
+            rows.extend(fetched)
+
+        async with trace_stage("merge") as stage:
+            unique = {}
+            for row in rows:
+                unique.setdefault(row.id, row)
+            candidates = sorted(unique.values(), key=lambda row: row.created_at, reverse=True)
+            context.candidates = candidates[: context.query_limit]
+            stage.rows = len(context.candidates)
+        if not context.candidates:
+            if context.refresh:
+                logger.warning(
+                    f"🔄 No tweets found during refresh for user {context.user_id} - "
+                    f"candidate users: {len(context.candidate_user_ids)}, "
+                    f"include_recommendations: {context.include_recommendations}"
+                )
+            return []
+
+        def hydrate(hydrator: Hydrator):
+            async def run(db: AsyncSession):
+                async with trace_stage(f"hydrate:{hydrator.name}") as stage:
+                    stage.rows = await hydrator.hydrate(context, db)
+            return run
+
+        async with trace_stage("hydrate"):
+            await query_fanout.gather(
+                context.db,
+                *(hydrate(hydrator) for hydrator in list(_hydrators.values())),
+                name="feed_hydrate",
+                timeout=settings.FEED_QUERY_TIMEOUT,
+            )
+
+        async with trace_stage("score") as stage:
+            batch = CandidateBatch.from_rows(
+                context.candidates,
+                context.engagement,
+                context.user_metadata,
+                context.following_set,
+                context.velocity,
+                context.affinity,
+                now=context.now,
+            )
+            scores = score_candidates(batch)
+            categories = categorize_candidates(batch)
+            stage.rows = len(batch)
+
+        async with trace_stage("mix") as stage:
+            ranked_feed = rank_snapshot(
+                batch, context.page_size, settings.FEED_SESSION_MAX_ITEMS, scores, categories
+            )
+            ranked_tweet_ids = [context.candidates[idx].id for idx in ranked_feed.selected]
+            stage.rows = len(ranked_tweet_ids)
+            stage.attributes["categories"] = {
+                name: count for name, count in ranked_feed.category_counts().items() if count
+            }
+        return ranked_tweet_ids
+
+
+for _source in (PrimeOrgSource(), FollowingSource(), FallbackSource(), TrendingSource()):
+    register_candidate_source(_source)
+for _hydrator in (MetadataHydrator(), EngagementHydrator(), VelocityHydrator(), AffinityHydrator()):
+    register_hydrator(_hydrator)
+
+feed_pipeline = FeedPipeline()
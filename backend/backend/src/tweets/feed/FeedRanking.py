@@ -0,0 +1,290 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Priority categories in evaluation order; the first matching condition wins
+CATEGORIES = (
+    "prime_org_high_engagement",
+    "prime_org_medium_engagement",
+    "prime_org_no_engagement",
+    "high_affinity_following",
+    "following_high_engagement",
+    "following_medium_engagement",
+    "following_no_engagement",
+    "trending_relevant",
+    "trending_general",
+    "other",
+)
+OTHER = CATEGORIES.index("other")
+
+# Share of each page reserved for a category; "other" only feeds the diversity slots
+CATEGORY_SHARES = {
+    "prime_org_high_engagement": 0.32,
+    "prime_org_medium_engagement": 0.18,
+    "prime_org_no_engagement": 0.12,
+    "high_affinity_following": 0.18,
+    "following_high_engagement": 0.08,
+    "following_medium_engagement": 0.07,
+    "following_no_engagement": 0.03,
+    "trending_relevant": 0.01,
+    "trending_general": 0.01,
+}
+DIVERSITY_SHARE = 0.12
+DIVERSITY_MIN = 2
+DIVERSITY_POOL = 100
+
+_EMPTY: dict = {}
+
+
+@dataclass
+class CandidateBatch:
+    """Feed candidates as columnar arrays, one entry per tweet row"""
+    tweet_ids: np.ndarray
+    likes: np.ndarray
+    shares: np.ndarray
+    bookmarks: np.ndarray
+    comments: np.ndarray
+    views: np.ndarray         # tweet view_count, drives the engagement thresholds
+    score_views: np.ndarray   # views reported by the engagement source, drives the score
+    age_hours: np.ndarray
+    velocity: np.ndarray
+    affinity: np.ndarray
+    is_prime: np.ndarray
+    is_org: np.ndarray
+    is_following: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.tweet_ids.size)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence,
+        engagement: Dict,
+        user_metadata: Dict[str, dict],
+        following_set: Set[str],
+        velocity: Dict,
+        affinity: Dict[str, float],
+        now: Optional[datetime] = None,
+    ) -> "CandidateBatch":
+        """Build the arrays from tweet rows (id, user_id, view_count, created_at)"""
+        now = now or datetime.now()
+        engagements = [engagement.get(row.id, _EMPTY) for row in rows]
+        metadata = [user_metadata.get(row.user_id, _EMPTY) for row in rows]
+
+        count = len(rows)
+
+        def column(values) -> np.ndarray:
+            return np.fromiter(values, dtype=np.float64, count=count)
+
+        return cls(
+            tweet_ids=np.fromiter((row.id for row in rows), dtype=np.int64, count=count),
+            likes=column(e.get("likes", 0) for e in engagements),
+            shares=column(e.get("shares", 0) for e in engagements),
+            bookmarks=column(e.get("bookmarks", 0) for e in engagements),
+            comments=column(e.get("comments", 0) for e in engagements),
+            score_views=column(e.get("views", 0) or 0 for e in engagements),
+            views=column(row.view_count or 0 for row in rows),
+            age_hours=column((now - row.created_at).total_seconds() for row in rows) / 3600,
+            velocity=column(velocity.get(row.id, 0) for row in rows),
+            affinity=column(affinity.get(row.user_id, 0) for row in rows),
+            is_prime=np.fromiter((bool(m.get("is_prime", False)) for m in metadata), dtype=bool, count=count),
+            is_org=np.fromiter((bool(m.get("is_organizational", False)) for m in metadata), dtype=bool, count=count),
+            is_following=np.fromiter((row.user_id in following_set for row in rows), dtype=bool, count=count),
+        )
+
+
+@dataclass
+class RankedFeed:
+    """Result of ranking one page: row indices into the batch, in display order"""
+    selected: np.ndarray
+    scores: np.ndarray
+    categories: np.ndarray
+
+    def category_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.categories, minlength=len(CATEGORIES))
+        return {name: int(counts[i]) for i, name in enumerate(CATEGORIES)}
+
+
+def score_candidates(batch: CandidateBatch) -> np.ndarray:
+    """Engagement score with adaptive time decay, velocity and affinity bonuses"""
+    base = (
+        batch.likes * 3
+        + batch.shares * 4
+        + batch.bookmarks * 2
+        + batch.comments * 2
+        + batch.score_views * 0.1
+    )
+    decay_window = np.select([base > 50, base > 20, base > 5], [72.0, 48.0, 24.0], 12.0)
+    time_decay = np.maximum(0.1, 1.0 - (batch.age_hours / decay_window))
+    velocity_bonus = batch.velocity * 10
+    affinity_bonus = batch.affinity * base * 0.5
+    diversity_penalty = np.where(batch.affinity > 0.8, 1.0 - (batch.affinity * 0.3), 1.0)
+    return np.maximum(0, (base * time_decay + velocity_bonus + affinity_bonus) * diversity_penalty)
+
+
+def categorize_candidates(batch: CandidateBatch) -> np.ndarray:
+    """Priority category code (index into CATEGORIES) for every candidate"""
+    has_high_engagement = (
+        (batch.likes >= 5)
+        | (batch.shares >= 2)
+        | (batch.bookmarks >= 3)
+        | (batch.comments >= 2)
+        | (batch.views >= 100)
+    )
+    has_any_engagement = (
+        (batch.likes > 0)
+        | (batch.shares > 0)
+        | (batch.bookmarks > 0)
+        | (batch.comments > 0)
+        | (batch.views > 0)
+    )
+    prime_org = batch.is_prime & batch.is_org
+    following = batch.is_following
+    conditions = [
+        prime_org & has_high_engagement,
+        prime_org & has_any_engagement,
+        prime_org,
+        following & (batch.affinity > 0.7) & has_any_engagement,
+        following & has_high_engagement,
+        following & has_any_engagement,
+        following,
+        has_high_engagement & (batch.affinity > 0.3),
+        has_high_engagement,
+    ]
+    return np.select(conditions, list(range(len(conditions))), OTHER).astype(np.int64)
+
+
+def _top_k(
+    candidates: np.ndarray, scores: np.ndarray, k: int, tiebreak: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Top k candidate indices by score, ties broken like a stable descending sort.
+
+    argpartition narrows the set to everything scoring at least the k-th best value;
+    only that (small) slice is fully ordered.
+    """
+    if k <= 0 or candidates.size == 0:
+        return candidates[:0]
+    if k < candidates.size:
+        candidate_scores = scores[candidates]
+        kth = np.argpartition(-candidate_scores, k - 1)[k - 1]
+        candidates = candidates[candidate_scores >= candidate_scores[kth]]
+    keys = [candidates]
+    if tiebreak is not None:
+        keys.append(tiebreak[candidates])
+    keys.append(-scores[candidates])
+    return candidates[np.lexsort(keys)][:k]
+
+
+def rank_page(batch: CandidateBatch, page: int, page_size: int) -> RankedFeed:
+    """Select one feed page: per-category quotas, diversity slots, then best of the rest"""
+    scores = score_candidates(batch)
+    categories = categorize_candidates(batch)
+    all_indices = np.arange(len(batch))
+
+    selected: List[np.ndarray] = []
+    selected_count = 0
+    in_quota = np.zeros(len(batch), dtype=bool)
+    limited = np.zeros(len(batch), dtype=bool)
+    for name, share in CATEGORY_SHARES.items():
+        limit = int(page_size * share)
+        members = categories == CATEGORIES.index(name)
+        limited |= members
+        top = _top_k(all_indices[members], scores, page * limit)
+        in_quota[top] = True
+        page_slice = top[(page - 1) * limit : page * limit]
+        selected.append(page_slice)
+        selected_count += page_slice.size
+
+    remaining_space = page_size - selected_count
+    if remaining_space > 0:
+        diversity_count = min(max(DIVERSITY_MIN, int(page_size * DIVERSITY_SHARE)), DIVERSITY_POOL)
+        diversity = _top_k(all_indices[categories == OTHER], scores, diversity_count)
+        diversity = diversity[:remaining_space]
+        selected.append(diversity)
+        selected_count += diversity.size
+
+    if selected_count < page_size:
+        leftovers = all_indices[limited & ~in_quota]
+        selected.append(_top_k(leftovers, scores, page_size - selected_count, tiebreak=categories))
+
+    return RankedFeed(
+        selected=np.concatenate(selected) if selected else all_indices[:0],
+        scores=scores,
+        categories=categories,
+    )
+
+
+def rank_snapshot(
+    batch: CandidateBatch,
+    page_size: int,
+    max_items: Optional[int] = None,
+    scores: Optional[np.ndarray] = None,
+    categories: Optional[np.ndarray] = None,
+) -> RankedFeed:
+    """Order every candidate once, for serving consecutive pages from a stored snapshot.
+
+    Pages are filled like rank_page - category quotas, diversity slots, then the best
+    leftovers - but each tweet is consumed once, so page_size slices of the result never
+    overlap or skip. The first slice is the same as rank_page(batch, 1, page_size).
+    Scores and categories already computed for the batch can be passed in.
+    """
+    if scores is None:
+        scores = score_candidates(batch)
+    if categories is None:
+        categories = categorize_candidates(batch)
+    n = len(batch)
+    max_items = min(n, max_items or n)
+
+    # One stable ordering per category: score descending, then candidate order
+    order = np.lexsort((np.arange(n), -scores, categories))
+    bounds = np.searchsorted(categories[order], np.arange(len(CATEGORIES) + 1))
+    queues = [order[bounds[c] : bounds[c + 1]].tolist() for c in range(len(CATEGORIES))]
+    heads = [0] * len(CATEGORIES)
+    score_list = scores.tolist()
+
+    quotas = [(CATEGORIES.index(name), int(page_size * share)) for name, share in CATEGORY_SHARES.items()]
+    limited_codes = [code for code, _ in quotas]
+    diversity_count = min(max(DIVERSITY_MIN, int(page_size * DIVERSITY_SHARE)), DIVERSITY_POOL)
+
+    def take(code: int, count: int) -> List[int]:
+        items = queues[code][heads[code] : heads[code] + count]
+        heads[code] += len(items)
+        return items
+
+    snapshot: List[int] = []
+    while len(snapshot) < max_items:
+        page_items: List[int] = []
+        for code, limit in quotas:
+            page_items.extend(take(code, limit))
+        remaining_space = page_size - len(page_items)
+        if remaining_space > 0:
+            page_items.extend(take(OTHER, min(diversity_count, remaining_space)))
+        while len(page_items) < page_size:
+            best_code = None
+            for code in limited_codes:
+                if heads[code] < len(queues[code]) and (
+                    best_code is None
+                    or score_list[queues[code][heads[code]]] > score_list[queues[best_code][heads[best_code]]]
+                ):
+                    best_code = code
+            if best_code is None:
+                break
+            page_items.extend(take(best_code, 1))
+        if not page_items:
+            break
+        snapshot.extend(page_items)
+        if all(heads[code] >= len(queues[code]) for code in limited_codes):
+            # Only uncategorized tweets are left; no quotas to interleave any more
+            snapshot.extend(take(OTHER, len(queues[OTHER])))
+            break
+
+    return RankedFeed(
+        selected=np.array(snapshot[:max_items], dtype=np.int64),
+        scores=scores,
+        categories=categories,
+    )
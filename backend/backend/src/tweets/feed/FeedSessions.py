@@ -0,0 +1,87 @@
+import base64
+import json
+import logging
+import secrets
+import time
+from typing import List, Optional, Tuple
+from caching.cache_service import cache_service
+from core.cache_config import GenerationScopes
+from core.config import get_settings
+from core.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class FeedSessionService:
+    """Ranked feed snapshots for cursor pagination.
+
+    A session holds the ordered tweet ids produced by one ranking pass. Pages are
+    slices of that list, so scrolling never re-ranks, overlaps or skips tweets while
+    the session lives. Sessions are only dropped by TTL; the per-user "current"
+    pointer is kept per feed and page size and keyed on the user's feed generation
+    and the global one, so the usual feed invalidation makes the next first-page
+    request rank again.
+    """
+
+    def _session_key(self, user_id: str, session_id: str) -> str:
+        return f"feed_session:{user_id}:{session_id}"
+
+    async def current_key(
+        self, user_id: str, feed_type: str, include_recommendations: bool, page_size: int
+    ) -> str:
+        return await cache_service.gen_key(
+            f"twitter_feed:{user_id}:current:{feed_type}:inc{include_recommendations}:s{page_size}",
+            GenerationScopes.FEED.format(user_id=user_id),
+            GenerationScopes.GLOBAL_FEED,
+        )
+
+    def encode_cursor(self, session_id: str, offset: int) -> str:
+        raw = json.dumps({"s": session_id, "o": offset}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> Tuple[str, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            session_id, offset = str(data["s"]), int(data["o"])
+        except Exception:
+            raise ValidationError("Invalid feed cursor")
+        if offset < 0:
+            raise ValidationError("Invalid feed cursor")
+        return session_id, offset
+
+    def new_session(
+        self, tweet_ids: List[int], feed_type: str, include_recommendations: bool
+    ) -> dict:
+        return {
+            "id": secrets.token_urlsafe(12),
+            "tweet_ids": tweet_ids[: settings.FEED_SESSION_MAX_ITEMS],
+            "feed_type": feed_type,
+            "include_recommendations": include_recommendations,
+            "created_at": time.time(),
+        }
+
+    async def save(self, user_id: str, session: dict) -> None:
+        await cache_service.set(
+            self._session_key(user_id, session["id"]), session, ttl=settings.FEED_SESSION_TTL
+        )
+
+    async def load(
+        self, user_id: str, session_id: str, feed_type: str, include_recommendations: bool
+    ) -> Optional[dict]:
+        """The session a cursor points at, None once it has expired.
+        Raises ValidationError for a cursor taken from a different feed."""
+        session = await cache_service.get(self._session_key(user_id, session_id))
+        if not session or not isinstance(session, dict) or "tweet_ids" not in session:
+            logger.info(f"Feed session {session_id} for {user_id} expired or unknown")
+            return None
+        if (
+            session.get("feed_type") != feed_type
+            or session.get("include_recommendations") != include_recommendations
+        ):
+            raise ValidationError("Feed cursor does not match the requested feed")
+        return session
+
+
+feed_session_service = FeedSessionService()
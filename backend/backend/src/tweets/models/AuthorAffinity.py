@@ -0,0 +1,15 @@
+from database.base import Base, TimestampMixin
+from sqlalchemy import Column, String, Float, ForeignKey, PrimaryKeyConstraint, Index
+
+
+class AuthorAffinity(Base, TimestampMixin):
+    """How strongly a viewer engages with an author, decayed over time"""
+    __tablename__ = "author_affinity"
+    viewer_id = Column(String(7), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    author_id = Column(String(7), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    score = Column(Float, default=0.0, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint(viewer_id, author_id),
+        Index("idx_author_affinity_viewer_score", viewer_id, score.desc()),
+    )
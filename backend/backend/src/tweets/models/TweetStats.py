@@ -0,0 +1,14 @@
+from database.base import Base, TimestampMixin
+from sqlalchemy import Column, Integer, ForeignKey
+
+
+class TweetStats(Base, TimestampMixin):
+    """Persisted engagement counters; the live values are kept in Redis"""
+    __tablename__ = "tweet_stats"
+    tweet_id = Column(
+        Integer, ForeignKey("tweets.id", ondelete="CASCADE"), primary_key=True
+    )
+    like_count = Column(Integer, default=0, nullable=False)
+    comment_count = Column(Integer, default=0, nullable=False)
+    share_count = Column(Integer, default=0, nullable=False)
+    bookmark_count = Column(Integer, default=0, nullable=False)
@@ -12,3 +12,4 @@ class TweetFeedResponse(BaseModel):
     feed_type: Optional[str] = "latest"
     last_tweet_id: Optional[int] = None
     refresh_timestamp: Optional[str] = None
+    next_cursor: Optional[str] = None
@@ -36,7 +36,6 @@ from tweets.response.SharedTweetResponse import SharedTweetResponse
 from caching.celery_worker import (
     refresh_user_feed,
     refresh_user_recommend,
-    refresh_followers_feeds,
 )
 from core.audit import audit_logger
 from core.rate_limit import rate_limit
@@ -113,7 +112,6 @@ async def post_tweet_entry(
         response = await tweet_service.post_tweet(db, current_user, request_data)
         refresh_user_feed.delay(current_user, page=1)
         refresh_user_recommend.delay(current_user, page=1)
-        refresh_followers_feeds.delay(current_user, page=1)
         background_tasks.add_task(
             audit_logger.log_auth_event,
             "tweet_posted",
@@ -132,25 +130,28 @@ async def post_tweet_entry(
 )
 @rate_limit(scope="user")
 async def get_feed_route(
-    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+    page: int = Query(1, ge=1, description="Page of the current feed session, for clients without a cursor"),
     page_size: int = Query(20, ge=1, le=100),
     include_recommendations: bool = Query(True),
     feed_type: str = Query("latest", regex="^(latest|older)$"),
-    last_tweet_id: Optional[int] = Query(None, description="Last tweet ID for infinite scroll"),
-    refresh: bool = Query(False, description="Force refresh the feed"),
+    last_tweet_id: Optional[int] = Query(None, description="Deprecated, ignored; pages come from the feed session"),
+    refresh: bool = Query(False, description="Force refresh the feed (first page only)"),
     db: AsyncSession = Depends(get_database_session),
     current_user: str = Depends(get_current_active_user),
 ):
     try:
+        # A cursor continues its snapshot, and older clients send refresh=true with every
+        # page: only a first page without a cursor ranks a new one
         return await tweet_service.get_merged_feed(
             db=db,
             user_id=current_user,
             page=page,
             page_size=page_size,
             include_recommendations=include_recommendations,
-            last_tweet_id=last_tweet_id,
-            refresh=refresh,
+            refresh=refresh and not cursor and page == 1,
             feed_type=feed_type,
+            cursor=cursor,
         )
     except BaseCustomException as e:
         raise create_http_exception(e)
@@ -333,6 +334,22 @@ async def get_my_comments_route(
         raise create_http_exception(e)
 
 
+@router.get(
+    "/trending",
+    response_model=TweetFeedResponse,
+)
+@rate_limit(scope="user")
+async def get_trending_tweets_route(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_database_session),
+    current_user: str = Depends(get_current_active_user),
+):
+    try:
+        return await tweet_service.get_trending_tweets(db, current_user, limit)
+    except BaseCustomException as e:
+        raise create_http_exception(e)
+
+
 @router.get(
     "/{tweet_id}",
     response_model=TweetResponse,
@@ -7,7 +7,9 @@ from auth.models.User import User
 from auth.models.UserProfile import UserProfile
 from user_profile.response.FollowRequestResponse import FollowRequestResponse
 from caching.cache_service import cache_service
-from core.cache_config import CacheConstants, CacheKeyPatterns, get_ttl_for_operation
+from caching.invalidation_queue import invalidation_queue
+from caching.timeline_service import timeline_service
+from core.cache_config import CacheConstants, CacheKeyPatterns, GenerationScopes, get_ttl_for_operation
 from datetime import datetime
 from core.config import get_settings
 from core.exceptions import (
@@ -27,19 +29,16 @@ class FollowFollowingCruds:
     async def _batch_invalidate_follow_caches(self, follower_id: str, followee_id: str):
         """Optimized batch cache invalidation for follow operations"""
         try:
-            # Use batch invalidation instead of individual calls
-            await cache_service.batch_invalidate_user_feeds([follower_id, followee_id])
-            
-            # Invalidate specific follow-related caches
+            # Both profiles and graph lists, and the follower's feed, inline: the
+            # follower sees the new state on their next read
             await cache_service.invalidate_follow_cache(follower_id, followee_id)
+            await cache_service.invalidate_tweet_feed_cache(follower_id)
             
             # Only invalidate profiles if needed (less aggressive)
             if follower_id != followee_id:  # Sanity check
-                profile_tasks = [
-                    cache_service.invalidate_profile_cache(follower_id),
-                    cache_service.invalidate_profile_cache(followee_id)
-                ]
-                await asyncio.gather(*profile_tasks, return_exceptions=True)
+                await invalidation_queue.defer("invalidate_profile_cache", follower_id)
+                await invalidation_queue.defer("invalidate_profile_cache", followee_id)
+            await invalidation_queue.defer("invalidate_tweet_feed_cache", followee_id)
             
             # Global invalidation only for high-impact accounts
             # Check if followee is a popular account before invalidating recommendations
@@ -54,12 +53,8 @@ class FollowFollowingCruds:
     async def _smart_cache_warm_up(self, user_ids: list[str], db: AsyncSession):
         """Smart cache warming that only warms critical data"""
         try:
-            # Only warm up essential caches, not everything
-            for user_id in user_ids:
-                # Fire and forget for non-critical warming
-                asyncio.create_task(
-                    cache_service.smart_cache_warm_up(user_id, db)
-                )
+            # Only warm up essential caches, not everything; fire and forget
+            asyncio.create_task(cache_service.smart_cache_warm_up_many(user_ids, db))
         except Exception as e:
             logger.warning(f"Cache warm-up failed, continuing: {e}")
 
@@ -136,6 +131,7 @@ class FollowFollowingCruds:
             follower_entry = Follower(follower_id=follower_id, followee_id=followee_id)
             db.add(follower_entry)
             await db.commit()
+            await timeline_service.merge_author(db, follower_id, followee_id)
             
             # Optimized cache invalidation
             await self._batch_invalidate_follow_caches(follower_id, followee_id)
@@ -171,18 +167,20 @@ class FollowFollowingCruds:
         else:
             follow_request.status = FollowRequestStatus.declined
         await db.commit()
+        if accept:
+            await timeline_service.merge_author(db, follower_id, followee_id)
         try:
+            # Graph lists and profiles of both users inline (the responder sees them next)
             await cache_service.invalidate_follow_cache(follower_id, followee_id)
-            await cache_service.invalidate_profile_cache(follower_id)
-            await cache_service.invalidate_profile_cache(followee_id)
-            await cache_service.invalidate_tweet_feed_cache(follower_id)
-            await cache_service.invalidate_tweet_feed_cache(followee_id)
-            await cache_service.invalidate_twitter_recommendation_cache()
+            await invalidation_queue.defer("invalidate_profile_cache", follower_id)
+            await invalidation_queue.defer("invalidate_profile_cache", followee_id)
+            await invalidation_queue.defer("invalidate_tweet_feed_cache", follower_id)
+            await invalidation_queue.defer("invalidate_tweet_feed_cache", followee_id)
+            await invalidation_queue.defer("invalidate_twitter_recommendation_cache")
             logger.info(
                 f"Invalidated follow-related and profile caches for {follower_id} and {followee_id}"
             )
-            asyncio.create_task(cache_service.smart_cache_warm_up(follower_id, db))
-            asyncio.create_task(cache_service.smart_cache_warm_up(followee_id, db))
+            asyncio.create_task(cache_service.smart_cache_warm_up_many([follower_id, followee_id], db))
         except BaseCustomException as e:
             logger.error(
                 f"Failed to invalidate caches for follow request response: {e}"
@@ -206,18 +204,19 @@ class FollowFollowingCruds:
             raise ValidationError("Not following this user")
         await db.delete(follower_entry)
         await db.commit()
+        await timeline_service.remove_author(db, follower_id, followee_id)
         try:
+            # The unfollower's graph, profiles and feed inline, the rest deferred
             await cache_service.invalidate_follow_cache(follower_id, followee_id)
-            await cache_service.invalidate_profile_cache(follower_id)
-            await cache_service.invalidate_profile_cache(followee_id)
             await cache_service.invalidate_tweet_feed_cache(follower_id)
-            await cache_service.invalidate_tweet_feed_cache(followee_id)
-            await cache_service.invalidate_twitter_recommendation_cache()
+            await invalidation_queue.defer("invalidate_profile_cache", follower_id)
+            await invalidation_queue.defer("invalidate_profile_cache", followee_id)
+            await invalidation_queue.defer("invalidate_tweet_feed_cache", followee_id)
+            await invalidation_queue.defer("invalidate_twitter_recommendation_cache")
             logger.info(
                 f"Invalidated follow-related and profile caches for {follower_id} and {followee_id}"
             )
-            asyncio.create_task(cache_service.smart_cache_warm_up(follower_id, db))
-            asyncio.create_task(cache_service.smart_cache_warm_up(followee_id, db))
+            asyncio.create_task(cache_service.smart_cache_warm_up_many([follower_id, followee_id], db))
         except BaseCustomException as e:
             logger.error(f"Failed to invalidate caches for unfollow action: {e}")
             raise
@@ -278,6 +277,7 @@ class FollowFollowingCruds:
             await db.delete(pending_request)
         
         await db.commit()
+        await timeline_service.remove_author(db, follower_id, user_id)
         
         # Comprehensive cache invalidation
         try:
@@ -285,8 +285,7 @@ class FollowFollowingCruds:
             logger.info(
                 f"Successfully removed follower {follower_id} from {user_id} and invalidated all related caches"
             )
-            asyncio.create_task(cache_service.smart_cache_warm_up(user_id, db))
-            asyncio.create_task(cache_service.smart_cache_warm_up(follower_id, db))
+            asyncio.create_task(cache_service.smart_cache_warm_up_many([user_id, follower_id], db))
         except BaseCustomException as e:
             logger.error(f"Failed to invalidate caches for remove follower action: {e}")
             raise
@@ -294,7 +293,9 @@ class FollowFollowingCruds:
     async def get_follow_requests(
         self, db: AsyncSession, user_id: str
     ) -> list[FollowRequestResponse]:
-        cache_key = f"follow_requests:{user_id}"
+        cache_key = await cache_service.gen_key(
+            f"follow_requests:{user_id}", GenerationScopes.USER.format(user_id=user_id)
+        )
         cached_requests = await cache_service.get(cache_key)
         if cached_requests:
             return [FollowRequestResponse(**req) for req in cached_requests]
@@ -368,7 +369,9 @@ class FollowFollowingCruds:
         self, db: AsyncSession, user_id: str, page: int = 1, page_size: int = 20
     ) -> tuple[list[FollowRequestResponse], int]:
         offset = (page - 1) * page_size
-        cache_key = f"followers:{user_id}:p{page}:s{page_size}"
+        cache_key = await cache_service.gen_key(
+            f"followers:{user_id}:p{page}:s{page_size}", GenerationScopes.USER.format(user_id=user_id)
+        )
         cached_data = await cache_service.get(cache_key)
         if cached_data:
             logger.info(f"Cache hit for followers: {cache_key}")
@@ -435,7 +438,9 @@ class FollowFollowingCruds:
         self, db: AsyncSession, user_id: str, page: int = 1, page_size: int = 20
     ) -> tuple[list[FollowRequestResponse], int]:
         offset = (page - 1) * page_size
-        cache_key = f"following:{user_id}:p{page}:s{page_size}"
+        cache_key = await cache_service.gen_key(
+            f"following:{user_id}:p{page}:s{page_size}", GenerationScopes.USER.format(user_id=user_id)
+        )
         cached_data = await cache_service.get(cache_key)
         if cached_data:
             logger.info(f"Cache hit for following: {cache_key}")
@@ -8,6 +8,7 @@ from auth.models.User import User
 from auth.models.UserProfile import UserProfile
 from caching.cache_service import cache_service
 from core.config import get_settings
+from core.cache_config import CacheConstants
 from core.exceptions import (
     NotFoundError,
     ValidationError,
@@ -21,10 +22,16 @@ logger = logging.getLogger(__name__)
 
 class InterestCruds:
     async def get_all_interests(self, db: AsyncSession) -> list:
+        # The catalog is seeded, not edited at runtime; also kept in the in-process L1
+        cached = await cache_service.get("interests_catalog")
+        if cached is not None:
+            return cached
         interests = (
             (await db.execute(select(Interest).order_by(Interest.name))).scalars().all()
         )
-        return [{"id": interest.id, "name": interest.name} for interest in interests]
+        catalog = [{"id": interest.id, "name": interest.name} for interest in interests]
+        await cache_service.set("interests_catalog", catalog, ttl=CacheConstants.EXPENSIVE_QUERY_TTL)
+        return catalog
 
     async def get_user_interests(self, db: AsyncSession, user_id: str) -> list:
         user = (
@@ -13,7 +13,10 @@ from user_profile.models.UserInterest import UserInterest
 from user_profile.response.ProfileResponse import ProfileResponse
 from user_profile.request.UpdateProfileRequest import UpdateProfileRequest
 from caching.cache_service import cache_service
-from core.cache_config import CacheConstants, CacheKeyPatterns, get_ttl_for_operation, should_use_lock, get_lock_ttl
+from caching.invalidation_queue import invalidation_queue
+from database.session import AsyncSessionLocal
+from database.fanout import query_fanout
+from core.cache_config import CacheConstants, CacheKeyPatterns, GenerationScopes, get_ttl_for_operation, get_lock_ttl
 from core.exceptions import (
     BaseCustomException,
     NotFoundError,
@@ -31,49 +34,61 @@ logger = logging.getLogger(__name__)
 
 
 class UserProfileCruds:
+    async def _profile_cache_key(self, user_id: str, requester_id: str = None) -> str:
+        # Standardized key pattern, on the profile owner's generation
+        return await cache_service.gen_key(
+            CacheKeyPatterns.PROFILE.format(user_id=user_id, requester_id=requester_id or 'none'),
+            GenerationScopes.USER.format(user_id=user_id),
+        )
+
     async def get_user_profile(
         self, db: AsyncSession, user_id: str, requester_id: str = None
     ) -> ProfileResponse:
-        # Use standardized cache key pattern
-        cache_key = CacheKeyPatterns.PROFILE.format(
-            user_id=user_id, 
-            requester_id=requester_id or 'none'
-        )
-        
-        # Use cache stampede protection for expensive profile queries
-        if should_use_lock('profile', estimated_compute_time=2.0):
-            try:
-                async def compute_profile():
-                    return await self._compute_profile_internal(db, user_id, requester_id)
-                
-                cached_result = await cache_service.cache_with_lock(
-                    cache_key,
-                    compute_profile,
-                    ttl=get_ttl_for_operation('profile'),
-                    lock_ttl=get_lock_ttl('profile', 2.0)
-                )
-                
-                if cached_result:
-                    return ProfileResponse(**cached_result)
-                    
-            except Exception as e:
-                logger.warning(f"Cache with lock failed for profile {user_id}: {e}")
-                # Fallback to direct computation
-        
-        # Direct computation if lock not used or failed
+        cache_key = await self._profile_cache_key(user_id, requester_id)
+
+        async def compute_profile(session_db: AsyncSession = db):
+            profile = await self._compute_profile_internal(
+                session_db, user_id, requester_id, use_cache=False
+            )
+            return profile.model_dump()
+
+        async def revalidate_profile():
+            async with AsyncSessionLocal() as session_db:
+                return await compute_profile(session_db)
+
+        # Stale-while-revalidate: an expired profile is served while one request recomputes it
+        try:
+            profile_ttl = get_ttl_for_operation('profile')
+            cached_result = await cache_service.get_or_revalidate(
+                cache_key,
+                compute_profile,
+                soft_ttl=profile_ttl,
+                ttl=profile_ttl + CacheConstants.PROFILE_STALE_TTL,
+                lock_ttl=get_lock_ttl('profile', 2.0),
+                revalidate_func=revalidate_profile,
+            )
+            if cached_result:
+                return ProfileResponse(**cached_result)
+        except BaseCustomException:
+            raise
+        except Exception as e:
+            logger.warning(f"Stale-while-revalidate failed for profile {user_id}: {e}")
+            # Fallback to direct computation
+
         return await self._compute_profile_internal(db, user_id, requester_id)
     
     async def _compute_profile_internal(
-        self, db: AsyncSession, user_id: str, requester_id: str = None
+        self, db: AsyncSession, user_id: str, requester_id: str = None, use_cache: bool = True
     ) -> ProfileResponse:
-        """Internal method for computing user profile - original logic moved here"""
-        cache_key = CacheKeyPatterns.PROFILE.format(
-            user_id=user_id, 
-            requester_id=requester_id or 'none'
-        )
+        """Internal method for computing user profile - original logic moved here.
+
+        With use_cache=False the profile is always built from the database and not
+        written back; the caller owns the cache entry.
+        """
+        cache_key = await self._profile_cache_key(user_id, requester_id)
         
         try:
-            cached_profile = await cache_service.get(cache_key)
+            cached_profile = await cache_service.get(cache_key) if use_cache else None
             if cached_profile:
                 logger.info(
                     f"Cache hit for profile {user_id} (requester: {requester_id})"
@@ -125,10 +140,24 @@ class UserProfileCruds:
                 .select_from(Follower)
                 .where(Follower.follower_id == user_id),
             ]
-            interests_result = await db.execute(batch_queries[0])
-            interests = [name for name in interests_result.scalars().all()]
-            followers_count = (await db.execute(batch_queries[1])).scalar_one() or 0
-            following_count = (await db.execute(batch_queries[2])).scalar_one() or 0
+            viewing_other = requester_id is not None and requester_id != user_id
+            if viewing_other:
+                batch_queries += [
+                    select(Follower).where(
+                        Follower.follower_id == requester_id,
+                        Follower.followee_id == user_id,
+                    ),
+                    select(FollowRequest).where(
+                        FollowRequest.follower_id == requester_id,
+                        FollowRequest.followee_id == user_id,
+                        FollowRequest.status == FollowRequestStatus.pending,
+                    ),
+                ]
+            # Independent reads, each on a connection of its own
+            results = await query_fanout.gather(db, *batch_queries, name="profile")
+            interests = [name for name in results[0].scalars().all()]
+            followers_count = results[1].scalar_one() or 0
+            following_count = results[2].scalar_one() or 0
             if profile.photo_path and profile.photo_content_type:
                 photo = profile.photo_path
             else:
@@ -137,30 +166,14 @@ class UserProfileCruds:
                 banner = profile.banner_path
             else:
                 banner = None
-            if requester_id is None or requester_id == user_id:
+            if not viewing_other:
                 follow_status = "self"
+            elif results[3].scalar_one_or_none() is not None:
+                follow_status = "following"
+            elif results[4].scalar_one_or_none() is not None:
+                follow_status = "requested"
             else:
                 follow_status = "not_following"
-                follow_check = await db.execute(
-                    select(Follower).where(
-                        Follower.follower_id == requester_id,
-                        Follower.followee_id == user_id,
-                    )
-                )
-                is_follower = follow_check.scalar_one_or_none() is not None
-                if is_follower:
-                    follow_status = "following"
-                else:
-                    request_check = await db.execute(
-                        select(FollowRequest).where(
-                            FollowRequest.follower_id == requester_id,
-                            FollowRequest.followee_id == user_id,
-                            FollowRequest.status == FollowRequestStatus.pending,
-                        )
-                    )
-                    is_requested = request_check.scalar_one_or_none() is not None
-                    if is_requested:
-                        follow_status = "requested"
             response = ProfileResponse(
                 user_id=user.user_id,
                 name=profile.name,
@@ -195,8 +208,9 @@ class UserProfileCruds:
             cache_ttl = get_ttl_for_operation('profile', is_empty=False)
             
             try:
-                await cache_service.set(cache_key, response.model_dump(), ttl=cache_ttl)
-                logger.info(f"Profile cached for {user_id} with key {cache_key}")
+                if use_cache:
+                    await cache_service.set(cache_key, response.model_dump(), ttl=cache_ttl)
+                    logger.info(f"Profile cached for {user_id} with key {cache_key}")
             except Exception as e:
                 logger.warning(f"Failed to cache profile for {user_id}: {e}")
                 # Continue without caching instead of failing
@@ -284,7 +298,7 @@ class UserProfileCruds:
                 if request.is_private is not None:
                     # If privacy setting changed, invalidate feeds
                     await cache_service.invalidate_tweet_feed_cache(user_id)
-                    await cache_service.invalidate_twitter_recommendation_cache()
+                    await invalidation_queue.defer("invalidate_twitter_recommendation_cache")
             except BaseCustomException as e:
                 logger.warning(f"Failed to invalidate cache for user {user_id}: {e}")
                 raise e
@@ -295,7 +309,9 @@ class UserProfileCruds:
     async def search_users(
         self, db: AsyncSession, request: UserSearchRequest
     ) -> UserSearchResponse:
-        cache_key = f"user_search:{request.search or 'all'}:p{request.page}"
+        cache_key = await cache_service.gen_key(
+            f"user_search:{request.search or 'all'}:p{request.page}", GenerationScopes.GLOBAL_SEARCH
+        )
         cached = await cache_service.get(cache_key)
         if cached:
             logger.info(f"Cache hit for user search: {cache_key}")
@@ -357,6 +373,24 @@ class UserProfileCruds:
 
     async def get_top_accounts(
         self, db: AsyncSession, limit: int = 10
+    ) -> TopAccountsResponse:
+        # Same for every requester and read on every page load; also kept in the in-process L1
+        cache_key = CacheKeyPatterns.TOP_ACCOUNTS.format(limit=limit)
+
+        async def compute_top_accounts():
+            return (await self._compute_top_accounts(db, limit)).model_dump()
+
+        # Refreshed ahead of expiry by one reader; the lock TTL follows the measured cost
+        cached_result = await cache_service.get_or_compute(
+            cache_key,
+            compute_top_accounts,
+            ttl=get_ttl_for_operation('recommendation'),
+            operation='recommendation',
+        )
+        return TopAccountsResponse(**cached_result)
+
+    async def _compute_top_accounts(
+        self, db: AsyncSession, limit: int = 10
     ) -> TopAccountsResponse:
         half = limit // 2
         followers_count_subq = (